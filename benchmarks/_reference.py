@@ -0,0 +1,185 @@
+""" Frozen reference implementations of the ratefit.calc kernels.
+
+    These are the original, straightforward per-pressure (and, for
+    Chebyshev, per-temperature) implementations, kept unchanged so that the
+    results of faster kernels can be checked against them. Do not optimize
+    this module.
+"""
+
+import numpy as np
+from scipy.special import eval_chebyt
+from phydat import phycon
+
+
+RC = phycon.RC_CAL  # gas constant in cal/(mol.K)
+RC2 = phycon.RC_ATM  # gas constant in cm^3.atm/(mol.K)
+
+
+def single_arrhenius(a_par, n_par, ea_par, t_ref, temps, rval=RC):
+    """ k(T)s of a single Arrhenius expression
+    """
+    return a_par * ((temps / t_ref)**n_par) * np.exp(-ea_par/(rval*temps))
+
+
+def double_arrhenius(a_par1, n_par1, ea_par1, a_par2, n_par2, ea_par2,
+                     t_ref, temps, rval=RC):
+    """ k(T)s of a double Arrhenius expression
+    """
+    return (
+        a_par1 * ((temps / t_ref)**n_par1) * np.exp(-ea_par1/(rval*temps)) +
+        a_par2 * ((temps / t_ref)**n_par2) * np.exp(-ea_par2/(rval*temps))
+    )
+
+
+def arrhenius(params, t_ref, temps):
+    """ k(T)s of a single or double Arrhenius expression
+    """
+    assert len(params) in (3, 6)
+    if len(params) == 3:
+        kts = single_arrhenius(*params, t_ref, temps)
+    else:
+        kts = double_arrhenius(*params, t_ref, temps)
+    return kts
+
+
+def lindemann(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0):
+    """ {pressure: k(T)s} of a Lindemann expression
+    """
+    kp_dct = {}
+    for pressure in pressures:
+        pr_terms = _pr_term(highp_kts, lowp_kts, temps, pressure,
+                            collid_factor=collid_factor)
+        kp_dct[pressure] = highp_kts * (pr_terms / (1.0 + pr_terms))
+    return kp_dct
+
+
+def troe(highp_kts, lowp_kts, temps, pressures,
+         alpha, ts3, ts1, ts2=None, collid_factor=1.0):
+    """ {pressure: k(T)s} of a Troe expression
+    """
+    kp_dct = {}
+    for pressure in pressures:
+        pr_term = _pr_term(highp_kts, lowp_kts, temps, pressure,
+                           collid_factor)
+        f_term = _f_broadening_term(pr_term, alpha, ts3, ts1, ts2, temps)
+        kp_dct[pressure] = highp_kts * (pr_term / (1.0 + pr_term)) * f_term
+    return kp_dct
+
+
+def plog(plog_dct, t_ref, temps, pressures):
+    """ {pressure: k(T)s} of a PLOG expression, for the pressures within
+        the range of the PLOG pressures
+    """
+    plog_pressures = list(plog_dct.keys())
+    kp_dct = {}
+    for pressure in pressures:
+        if min(plog_pressures) <= pressure <= max(plog_pressures):
+            kp_dct[pressure] = _plog_one_pressure(
+                plog_dct, t_ref, temps, pressure)
+    return kp_dct
+
+
+def chebyshev(alpha, tmin, tmax, pmin, pmax, temps, pressures):
+    """ {pressure: k(T)s} of a Chebyshev expression
+    """
+    kp_dct = {}
+    for pressure in pressures:
+        kp_dct[pressure] = _chebyshev_one_pressure(
+            alpha, tmin, tmax, pmin, pmax, temps, pressure)
+    return kp_dct
+
+
+def _plog_one_pressure(plog_dct, t_ref, temps, pressure):
+    """ k(T)s of a PLOG expression at one pressure
+    """
+    plog_pressures = list(plog_dct.keys())
+
+    pressure_defined = False
+    for plog_pressure in plog_pressures:
+        if np.isclose(pressure, plog_pressure, atol=1.0e-3):
+            pressure_defined = True
+            plog_params = plog_dct[plog_pressure]
+
+    if pressure_defined:
+        ktps = arrhenius(plog_params, t_ref, temps)
+    else:
+        for i, _ in enumerate(plog_pressures):
+            if i != len(plog_pressures)-1:
+                if plog_pressures[i] < pressure < plog_pressures[i+1]:
+                    plow = plog_pressures[i]
+                    phigh = plog_pressures[i+1]
+                    plow_params = plog_dct[plow]
+                    phigh_params = plog_dct[phigh]
+                    break
+        pres_term = (
+            (np.log10(pressure) - np.log10(plow)) /
+            (np.log10(phigh) - np.log10(plow))
+        )
+        kt_low = arrhenius(plow_params, t_ref, temps)
+        kt_high = arrhenius(phigh_params, t_ref, temps)
+        logkt = (
+            np.log10(kt_low) +
+            ((np.log10(kt_high) - np.log10(kt_low)) * pres_term)
+        )
+        ktps = 10**(logkt)
+
+    return ktps
+
+
+def _chebyshev_one_pressure(alpha, tmin, tmax, pmin, pmax, temps, pressure):
+    """ k(T)s of a Chebyshev expression at one pressure
+    """
+    alpha_nrows, alpha_ncols = alpha.shape
+
+    ktps = np.zeros(len(temps))
+    for i, temp in enumerate(temps):
+        ctemp = (
+            (2.0 * temp**(-1) - tmin**(-1) - tmax**(-1)) /
+            (tmax**(-1) - tmin**(-1))
+        )
+        cpress = (
+            (2.0 * np.log10(pressure) - np.log10(pmin) - np.log10(pmax)) /
+            (np.log10(pmax) - np.log10(pmin))
+        )
+
+        logktp = 0.0
+        for j in range(alpha_nrows):
+            for k in range(alpha_ncols):
+                logktp += (
+                    alpha[j][k] *
+                    eval_chebyt(j, ctemp) *
+                    eval_chebyt(k, cpress)
+                )
+
+        ktps[i] = 10**(logktp)
+
+    return ktps
+
+
+def _pr_term(highp_rateks, lowp_rateks, temps, pressure,
+             collid_factor=1.0, rval=RC2):
+    """ Reduced pressure of the Lindemann and Troe expressions
+    """
+    return (
+        (lowp_rateks / highp_rateks) *
+        (pressure / (rval * temps)) *
+        collid_factor
+    )
+
+
+def _f_broadening_term(pr_term, alpha, ts3, ts1, ts2, temp):
+    """ Broadening factor F of the Troe expression
+    """
+    f_cent = ((1.0 - alpha) * np.exp(-temp / ts3) +
+              alpha * np.exp(-temp / ts1))
+    if ts2 is not None:
+        f_cent += np.exp(-ts2 / temp)
+
+    c_val = -0.4 - 0.67 * np.log10(f_cent)
+    n_val = 0.75 - 1.27 * np.log10(f_cent)
+    d_val = 0.14
+    val = ((np.log10(pr_term) + c_val) /
+           (n_val - d_val * (np.log10(pr_term) + c_val)))**2
+    logf = (1.0 + val)**(-1) * np.log10(f_cent)
+
+    return 10**(logf)
@@ -0,0 +1,163 @@
+""" Timing, output, and baseline-comparison helpers shared by the benchmarks
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import subprocess
+import numpy
+
+
+def best_time(fxn, nrepeat=3):
+    """ Time a function, keeping the best of several runs
+
+        :param fxn: function of no arguments to time
+        :type fxn: callable
+        :param nrepeat: number of runs
+        :type nrepeat: int
+        :return: best wall time (s) and the output of the last run
+        :rtype: (float, object)
+    """
+    times = []
+    for _ in range(max(nrepeat, 1)):
+        start = time.perf_counter()
+        out = fxn()
+        times.append(time.perf_counter() - start)
+
+    return min(times), out
+
+
+def run_info():
+    """ Describe the machine, software, and source tree of a run
+
+        :rtype: dict
+    """
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'ncpus': os.cpu_count(),
+    }
+
+
+def write_results(results, path, **settings):
+    """ Write benchmark results to a JSON file
+
+        :param results: one dictionary per measurement
+        :type results: list(dict)
+        :param path: output file
+        :type path: str
+        :param settings: settings of the run, stored along with the results
+    """
+    out_dct = {'info': run_info(), 'settings': settings, 'results': results}
+    with open(path, 'w', encoding='utf-8') as fobj:
+        json.dump(out_dct, fobj, indent=1)
+    print(f'Results written to {path}')
+
+
+def read_results(path):
+    """ Read the results from a JSON file written by write_results
+
+        :param path: results file
+        :type path: str
+        :rtype: list(dict)
+    """
+    with open(path, encoding='utf-8') as fobj:
+        return json.load(fobj)['results']
+
+
+def compare_to_baseline(results, baseline_results, key_fields,
+                        tolerance=1.25):
+    """ Compare the timings of a run with those of a baseline run, printing
+        a table of the speed ratios.
+
+        :param results: results of this run
+        :type results: list(dict)
+        :param baseline_results: results of the baseline run
+        :type baseline_results: list(dict)
+        :param key_fields: fields identifying the same measurement in both
+        :type key_fields: tuple(str)
+        :param tolerance: slow-down (time ratio) flagged as a regression
+        :type tolerance: float
+        :return: keys of the measurements that regressed
+        :rtype: list(tuple)
+    """
+    def _key(result):
+        return tuple(result.get(field) for field in key_fields)
+
+    base_dct = {_key(result): result['time'] for result in baseline_results}
+    regressions = []
+    print('\n{:<48s}{:>12s}{:>12s}{:>10s}'.format(
+        ' '.join(key_fields), 'base (s)', 'now (s)', 'ratio'))
+    for result in results:
+        key = _key(result)
+        if key not in base_dct:
+            continue
+        ratio = result['time'] / max(base_dct[key], 1.0e-12)
+        flag = ''
+        if ratio > tolerance:
+            regressions.append(key)
+            flag = '  SLOWER'
+        print('{:<48s}{:>12.4g}{:>12.4g}{:>10.2f}{}'.format(
+            ' '.join(str(val) for val in key), base_dct[key],
+            result['time'], ratio, flag))
+
+    return regressions
+
+
+def finish(results, args, key_fields, **settings):
+    """ Write the results of a run and, if a baseline was given, compare
+        with it and exit with an error if any measurement regressed
+
+        :param results: results of this run
+        :type results: list(dict)
+        :param args: parsed command-line arguments (out, baseline, tolerance)
+        :type args: argparse.Namespace
+        :param key_fields: fields identifying the same measurement in both
+        :type key_fields: tuple(str)
+    """
+    write_results(results, args.out, **settings)
+    if args.baseline is not None:
+        regressions = compare_to_baseline(
+            results, read_results(args.baseline), key_fields,
+            tolerance=args.tolerance)
+        if regressions:
+            print(f'{len(regressions)} measurement(s) slower than '
+                  f'{args.tolerance}x the baseline')
+            sys.exit(1)
+
+
+def add_common_args(arg_parser, default_out):
+    """ Add the output and baseline options shared by the benchmarks
+
+        :param arg_parser: parser of the command-line arguments
+        :type arg_parser: argparse.ArgumentParser
+        :param default_out: default JSON output file
+        :type default_out: str
+    """
+    arg_parser.add_argument(
+        '-o', '--out', default=default_out,
+        help='JSON file the results are written to')
+    arg_parser.add_argument(
+        '-b', '--baseline', default=None,
+        help='JSON results of a previous run to compare against')
+    arg_parser.add_argument(
+        '-t', '--tolerance', type=float, default=1.25,
+        help='time ratio to the baseline flagged as a regression')
+    arg_parser.add_argument(
+        '-r', '--repeat', type=int, default=3,
+        help='number of runs per measurement (the best is kept)')
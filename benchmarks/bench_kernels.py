@@ -0,0 +1,247 @@
+""" Time each ratefit.calc kernel over grid sizes from 10 to 10^6 points and
+    check its results against the frozen reference implementations in
+    _reference.py.
+
+    Usage:
+        python benchmarks/bench_kernels.py [-o results.json]
+            [-b baseline.json] [--kernels troe plog] [--rtol 1e-8]
+
+    Each measurement records the time of the current kernel, the time of
+    the reference (on grids up to --ref-max points) and the largest
+    relative deviation from the reference. The script exits with an error
+    if any kernel deviates by more than --rtol or, with --baseline, became
+    slower than the tolerance.
+"""
+
+import sys
+import argparse
+import numpy
+import ratefit
+import _util
+import _reference
+
+
+KERNELS = ('single_arrhenius', 'double_arrhenius', 'lindemann', 'troe',
+           'plog', 'chebyshev')
+SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+NPRES = 5  # pressures of the grids of the P-dependent kernels
+NCHECK = 1000  # temperatures at which results are checked
+
+TEMP_RANGE = (300.0, 2500.0)  # K
+LOG_PRESSURE_RANGE = (-1.0, 1.5)  # log10 atm
+T_REF = 1.0
+
+# Parameters (cm3/s, None, cal/mol)
+SGL_PARAMS = (1.04e+15, 0.0, 59810.0)
+DBL_PARAMS = (9.91035e+15, -2.79795, 1679.0, 7.89749e+13, -2.25289, 5770.0)
+HIGHP_PARAMS = (2.000e+12, 0.900, 4874.9)
+LOWP_PARAMS = (2.490e+24, -2.300, 4874.9)
+TROE_PARAMS = (6.0e-1, 1.0e3, 7.0, 1.7e3)  # alpha, T3, T1, T2
+PLOG_DCT = {
+    0.03: (2.88300e+15, -2.583, 1244.0),
+    0.10: (1.14500e+16, -2.602, 1498.0),
+    0.30: (3.31100e+16, -2.594, 1702.0),
+    1.00: (1.30500e+17, -2.611, 1980.0),
+    3.00: (3.87400e+17, -2.606, 2213.0),
+    10.0: (1.52900e+18, -2.623, 2521.0),
+    30.0: (4.66900e+18, -2.621, 2789.0),
+    100.: (1.72500e+19, -2.630, 3128.0)
+}
+CHEB_LIMITS = (290.0, 2500.0, 0.0050, 103.6270)  # tmin, tmax, pmin, pmax
+CHEB_ALPHA = numpy.array([
+    [1.31900, 0.753300, -0.113600, -0.00162400],
+    [7.50900, 1.25800, -0.140900, -0.0208600],
+    [-0.719500, 0.751500, -0.000179400, -0.0326600],
+    [-0.499400, 0.312200, 0.0701700, -0.0159100],
+    [-0.219600, 0.0609100, 0.0654200, 0.00777700],
+    [-0.0877400, -0.0289900, 0.0290900, 0.0199400]
+])
+
+KEY_FIELDS = ('kernel', 'npoints')
+
+
+def kernel_fxns(kernel):
+    """ Current and reference versions of a kernel, as functions of the
+        temperatures and pressures, along with whether it depends on
+        pressure
+
+        :param kernel: name of the kernel in KERNELS
+        :type kernel: str
+        :rtype: (callable, callable, bool)
+    """
+    def _kts(params, temps):
+        return _reference.arrhenius(params, T_REF, temps)
+
+    fxn_dct = {
+        'single_arrhenius': (
+            lambda temps, _: ratefit.calc.single_arrhenius(
+                *SGL_PARAMS, T_REF, temps),
+            lambda temps, _: _reference.single_arrhenius(
+                *SGL_PARAMS, T_REF, temps),
+            False),
+        'double_arrhenius': (
+            lambda temps, _: ratefit.calc.double_arrhenius(
+                *DBL_PARAMS, T_REF, temps),
+            lambda temps, _: _reference.double_arrhenius(
+                *DBL_PARAMS, T_REF, temps),
+            False),
+        'lindemann': (
+            lambda temps, pressures: ratefit.calc.lindemann(
+                _kts(HIGHP_PARAMS, temps), _kts(LOWP_PARAMS, temps),
+                temps, pressures),
+            lambda temps, pressures: _reference.lindemann(
+                _kts(HIGHP_PARAMS, temps), _kts(LOWP_PARAMS, temps),
+                temps, pressures),
+            True),
+        'troe': (
+            lambda temps, pressures: ratefit.calc.troe(
+                _kts(HIGHP_PARAMS, temps), _kts(LOWP_PARAMS, temps),
+                temps, pressures, *TROE_PARAMS),
+            lambda temps, pressures: _reference.troe(
+                _kts(HIGHP_PARAMS, temps), _kts(LOWP_PARAMS, temps),
+                temps, pressures, *TROE_PARAMS),
+            True),
+        'plog': (
+            lambda temps, pressures: ratefit.calc.plog(
+                PLOG_DCT, T_REF, temps, pressures),
+            lambda temps, pressures: _reference.plog(
+                PLOG_DCT, T_REF, temps, pressures),
+            True),
+        'chebyshev': (
+            lambda temps, pressures: ratefit.calc.chebyshev(
+                CHEB_ALPHA, *CHEB_LIMITS, temps, pressures),
+            lambda temps, pressures: _reference.chebyshev(
+                CHEB_ALPHA, *CHEB_LIMITS, temps, pressures),
+            True),
+    }
+
+    return fxn_dct[kernel]
+
+
+def grid(npoints, pdep):
+    """ Temperatures and pressures of a grid of about npoints points
+
+        :param npoints: number of (T, P) points
+        :type npoints: int
+        :param pdep: whether the grid has several pressures
+        :type pdep: bool
+        :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    npres = NPRES if pdep else 1
+    temps = numpy.linspace(*TEMP_RANGE, max(npoints // npres, 1))
+    pressures = numpy.logspace(*LOG_PRESSURE_RANGE, npres)
+
+    return temps, pressures
+
+
+def kp_array(out, pressures):
+    """ Stack the output of a kernel into an (nP, nT) array
+
+        :param out: k(T)s, or k(T)s at each pressure
+        :type out: numpy.ndarray or dict
+        :param pressures: pressures of the grid
+        :type pressures: numpy.ndarray
+        :rtype: numpy.ndarray
+    """
+    if not isinstance(out, dict):
+        return numpy.atleast_2d(out)
+    kts_lst = []
+    for pressure in pressures:
+        kts = out[pressure]
+        kts_lst.append(kts[1] if isinstance(kts, tuple) else kts)
+    return numpy.array(kts_lst)
+
+
+def bench_kernel(kernel, sizes, nrepeat=3, ref_max=10000):
+    """ Time a kernel and check it against its reference on grids of
+        several sizes
+
+        :param kernel: name of the kernel in KERNELS
+        :type kernel: str
+        :param sizes: numbers of grid points
+        :type sizes: list(int)
+        :param nrepeat: number of runs per measurement
+        :type nrepeat: int
+        :param ref_max: largest grid on which the reference is timed
+        :type ref_max: int
+        :rtype: list(dict)
+    """
+    fxn, ref_fxn, pdep = kernel_fxns(kernel)
+    results = []
+    for size in sizes:
+        temps, pressures = grid(size, pdep)
+        dur, out = _util.best_time(
+            lambda temps=temps, pressures=pressures: fxn(temps, pressures),
+            nrepeat=nrepeat)
+        kps = kp_array(out, pressures)
+
+        # Check a subset of the temperatures against the reference
+        idxs = numpy.unique(
+            numpy.linspace(0, len(temps)-1, NCHECK).astype(int))
+        ref_kps = kp_array(ref_fxn(temps[idxs], pressures), pressures)
+        max_err = float(numpy.max(
+            numpy.abs(kps[:, idxs] - ref_kps) / numpy.abs(ref_kps)))
+
+        ref_dur = None
+        if temps.size * pressures.size <= ref_max:
+            ref_dur, _ = _util.best_time(
+                lambda temps=temps, pressures=pressures: ref_fxn(
+                    temps, pressures),
+                nrepeat=nrepeat)
+
+        npoints = temps.size * (pressures.size if pdep else 1)
+        results.append(dict(
+            kernel=kernel, npoints=npoints, ntemps=temps.size,
+            npres=pressures.size if pdep else None, time=dur,
+            ref_time=ref_dur,
+            speedup=ref_dur / dur if ref_dur is not None else None,
+            max_rel_err=max_err))
+        speedup = (f'{ref_dur / dur:9.1f}x' if ref_dur is not None
+                   else f'{"-":>10s}')
+        print(f'{kernel:<18s}{npoints:>9d}{dur:12.3e} s{speedup}'
+              f'{max_err:12.2e}')
+
+    return results
+
+
+def main():
+    """ Run the benchmarks selected on the command line
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='Time and check the ratefit.calc kernels')
+    arg_parser.add_argument(
+        '--kernels', nargs='+', default=list(KERNELS), choices=list(KERNELS))
+    arg_parser.add_argument(
+        '--sizes', nargs='+', type=int, default=list(SIZES),
+        help='numbers of (T, P) points of the grids')
+    arg_parser.add_argument(
+        '--rtol', type=float, default=1.0e-8,
+        help='largest relative deviation allowed from the reference')
+    arg_parser.add_argument(
+        '--ref-max', type=int, default=10000,
+        help='largest grid on which the reference is timed')
+    _util.add_common_args(arg_parser, 'bench_kernels.json')
+    args = arg_parser.parse_args()
+
+    print(f'{"kernel":<18s}{"points":>9s}{"time":>14s}{"speedup":>10s}'
+          f'{"max err":>12s}')
+    results = []
+    for kernel in args.kernels:
+        results.extend(bench_kernel(
+            kernel, args.sizes, nrepeat=args.repeat, ref_max=args.ref_max))
+
+    inaccurate = [result for result in results
+                  if not result['max_rel_err'] <= args.rtol]
+    for result in inaccurate:
+        print(f"{result['kernel']} at {result['npoints']} points deviates "
+              f"from the reference by {result['max_rel_err']:.2e}")
+
+    _util.finish(results, args, KEY_FIELDS, sizes=args.sizes, rtol=args.rtol,
+                 npres=NPRES, temp_range=TEMP_RANGE,
+                 log_pressure_range=LOG_PRESSURE_RANGE, nrepeat=args.repeat)
+    if inaccurate:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+""" Time the mechanism-analysis pipeline on the mechanisms bundled with the
+    tests: parse -> evaluate -> thermo -> sort -> compare -> check, with the
+    grid-dependent stages run at several temperature/pressure grid sizes.
+
+    Usage:
+        python benchmarks/bench_pipeline.py [-o results.json]
+            [-b baseline.json] [--mechs heptane syngas] [--grids small]
+
+    Results are written as JSON; with --baseline, the timings are compared
+    with those of a previous run and the script exits with an error if any
+    stage became slower than the tolerance.
+"""
+
+import os
+import argparse
+import numpy
+import ioformat.pathtools as parser
+from chemkin_io.parser import mechanism as parser_mech
+from chemkin_io.parser import thermo as parser_thermo
+from mechanalyzer.parser import mech as mparser
+from mechanalyzer.parser import spc as sparser
+from mechanalyzer.builder import sorter
+from mechanalyzer.builder import checker
+from mechanalyzer.calculator import rates as calc_rates
+from mechanalyzer.calculator import thermo as calc_thermo
+from mechanalyzer.calculator import compare
+import _util
+
+
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', 'mechanalyzer', 'tests', 'data')
+
+# name: (mechanism file, species file, thermo file)
+MECHS = {
+    'llnl_ic8': ('LLNL_IC8_red_mech.dat', 'LLNL_species.csv', None),
+    'nuig': ('NUIG_mechred.dat', 'NUIG_species.csv', None),
+    'heptane': ('heptane_mechanism.txt', 'heptane_species.csv', 'thermo.txt'),
+    'syngas': ('syngas_mechanism.txt', 'syngas_species.csv', None),
+}
+
+# name: (number of temperatures, number of pressures)
+GRIDS = {
+    'small': (10, 3),
+    'medium': (50, 5),
+    'large': (200, 10),
+}
+TEMP_RANGE = (300.0, 2500.0)  # K
+PRESSURE_RANGE = (0.1, 100.0)  # atm
+
+STAGES = ('parse', 'evaluate', 'thermo', 'sort', 'compare', 'check')
+SORT_LST = ['pes', 'subpes', 0]
+K_THRESHOLDS = [1e11, 1e15, 1e22]
+RXN_NUM_THRESHOLD = 2
+
+KEY_FIELDS = ('mech', 'stage', 'grid')
+
+
+def grid_arrays(grid):
+    """ Temperatures and pressures of a named grid
+
+        :param grid: name of the grid in GRIDS
+        :type grid: str
+        :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    ntemps, npres = GRIDS[grid]
+    temps = numpy.linspace(*TEMP_RANGE, ntemps)
+    pressures = numpy.logspace(*numpy.log10(PRESSURE_RANGE), npres)
+
+    return temps, pressures
+
+
+def bench_mech(mech, grids, stages, nrepeat=3):
+    """ Time the stages of the pipeline on one mechanism. Stages that are
+        not requested but needed by others are run once, untimed. The
+        thermo and compare stages need a thermo file and are skipped
+        for mechanisms without one.
+
+        :param mech: name of the mechanism in MECHS
+        :type mech: str
+        :param grids: names of the grids in GRIDS
+        :type grids: list(str)
+        :param stages: stages to time
+        :type stages: list(str)
+        :param nrepeat: number of runs per measurement
+        :type nrepeat: int
+        :rtype: list(dict)
+    """
+    mech_file, spc_file, thermo_file = MECHS[mech]
+    mech_str = parser.read_file(DATA_PATH, mech_file)
+    spc_str = parser.read_file(DATA_PATH, spc_file)
+    thermo_str = (parser.read_file(DATA_PATH, thermo_file)
+                  if thermo_file is not None else None)
+    results = []
+
+    def _run(stage, fxn, grid=None, **info):
+        """ Time a stage if it was requested; otherwise just run it
+        """
+        if stage in stages:
+            dur, out = _util.best_time(fxn, nrepeat=nrepeat)
+            ntemps, npres = GRIDS[grid] if grid is not None else (None, None)
+            results.append(dict(mech=mech, stage=stage, grid=grid,
+                                ntemps=ntemps, npres=npres, time=dur, **info))
+            print(f'{mech:<10s}{stage:<10s}{str(grid):<8s}{dur:10.4f} s')
+        else:
+            out = fxn()
+        return out
+
+    def _parse():
+        spc_dct = sparser.build_spc_dct(spc_str, 'csv')
+        rxn_param_dct, mech_info, _ = mparser.parse_mechanism(
+            mech_str, 'chemkin', spc_dct)
+        spc_nasa7_dct = None
+        if thermo_str is not None:
+            spc_nasa7_dct = parser_thermo.create_spc_nasa7_dct(
+                parser_mech.thermo_block(thermo_str))
+        return spc_dct, rxn_param_dct, mech_info, spc_nasa7_dct
+
+    spc_dct, rxn_param_dct, mech_info, spc_nasa7_dct = _run('parse', _parse)
+    info = {'nrxns': len(rxn_param_dct), 'nspcs': len(spc_dct)}
+    results = [dict(result, **info) for result in results]
+
+    if 'sort' in stages:
+        _run('sort', lambda: sorter.sorting(mech_info, spc_dct, SORT_LST, []),
+             **info)
+
+    # Only the grid-dependent stages that are needed are run for each grid
+    need_ktps = {'evaluate', 'compare', 'check'} & set(stages)
+    need_thermo = ({'thermo', 'compare'} & set(stages) and
+                   spc_nasa7_dct is not None)
+    rxn_ktp_dct = spc_thermo_dct = None
+    for grid in grids:
+        temps, pressures = grid_arrays(grid)
+        if need_ktps:
+            rxn_ktp_dct = _run(
+                'evaluate',
+                lambda temps=temps, pressures=pressures:
+                calc_rates.eval_rxn_param_dct(
+                    rxn_param_dct, pressures, temps),
+                grid=grid, **info)
+        if need_thermo:
+            spc_thermo_dct = _run(
+                'thermo',
+                lambda temps=temps: calc_thermo.create_spc_thermo_dct(
+                    spc_nasa7_dct, temps),
+                grid=grid, **info)
+            if 'compare' in stages:
+                _run('compare',
+                     lambda temps=temps, rxn_ktp_dct=rxn_ktp_dct,
+                     spc_thermo_dct=spc_thermo_dct: _compare(
+                         rxn_ktp_dct, spc_thermo_dct, spc_dct, temps),
+                     grid=grid, **info)
+        if 'check' in stages:
+            _run('check',
+                 lambda rxn_ktp_dct=rxn_ktp_dct: checker.run_all_checks(
+                     rxn_param_dct, rxn_ktp_dct, K_THRESHOLDS,
+                     RXN_NUM_THRESHOLD),
+                 grid=grid, **info)
+
+    return results
+
+
+def _compare(rxn_ktp_dct, spc_thermo_dct, spc_dct, temps):
+    """ Compare a mechanism with a copy of itself in which every reaction is
+        written in reverse, so that every rate gets reversed
+    """
+    rev_rxn_ktp_dct = {(prds, rcts, third_bods): ktp_dct
+                       for (rcts, prds, third_bods), ktp_dct
+                       in rxn_ktp_dct.items()}
+    return compare.get_aligned_rxn_ktp_dct(
+        [rxn_ktp_dct, rev_rxn_ktp_dct], [spc_thermo_dct, spc_thermo_dct],
+        [spc_dct, spc_dct], temps, rev_rates=True, remove_loners=True)
+
+
+def main():
+    """ Run the benchmarks selected on the command line
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='Time the mechanism-analysis pipeline')
+    arg_parser.add_argument(
+        '--mechs', nargs='+', default=list(MECHS), choices=list(MECHS))
+    arg_parser.add_argument(
+        '--grids', nargs='+', default=list(GRIDS), choices=list(GRIDS))
+    arg_parser.add_argument(
+        '--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    _util.add_common_args(arg_parser, 'bench_pipeline.json')
+    args = arg_parser.parse_args()
+
+    results = []
+    for mech in args.mechs:
+        results.extend(
+            bench_mech(mech, args.grids, args.stages, nrepeat=args.repeat))
+
+    _util.finish(results, args, KEY_FIELDS,
+                 grids={grid: GRIDS[grid] for grid in args.grids},
+                 temp_range=TEMP_RANGE, pressure_range=PRESSURE_RANGE,
+                 nrepeat=args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,18 @@ calculates derived quantities from the strings of the species
 from mechanalyzer.calculator import rates
 from mechanalyzer.calculator import thermo
 from mechanalyzer.calculator import compare
+from mechanalyzer.calculator import compiled
+from mechanalyzer.calculator import cache
+from mechanalyzer.calculator import lazy
+from mechanalyzer.calculator import equil
 
 
 __all__ = [
     'rates',
     'thermo',
-    'compare'
+    'compare',
+    'compiled',
+    'cache',
+    'lazy',
+    'equil',
 ]
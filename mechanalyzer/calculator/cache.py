@@ -0,0 +1,452 @@
+"""
+Cache the rates and thermo of a mechanism so that only the reactions and
+species whose parameters have changed are re-evaluated
+"""
+
+import os
+import hashlib
+import numbers
+from collections import OrderedDict
+import numpy
+from mechanalyzer.calculator import rates
+from mechanalyzer.calculator import thermo
+
+
+def param_hash(param_tups):
+    """ Stable hash of the rate parameters of a reaction. Equal parameters
+        hash alike regardless of list/tuple/array containers, int/float
+        values, or the order of dictionary entries.
+
+        :param param_tups: parameters of a reaction (one per duplicate)
+        :type param_tups: tuple(param_tup)
+        :rtype: str
+    """
+    hsh = hashlib.sha1()
+    _update_hash(hsh, param_tups)
+    return hsh.hexdigest()
+
+
+def nasa7_hash(cfts, t_lims):
+    """ Stable hash of the NASA-7 polynomials of a species, independent of
+        its name
+
+        :param cfts: low-T and high-T coefficients of the species
+        :type cfts: numpy.ndarray (2, 7)
+        :param t_lims: low, mid, and high temperatures of the species
+        :type t_lims: numpy.ndarray (3,)
+        :rtype: str
+    """
+    hsh = hashlib.sha1()
+    _update_hash(hsh, cfts)
+    _update_hash(hsh, t_lims)
+    return hsh.hexdigest()
+
+
+def grid_hash(pressures, temps, log10=False):
+    """ Stable hash of the pressures and temperatures a mechanism is
+        evaluated on
+
+        :param pressures: pressures (atm)
+        :type pressures: list(float)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray
+        :param log10: whether log10 k(T,P)s are returned
+        :type log10: bool
+        :rtype: str
+    """
+    hsh = hashlib.sha1()
+    _update_hash(hsh, (pressures, temps, str(bool(log10))))
+    return hsh.hexdigest()
+
+
+class _DiskCache:
+    """ Entries kept in memory and, given a path, on disk as one
+        content-addressed file per entry, so that they are shared across
+        runs. With max_size set, the least recently used files are evicted
+        once the files of the cache grow beyond it; with max_entries set,
+        the least recently used entries are dropped from memory once there
+        are more of them.
+    """
+
+    suffix = '.npz'
+
+    def __init__(self, path=None, max_size=None, max_entries=None):
+        """ :param path: directory of the on-disk cache; memory only if None
+            :type path: str
+            :param max_size: size limit of the on-disk cache (bytes)
+            :type max_size: int
+            :param max_entries: number of entries kept in memory
+            :type max_entries: int
+        """
+        self.path = path
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.nhits = 0
+        self.nmisses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def disk_size(self):
+        """ Total size of the files of the on-disk cache (bytes)
+
+            :rtype: int
+        """
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _clear_disk(self):
+        """ Delete the files of the on-disk cache
+        """
+        if self.path is not None:
+            for _, _, file_path in self._disk_entries():
+                _remove(file_path)
+
+    def _trim(self, entries, keys):
+        """ Mark the entries of keys, held in memory in recency order, as
+            the most recently used, then drop the least recently used ones
+            beyond max_entries
+        """
+        for key in keys:
+            entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def _on_disk(self, temps):
+        """ Whether entries on a temperature grid are kept on disk; only
+            1-D temperatures, shared by every pressure, are supported
+        """
+        return self.path is not None and numpy.ndim(temps) == 1
+
+    def _file_path(self, key):
+        """ Content-addressed file of an entry
+        """
+        name = hashlib.sha1(''.join(key).encode()).hexdigest()
+        return os.path.join(self.path, name + self.suffix)
+
+    def _save(self, key, save_fxn):
+        """ Write an entry to disk with save_fxn(file object), atomically so
+            that concurrent runs never see a partial file
+        """
+        file_path = self._file_path(key)
+        tmp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fobj:
+            save_fxn(fobj)
+        os.replace(tmp_path, file_path)
+
+    def _evict(self):
+        """ Delete the least recently used files until the on-disk cache
+            fits within its size limit
+        """
+        if self.max_size is None:
+            return
+        entries = sorted(self._disk_entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_path in entries:
+            if total_size <= self.max_size:
+                break
+            _remove(file_path)
+            total_size -= size
+
+    def _disk_entries(self):
+        """ (last use, size, path) of each file of the on-disk cache; files
+            evicted by another process while scanning are skipped
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+
+class EvalCache(_DiskCache):
+    """ Rates of previously evaluated reactions, keyed on the hash of their
+        parameters and of the (P, T) grid.
+
+        Calling eval_rxn_param_dct on a tweaked mechanism only evaluates
+        the reactions whose parameters (or whose grid) changed; the
+        ktp_dcts of all others are reused. The ktp_dcts handed out are
+        shared with the cache and must not be modified in place.
+
+        Given a path, the cache is also kept on disk, one content-addressed
+        .npz file per entry, so that it is shared across runs and across
+        mechanisms with reactions in common. With max_size set, the least
+        recently used files are evicted once the cache grows beyond it, and
+        with max_entries set, the least recently used ktp_dcts are dropped
+        from memory once there are more of them.
+    """
+
+    def __init__(self, path=None, max_size=None, max_entries=None):
+        """ :param path: directory of the on-disk cache; memory only if None
+            :type path: str
+            :param max_size: size limit of the on-disk cache (bytes)
+            :type max_size: int
+            :param max_entries: number of ktp_dcts kept in memory
+            :type max_entries: int
+        """
+        super().__init__(path=path, max_size=max_size,
+                         max_entries=max_entries)
+        self.ktp_dcts = OrderedDict()
+
+    def eval_rxn_param_dct(self, rxn_param_dct, pressures, temps,
+                           log10=False):
+        """ Get a rxn_ktp_dct, evaluating only the reactions not yet cached;
+            same arguments and output as rates.eval_rxn_param_dct
+
+            :param rxn_param_dct: rate parameters for a mechanism
+            :type rxn_param_dct: dct {rxn1: (param_tup1, ...), ...}
+            :param pressures: pressures (atm)
+            :type pressures: list(float)
+            :param temps: temperatures (K)
+            :type temps: numpy.ndarray
+            :param log10: return log10 k(T,P)s instead of k(T,P)s
+            :type log10: bool
+            :return rxn_ktp_dct: rate constants for each reaction
+            :rtype: dct {rxn1: ktp_dct1, rxn2: ...}
+        """
+
+        grid_key = grid_hash(pressures, temps, log10=log10)
+        rxn_keys = {rxn: (param_hash(param_tups), grid_key)
+                    for rxn, param_tups in rxn_param_dct.items()}
+
+        # Evaluate the missing reactions together, one per distinct key
+        missing_dct = {}
+        for rxn, key in rxn_keys.items():
+            if key in self.ktp_dcts or key in missing_dct:
+                continue
+            ktp_dct = self._read(key, pressures, temps)
+            if ktp_dct is not None:
+                self.ktp_dcts[key] = ktp_dct
+            else:
+                missing_dct[key] = rxn_param_dct[rxn]
+        self.nmisses += len(missing_dct)
+        self.nhits += len(rxn_keys) - len(missing_dct)
+        if missing_dct:
+            new_ktp_dcts = rates.eval_rxn_param_dct(
+                missing_dct, pressures, temps, log10=log10)
+            self.ktp_dcts.update(new_ktp_dcts)
+            if self._on_disk(temps):
+                for key, ktp_dct in new_ktp_dcts.items():
+                    self._write(key, ktp_dct, pressures)
+                self._evict()
+
+        rxn_ktp_dct = {rxn: self.ktp_dcts[key]
+                       for rxn, key in rxn_keys.items()}
+        self._trim(self.ktp_dcts, rxn_keys.values())
+
+        return rxn_ktp_dct
+
+    def prune(self, rxn_param_dct, pressures, temps, log10=False):
+        """ Drop every entry held in memory that is not used by a mechanism
+            on a grid (the on-disk cache is left as is)
+
+            :param rxn_param_dct: rate parameters for a mechanism
+            :type rxn_param_dct: dct {rxn1: (param_tup1, ...), ...}
+        """
+        grid_key = grid_hash(pressures, temps, log10=log10)
+        keep = {(param_hash(param_tups), grid_key)
+                for param_tups in rxn_param_dct.values()}
+        self.ktp_dcts = OrderedDict(
+            (key, ktp_dct) for key, ktp_dct in self.ktp_dcts.items()
+            if key in keep)
+
+    def clear(self, disk=False):
+        """ Drop every entry held in memory, and optionally on disk
+
+            :param disk: also delete the files of the on-disk cache
+            :type disk: bool
+        """
+        self.ktp_dcts = OrderedDict()
+        self.nhits = 0
+        self.nmisses = 0
+        if disk:
+            self._clear_disk()
+
+    def _read(self, key, pressures, temps):
+        """ Read an entry from disk, marking it as recently used; None if
+            it is not on disk
+        """
+        if not self._on_disk(temps):
+            return None
+        file_path = self._file_path(key)
+        try:
+            with numpy.load(file_path) as npz:
+                pidxs, kts, high = npz['pidxs'], npz['kts'], npz['high']
+        except (OSError, KeyError, ValueError):  # absent or unreadable
+            return None
+        os.utime(file_path)
+
+        # The grid hash matches, so the caller's pressures and temps apply
+        keys = [pressures[pidx] for pidx in pidxs]
+        if high:
+            keys.append('high')
+        return {key: (temps, row) for key, row in zip(keys, kts)}
+
+    def _write(self, key, ktp_dct, pressures):
+        """ Write an entry to disk; pressures are stored by their index in
+            the grid
+        """
+        keys = [pressure for pressure in ktp_dct if pressure != 'high']
+        pidxs = [list(pressures).index(pressure) for pressure in keys]
+        if 'high' in ktp_dct:
+            keys.append('high')
+        kts = numpy.array([ktp_dct[pkey][1] for pkey in keys])
+
+        self._save(key, lambda fobj: numpy.savez(
+            fobj, pidxs=numpy.array(pidxs, dtype=int), kts=kts,
+            high='high' in ktp_dct))
+
+
+class ThermoCache(_DiskCache):
+    """ Thermo of previously evaluated species, keyed on the hash of their
+        NASA-7 polynomials and of the temperature grid.
+
+        Calling create_spc_thermo_dct only evaluates the species whose
+        polynomials (or whose grid) are not cached, whatever their names.
+        Given a path, the (4, nT) arrays of H, Cp, S, and G of each species
+        are also kept on disk as .npy files, with the same LRU eviction
+        (on disk and in memory) as EvalCache.
+    """
+
+    suffix = '.npy'
+
+    def __init__(self, path=None, max_size=None, max_entries=None):
+        """ :param path: directory of the on-disk cache; memory only if None
+            :type path: str
+            :param max_size: size limit of the on-disk cache (bytes)
+            :type max_size: int
+            :param max_entries: number of thermo arrays kept in memory
+            :type max_entries: int
+        """
+        super().__init__(path=path, max_size=max_size,
+                         max_entries=max_entries)
+        self.thermo_arrs = OrderedDict()
+
+    def create_spc_thermo_dct(self, spc_nasa7_dct, temps, rval=thermo.RC):
+        """ Get a spc_thermo_dct, evaluating only the species not yet
+            cached; same arguments and output as thermo.create_spc_thermo_dct
+
+            :param spc_nasa7_dct: NASA-7 polynomials of each species
+            :type spc_nasa7_dct: dct {spc1: nasa7_dct1, spc2: ...}
+            :param temps: temperatures (K)
+            :type temps: list
+            :param rval: universal gas constant (units decided by the user)
+            :type rval: float
+            :return spc_thermo_dct: arrays of T, h(T), cp(T), s(T), and g(T)
+            :rtype: dct {spc1: thermo_array1, spc2: ...}
+        """
+        if not spc_nasa7_dct:
+            return {}
+        temps = numpy.array(temps)
+        spcs, cfts, t_lims = thermo.stack_nasa7_params(spc_nasa7_dct)
+
+        hsh = hashlib.sha1()
+        _update_hash(hsh, temps)
+        _update_hash(hsh, rval)
+        grid_key = hsh.hexdigest()
+        keys = [(nasa7_hash(cfts[idx], t_lims[idx]), grid_key)
+                for idx in range(len(spcs))]
+
+        # Evaluate the missing species together, one per distinct key
+        missing_dct = {}
+        for idx, key in enumerate(keys):
+            if key in self.thermo_arrs or key in missing_dct:
+                continue
+            thermo_arr = self._read(key, temps)
+            if thermo_arr is not None:
+                self.thermo_arrs[key] = thermo_arr
+            else:
+                missing_dct[key] = idx
+        self.nmisses += len(missing_dct)
+        self.nhits += len(keys) - len(missing_dct)
+        if missing_dct:
+            idxs = list(missing_dct.values())
+            new_arrs = numpy.stack(thermo.nasa7_thermo(
+                cfts[idxs], t_lims[idxs], temps, rval=rval), axis=1)
+            for key, thermo_arr in zip(missing_dct, new_arrs):
+                self.thermo_arrs[key] = thermo_arr
+                if self._on_disk(temps):
+                    self._save(key, lambda fobj, arr=thermo_arr:
+                               numpy.save(fobj, arr))
+            if self._on_disk(temps):
+                self._evict()
+
+        thermo_arrs = numpy.array([self.thermo_arrs[key] for key in keys])
+        self._trim(self.thermo_arrs, keys)
+        return thermo.build_spc_thermo_dct(
+            spcs, tuple(numpy.moveaxis(thermo_arrs, 1, 0)), t_lims, temps)
+
+    def clear(self, disk=False):
+        """ Drop every entry held in memory, and optionally on disk
+
+            :param disk: also delete the files of the on-disk cache
+            :type disk: bool
+        """
+        self.thermo_arrs = OrderedDict()
+        self.nhits = 0
+        self.nmisses = 0
+        if disk:
+            self._clear_disk()
+
+    def _read(self, key, temps):
+        """ Read an entry from disk, marking it as recently used; None if
+            it is not on disk
+        """
+        if not self._on_disk(temps):
+            return None
+        file_path = self._file_path(key)
+        try:
+            thermo_arr = numpy.load(file_path)
+        except (OSError, ValueError):  # absent or unreadable
+            return None
+        if thermo_arr.shape != (4, len(temps)):
+            return None
+        os.utime(file_path)
+
+        return thermo_arr
+
+
+def _update_hash(hsh, obj):
+    """ Feed a canonical byte representation of an object into a hash
+    """
+    if obj is None:
+        hsh.update(b'N')
+    elif isinstance(obj, str):
+        hsh.update(b'S' + obj.encode() + b'\0')
+    elif isinstance(obj, dict):
+        hsh.update(b'{')
+        for key in sorted(obj, key=lambda key: (isinstance(key, str), key)):
+            _update_hash(hsh, key)
+            _update_hash(hsh, obj[key])
+        hsh.update(b'}')
+    elif isinstance(obj, (list, tuple)) and not _is_numeric(obj):
+        hsh.update(b'(')
+        for item in obj:
+            _update_hash(hsh, item)
+        hsh.update(b')')
+    else:  # numbers and arrays of numbers
+        arr = numpy.asarray(obj, dtype=float)
+        hsh.update(b'A' + str(arr.shape).encode())
+        hsh.update(numpy.ascontiguousarray(arr).tobytes())
+
+
+def _is_numeric(seq):
+    """ Whether a (possibly nested) sequence holds only numbers
+    """
+    return all(
+        _is_numeric(item) if isinstance(item, (list, tuple)) else
+        isinstance(item, (numbers.Number, numpy.ndarray))
+        for item in seq)
+
+
+def _remove(file_path):
+    """ Delete a file of an on-disk cache, unless another process already
+        evicted it
+    """
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
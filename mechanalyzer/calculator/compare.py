@@ -3,20 +3,15 @@
 """
 
 import copy
-import itertools
-import numpy
 import ioformat.pathtools as parser
-from phydat import phycon
 from chemkin_io.parser import mechanism as parser_mech
 from chemkin_io.parser import thermo as parser_thermo
 from chemkin_io.parser import reaction as parser_rxn
 from chemkin_io.writer import _util as writer_util
-import ratefit
 from mechanalyzer.parser import spc as parser_spc
 from mechanalyzer.calculator import thermo as calc_thermo
 from mechanalyzer.calculator import rates as calc_rates
-
-RC_CAL = phycon.RC_CAL  # universal gas constant in cal/mol-K
+from mechanalyzer.calculator import equil as calc_equil
 
 
 def get_aligned_rxn_ktp_dct(rxn_ktp_dcts, spc_thermo_dcts, spc_ident_dcts, temps,
@@ -414,7 +409,7 @@ def reverse_rxn_ktp_dcts(renamed_rxn_ktp_dcts, renamed_spc_thermo_dcts, temps, r
         :rtype: list of dcts [rxn_ktp_dct1, rxn_ktp_dct2, ...]
     """
     num_mechs = len(renamed_rxn_ktp_dcts)
-    reversed_rxn_ktp_dcts = copy.deepcopy(renamed_rxn_ktp_dcts)  # deepcopy so no external changes
+    reversed_rxn_ktp_dcts = list(renamed_rxn_ktp_dcts)  # inputs are never modified
     for mech_idx in range(num_mechs-1):
         rxn_ktp_dct1 = renamed_rxn_ktp_dcts[mech_idx]
         for idx2 in range(mech_idx+1, num_mechs):
@@ -451,18 +446,19 @@ def reverse_rxn_ktp_dct(rxn_ktp_dct1, rxn_ktp_dct2, spc_thermo_dct1, temps, rev_
         :param rev_rates: whether or not rates should be reversed
         :type rev_rates: Bool
     """
-    rev_rxn_ktp_dct2 = copy.deepcopy(rxn_ktp_dct2)  # deepcopy to prevent external changes
+    rev_rxn_ktp_dct2 = dict(rxn_ktp_dct2)  # copy to prevent external changes
+    rev_rxns = {}  # {rxn1: rxn2} for the rxns whose rates are reversed
+    match_idx = _rxn_match_index(rxn_ktp_dct2)
     for rxn1 in rxn_ktp_dct1.keys():  # search through all rxns in rxn_ktp_dct1
-        rxn2, rev_rate = assess_rxn_match(rxn1, rxn_ktp_dct2)
+        rxn2, rev_rate = assess_rxn_match(rxn1, rxn_ktp_dct2, match_idx=match_idx)
         # Only do something if a match was found
         if rxn2 is not None:
             # If the user indicated to reverse rates, check if they need to be
             if rev_rates:
                 if rev_rate:
-                    ktp_dct2 = rxn_ktp_dct2[rxn2]
-                    rev_ktp_dct2 = reverse_ktp_dct(ktp_dct2, spc_thermo_dct1, rxn2, temps)
+                    rev_rxns[rxn1] = rxn2
                     rev_rxn_ktp_dct2.pop(rxn2)
-                    rev_rxn_ktp_dct2[rxn1] = rev_ktp_dct2
+                    rev_rxn_ktp_dct2[rxn1] = None  # filled in below
                 # If a match was found that does not need to be reversed but has rcts and prds
                 # written differently, align rcts and prds
                 elif rxn1 != rxn2:
@@ -475,6 +471,12 @@ def reverse_rxn_ktp_dct(rxn_ktp_dct1, rxn_ktp_dct2, spc_thermo_dct1, temps, rev_
                 rev_rxn_ktp_dct2[rxn1] = rev_rxn_ktp_dct2[rxn2]
                 rev_rxn_ktp_dct2.pop(rxn2)
 
+    # Reverse the rates of all flipped rxns at once
+    rev_ktp_dcts = calc_equil.reverse_rxn_ktp_dct(
+        {rxn2: rxn_ktp_dct2[rxn2] for rxn2 in rev_rxns.values()}, spc_thermo_dct1, temps)
+    for rxn1, rxn2 in rev_rxns.items():
+        rev_rxn_ktp_dct2[rxn1] = rev_ktp_dcts[rxn2]
+
     return rev_rxn_ktp_dct2
 
 
@@ -493,31 +495,10 @@ def reverse_ktp_dct(ktp_dct, spc_thermo_dct, rxn, temps):
         :return rev_ktp_dct: k(T,P) dct of the reversed reaction
         :type ktp_dct: dict {pressure1: (temp_array1, rates_array1), pressure2: ...}
     """
-    [rcts, prds, _] = rxn
-    k_equils = _calculate_equilibrium_constant(spc_thermo_dct, rcts, prds, temps)
-    rev_ktp_dct = {}
-    for pressure, (_, kts) in ktp_dct.items():
-
-        # Calculate density to handle units, if needed
-        if len(rcts) > 1 and len(prds) == 1:
-            densities = ratefit.calc.p_to_m(1.0, temps)
-            kts *= densities
-        elif len(rcts) == 1 and len(prds) > 1:
-            densities = ratefit.calc.p_to_m(1.0, temps)
-            kts /= densities
-
-        # Calculate the reverse rates with K_equil
-        rev_rates = []
-        for forw_k, k_equil in zip(kts, k_equils):
-            rev_rates.append(forw_k / k_equil)
+    return calc_equil.reverse_rxn_ktp_dct({rxn: ktp_dct}, spc_thermo_dct, temps)[rxn]
 
-        # Add reversed rates to dict
-        rev_ktp_dct[pressure] = (temps, rev_rates)
 
-    return rev_ktp_dct
-
-
-def assess_rxn_match(rxn1, rxn_ktp_dct2):
+def assess_rxn_match(rxn1, rxn_ktp_dct2, match_idx=None):
     """ Assess whether the reaction should be flipped. Takes a rxn_name from mech1 and searches
         through all of mech2 in search of a matching rxn. If a matching rxn is found, returns the
         matching rxn name and whether the rxn should be flipped
@@ -531,80 +512,58 @@ def assess_rxn_match(rxn1, rxn_ktp_dct2):
         :type rxn1: tuple (rcts, prds, third_bods)
         :param rxn_ktp_dct2: rxn_ktp_dct for mech2
         :type rxn_ktp_dct2: dict {rxn1: ktp_dct1, rxn2: ...}
+        :param match_idx: index of the rxns of mech2, from _rxn_match_index; built if None
+        :type match_idx: dict
         :return matching_rxn: rxn key for the matching reaction
         :rtype: tuple (rcts, prds, third_bods)
         :return rev_rate: whether or not the rate should be reversed
         :rtype: Bool
     """
-    # Get all possible orderings of the reactants and products for mech1
+    if match_idx is None:
+        match_idx = _rxn_match_index(rxn_ktp_dct2)
+
+    # Look up the rxns of mech2 with the same rcts and prds (in any order), written in either
+    # direction, and go through them in the order of mech2
     [rcts1, prds1, third_bods1] = rxn1
-    third_bod1 = third_bods1[0]
-    rcts1_perm = list(itertools.permutations(rcts1, len(rcts1)))
-    prds1_perm = list(itertools.permutations(prds1, len(prds1)))
+    rcts1, prds1 = tuple(sorted(rcts1)), tuple(sorted(prds1))
+    matches = (
+        [(pos, False, rxn2) for pos, rxn2 in match_idx.get((rcts1, prds1, third_bods1[0]), ())] +
+        [(pos, True, rxn2) for pos, rxn2 in match_idx.get((prds1, rcts1, third_bods1[0]), ())]
+    )
+    matches.sort(key=lambda match: match[:2])
 
     matching_rxn_name = None
     rev_rate = None
-    already_found = False
-    for rxn2 in rxn_ktp_dct2.keys():
-        [rcts2, prds2, third_bods2] = rxn2
-        third_bod2 = third_bods2[0]
-        if rcts2 in rcts1_perm and prds2 in prds1_perm and third_bod1 == third_bod2:
-            matching_rxn_name = rxn2
-            rev_rate = False
-            if already_found:
-                rxn_name1 = writer_util.format_rxn_name(rxn1)
-                rxn_name2 = writer_util.format_rxn_name(rxn2)
-                print(f'For the reaction {rxn_name1}, more than one match was found: {rxn_name2}')
-                print('This will cause errors!')
-            else:
-                already_found = True
-
-        if rcts2 in prds1_perm and prds2 in rcts1_perm and third_bod1 == third_bod2:
-            matching_rxn_name = rxn2
-            rev_rate = True
-            if already_found:
-                rxn_name1 = writer_util.format_rxn_name(rxn1)
-                rxn_name2 = writer_util.format_rxn_name(rxn2)
-                print(f'For the reaction {rxn_name1}, more than one match was found: {rxn_name2}')
-                print('This will cause errors!')
-            else:
-                already_found = True
+    for match_num, (_, rev_rate, rxn2) in enumerate(matches):
+        matching_rxn_name = rxn2
+        if match_num > 0:
+            rxn_name1 = writer_util.format_rxn_name(rxn1)
+            rxn_name2 = writer_util.format_rxn_name(rxn2)
+            print(f'For the reaction {rxn_name1}, more than one match was found: {rxn_name2}')
+            print('This will cause errors!')
 
     return matching_rxn_name, rev_rate
 
 
-def _calculate_equilibrium_constant(spc_thermo_dct, rcts, prds, temps):
-    """ Calculate the equilibrium constant for a given reaction at
-        a set of temperatures using constituent species' thermochemistry.
+def _rxn_match_index(rxn_ktp_dct):
+    """ Index the rxns of a rxn_ktp_dct by their sorted rcts and prds and their third body,
+        along with their position in the dct, so that matching rxns are found by lookup
 
-        :param spc_thermo_dct: thermochemical values for all species in mechanism
-        :type spc_thermo_dct: dict {spc1: thermo_array1, spc2: ...}
-        :param rcts: name(s) of reactant(s)
-        :type rcts: tuple (rct1, rct2, ...)
-        :param prds: name(s) of product(s)
-        :type prds: tuple (prd1, prd2, ...)
-        :param temps: temperatures at which to do calculations (Kelvin)
-        :type temps: list [float]
-        :return k_equils: equilibrium constant at each temperature
-        :rtype: list [float]
+        :param rxn_ktp_dct: rxn_ktp_dct for a mech
+        :type rxn_ktp_dct: dict {rxn1: ktp_dct1, rxn2: ...}
+        :return match_idx: rxns under each (rcts, prds, third_bod)
+        :rtype: dict {(rcts, prds, third_bod): [(pos1, rxn1), ...], ...}
     """
-    k_equils = []
-    for temp_idx, temp in enumerate(temps):
-        rct_gibbs = 0.0
-        for rct in rcts:
-            rct_gibbs += spc_thermo_dct[rct][4][temp_idx]  # [4] accesses Gibbs
-
-        prd_gibbs = 0.0
-        for prd in prds:
-            prd_gibbs += spc_thermo_dct[prd][4][temp_idx]  # [4] accesses Gibbs
-
-        rxn_gibbs = prd_gibbs - rct_gibbs
-        k_equils.append(numpy.exp(-rxn_gibbs / (RC_CAL * temp)))
+    match_idx = {}
+    for pos, rxn in enumerate(rxn_ktp_dct):
+        [rcts, prds, third_bods] = rxn
+        key = (tuple(sorted(rcts)), tuple(sorted(prds)), third_bods[0])
+        match_idx.setdefault(key, []).append((pos, rxn))
 
-    return k_equils
+    return match_idx
 
 
-def load_rxn_ktp_dcts_chemkin(mech_filenames, direc, temps, pressures):
+def load_rxn_ktp_dcts_chemkin(mech_filenames, direc, temps, pressures, cache=None):
     """ Read one or more Chemkin-formatted mechanisms files and calculate rates at the indicated
         pressures and temperatures. Return a list of rxn_ktp_dcts.
 
@@ -616,6 +575,9 @@ def load_rxn_ktp_dcts_chemkin(mech_filenames, direc, temps, pressures):
         :type temps: list [float]
         :param pressures: pressures at which to do calculations (atm)
         :type pressures: list [float]
+        :param cache: cache to reuse the rates of previously evaluated reactions
+            (in memory, or on disk across runs and mechanisms)
+        :type cache: mechanalyzer.calculator.cache.EvalCache
         :return rxn_ktp_dcts: list of rxn_ktp_dcts
         :rtype: list of dcts [rxn_ktp_dct1, rxn_ktp_dct2, ...]
     """
@@ -625,13 +587,14 @@ def load_rxn_ktp_dcts_chemkin(mech_filenames, direc, temps, pressures):
         ea_units, a_units = parser_mech.reaction_units(mech_str)
         rxn_block_str = parser_mech.reaction_block(mech_str)
         rxn_param_dct = parser_rxn.param_dct(rxn_block_str, ea_units, a_units)
-        rxn_ktp_dct = calc_rates.eval_rxn_param_dct(rxn_param_dct, pressures, temps)
+        rxn_ktp_dct = calc_rates.eval_rxn_param_dct(
+            rxn_param_dct, pressures, temps, cache=cache)
         rxn_ktp_dcts.append(rxn_ktp_dct)
 
     return rxn_ktp_dcts
 
 
-def load_spc_thermo_dcts_chemkin(thermo_filenames, direc, temps):
+def load_spc_thermo_dcts_chemkin(thermo_filenames, direc, temps, cache=None):
     """ Reads one or more Chemkin-formatted thermo files and calculates thermo at the indicated
         temperatures. Outputs a list of spc_thermo_dcts.
 
@@ -641,6 +604,9 @@ def load_spc_thermo_dcts_chemkin(thermo_filenames, direc, temps):
         :type direc: str
         :param temps: temperatures at which to do calculations (Kelvin)
         :type temps: list [float]
+        :param cache: cache to reuse the thermo of previously evaluated species
+            (in memory, or on disk across runs and thermo files)
+        :type cache: mechanalyzer.calculator.cache.ThermoCache
         :return spc_thermo_dcts: list of spc_thermo_dcts
         :rtype: list of dcts [spc_thermo_dct1, spc_thermo_dct2, ...]
     """
@@ -649,7 +615,8 @@ def load_spc_thermo_dcts_chemkin(thermo_filenames, direc, temps):
         thermo_str = parser.read_file(direc, thermo_filename)
         thermo_block_str = parser_mech.thermo_block(thermo_str)
         spc_nasa7_dct = parser_thermo.create_spc_nasa7_dct(thermo_block_str)
-        spc_thermo_dct = calc_thermo.create_spc_thermo_dct(spc_nasa7_dct, temps)
+        spc_thermo_dct = calc_thermo.create_spc_thermo_dct(
+            spc_nasa7_dct, temps, cache=cache)
         spc_thermo_dcts.append(spc_thermo_dct)
 
     return spc_thermo_dcts
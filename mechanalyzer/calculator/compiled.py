@@ -0,0 +1,748 @@
+"""
+Compile a rxn_param_dct into stacked parameter arrays, grouped by the
+type of rate expression, so that the rates of every reaction in a
+mechanism can be evaluated with a handful of array operations
+"""
+
+import os
+import heapq
+import multiprocessing
+import numpy
+import ratefit.calc
+import ratefit.ktptable
+
+
+EXPR_TYPES = ('arrhenius', 'lindemann', 'troe', 'plog', 'chebyshev')
+
+
+def compile_rxn_param_dct(rxn_param_dct, t_ref=1.0):
+    """ Sort every param_tup in a rxn_param_dct by its expression type and
+        pack the parameters of each type into stacked numpy arrays.
+
+        Every expression (including each duplicate of a reaction) is one
+        entry in its group; 'rxn_idxs' maps it back to its reaction,
+        'tup_idxs' gives its position among the param_tups of the
+        reaction, 'firsts' flags the first expression of each reaction,
+        and 'dups' flags the expressions of reactions with duplicates.
+
+        :param rxn_param_dct: rate parameters for a mechanism
+        :type rxn_param_dct: dct {rxn1: (param_tup1, param_tup2, ...), ...}
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :return cmp_dct: compiled parameters
+        :rtype: dct {'rxns': [rxn1, ...], 't_ref': float,
+                     expr_type1: group_dct1, expr_type2: ...}
+    """
+
+    grp_lsts = {expr_type: ([], [], []) for expr_type in EXPR_TYPES}
+    for rxn_idx, param_tups in enumerate(rxn_param_dct.values()):
+        for tup_idx, param_tup in enumerate(param_tups):
+            rxn_idxs, tup_idxs, grp_tups = grp_lsts[
+                expression_type(param_tup)]
+            rxn_idxs.append(rxn_idx)
+            tup_idxs.append(tup_idx)
+            grp_tups.append(param_tup)
+
+    nexprs = numpy.array([len(tups) for tups in rxn_param_dct.values()])
+    cmp_dct = {'rxns': list(rxn_param_dct.keys()), 't_ref': t_ref}
+    for expr_type, (rxn_idxs, tup_idxs, grp_tups) in grp_lsts.items():
+        grp_dct = _STACKERS[expr_type](grp_tups)
+        grp_dct['rxn_idxs'] = numpy.array(rxn_idxs, dtype=int)
+        grp_dct['tup_idxs'] = numpy.array(tup_idxs, dtype=int)
+        grp_dct['firsts'] = grp_dct['tup_idxs'] == 0
+        grp_dct['dups'] = nexprs[grp_dct['rxn_idxs']] > 1
+        cmp_dct[expr_type] = grp_dct
+
+    return cmp_dct
+
+
+def expression_type(param_tup):
+    """ Determine which type of rate expression a param_tup describes,
+        using the same precedence as rates.eval_param_tup.
+
+        :param param_tup: parameters for a single rate expression
+        :type param_tup: tuple
+        :return expr_type: 'arrhenius', 'lindemann', 'troe', 'plog', or
+            'chebyshev'
+        :rtype: str
+    """
+    if param_tup[3] is not None:
+        expr_type = 'chebyshev'
+    elif param_tup[4] is not None:
+        expr_type = 'plog'
+    elif param_tup[2] is not None:
+        assert param_tup[0] is not None, (
+            'Troe parameters are included,',
+            'but the high-P parameters are absent'
+            )
+        assert param_tup[1] is not None, (
+            'Troe and high-P parameters are included,',
+            'but the low-P parameters are absent'
+            )
+        expr_type = 'troe'
+    elif param_tup[1] is not None:
+        assert param_tup[0] is not None, (
+            'Low-P parameters are included,',
+            'but the high-P parameters are absent'
+            )
+        expr_type = 'lindemann'
+    else:
+        assert param_tup[0] is not None, (
+            'The param_tup does not seem to contain any useful information.'
+            )
+        expr_type = 'arrhenius'
+
+    return expr_type
+
+
+def eval_compiled(cmp_dct, pressures, temps, log10=False, tables=False,
+                  derivs=False):
+    """ Evaluate every reaction in a compiled mechanism and return a
+        rxn_ktp_dct identical in layout to rates.eval_rxn_param_dct.
+
+        With tables=True, each reaction gets a ratefit KTPTable instead of
+        a ktp_dct; its rates are views of one dense array wherever the
+        reaction is defined at every pressure. With derivs=True, the
+        derivatives d ln k / d(1/T) and d ln k / d ln P are returned too,
+        each as a dct laid out like the rxn_ktp_dct.
+
+        :param cmp_dct: compiled parameters from compile_rxn_param_dct
+        :type cmp_dct: dct
+        :param pressures: pressures at which to evaluate (atm)
+        :type pressures: list(float)
+        :param temps: temperatures at which to evaluate (K)
+        :type temps: numpy.ndarray (1-D)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :param tables: return a KTPTable for each reaction
+        :type tables: bool
+        :param derivs: also return the derivatives of the k(T,P)s
+        :type derivs: bool
+        :return rxn_ktp_dct: rate constants for each reaction
+        :rtype: dct {rxn1: ktp_dct1, rxn2: ...}
+    """
+    if derivs:
+        assert not tables, 'Derivatives are returned as ktp_dcts'
+        arrs = eval_dense(cmp_dct, pressures, temps, derivs=True)
+        valid = arrs[1]
+        return tuple(
+            unpack_dense(cmp_dct['rxns'], arr, valid, pressures, temps)
+            for arr in (arrs[0],) + arrs[2:])
+
+    ktp_arr, valid = eval_dense(cmp_dct, pressures, temps, log10=log10)
+    return unpack_dense(
+        cmp_dct['rxns'], ktp_arr, valid, pressures, temps, tables=tables)
+
+
+def unpack_dense(rxns, ktp_arr, valid, pressures, temps, tables=False):
+    """ Unpack a dense rate array from eval_dense into a rxn_ktp_dct. The
+        k(T)s of the ktp_dcts (or KTPTables) are views of the array.
+
+        :param rxns: reactions, in the order of the rows of the array
+        :type rxns: list
+        :param ktp_arr: rate constants from eval_dense
+        :type ktp_arr: numpy.ndarray (nrxn, nP+1, nT)
+        :param valid: where each reaction has a value
+        :type valid: numpy.ndarray(bool) (nrxn, nP+1)
+        :param tables: return a KTPTable for each reaction
+        :type tables: bool
+        :rtype: dct {rxn1: ktp_dct1, rxn2: ...}
+    """
+    if tables:
+        return _rxn_ktp_tables(rxns, ktp_arr, valid, pressures, temps)
+    return _rxn_ktp_dct(rxns, ktp_arr, valid, pressures, temps)
+
+
+def eval_points(cmp_dct, temps, pressures, log10=False):
+    """ Evaluate every reaction in a compiled mechanism at a set of paired
+        (T, P) points, such as the states along a reactor trajectory.
+
+        Duplicate expressions are added together, with P-independent
+        expressions contributing at every point. A reaction is NaN only
+        at points where none of its expressions is defined (e.g., a PLOG
+        pressure outside of the ranges of all its duplicates), as when
+        adding the ktp_dcts of the duplicates at a single (T, P).
+
+        :param cmp_dct: compiled parameters from compile_rxn_param_dct
+        :type cmp_dct: dct
+        :param temps: temperature of each point (K)
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: pressure of each point (atm)
+        :type pressures: numpy.ndarray (npts,)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: rate constants, one row per reaction in cmp_dct['rxns']
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+
+    temps = numpy.asarray(temps, dtype=float)
+    pressures = numpy.asarray(pressures, dtype=float)
+    assert temps.ndim == 1 and temps.shape == pressures.shape, (
+        'Points require 1-D arrays of paired temperatures and pressures')
+
+    ktps = numpy.zeros((len(cmp_dct['rxns']), len(temps)))
+    defined = numpy.zeros(ktps.shape, dtype=bool)
+    dup_idxs = []
+    for expr_type in EXPR_TYPES:
+        grp_dct = cmp_dct[expr_type]
+        if log10:
+            dups = grp_dct['dups']
+            parts = ((_take_terms(grp_dct, ~dups), True),
+                     (_take_terms(grp_dct, dups), False))
+            dup_idxs.append(grp_dct['rxn_idxs'][dups])
+        else:
+            parts = ((grp_dct, False),)
+
+        for part_dct, part_log10 in parts:
+            if not part_dct['rxn_idxs'].size:
+                continue
+            grp_vals = _POINT_EVALUATORS[expr_type](
+                part_dct, cmp_dct['t_ref'], temps, pressures, part_log10)
+
+            # Undefined values add nothing; duplicates only need add.at
+            rxn_idxs, firsts = part_dct['rxn_idxs'], part_dct['firsts']
+            grp_defined = ~numpy.isnan(grp_vals)
+            grp_vals = numpy.where(grp_defined, grp_vals, 0.0)
+            ktps[rxn_idxs[firsts]] += grp_vals[firsts]
+            defined[rxn_idxs[firsts]] |= grp_defined[firsts]
+            numpy.add.at(ktps, rxn_idxs[~firsts], grp_vals[~firsts])
+            numpy.logical_or.at(
+                defined, rxn_idxs[~firsts], grp_defined[~firsts])
+
+    if dup_idxs:
+        dup_idxs = numpy.unique(numpy.concatenate(dup_idxs))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ktps[dup_idxs] = numpy.log10(ktps[dup_idxs])
+    ktps[~defined] = numpy.nan
+
+    return ktps
+
+
+def eval_dense(cmp_dct, pressures, temps, log10=False, derivs=False):
+    """ Evaluate every group of a compiled mechanism and sum the results
+        onto a dense array with one row per reaction, in the order of
+        cmp_dct['rxns'].
+
+        The pressure axis holds the input pressures followed by the
+        high-pressure limit. Duplicate expressions are scatter-added
+        together; entries are valid where the first expression of a
+        reaction that is defined anywhere is defined. This is the rule of
+        rates.eval_rxn_param_dct, which starts from the first non-empty
+        ktp_dct of the duplicates and adds the others onto its keys.
+
+        For log10 output, reactions without duplicates are evaluated in
+        log space throughout; duplicates (whose A factors may be negative)
+        are summed linearly before taking the log.
+
+        With derivs=True, the analytic derivatives d ln k / d(1/T) and
+        d ln k / d ln P are evaluated in the same pass, with the batch
+        derivative kernels of ratefit.calc. The derivatives of a sum of
+        duplicates are the k-weighted averages of their derivatives, and
+        are NaN where the summed k is zero.
+
+        :param cmp_dct: compiled parameters from compile_rxn_param_dct
+        :type cmp_dct: dct
+        :param pressures: pressures at which to evaluate (atm)
+        :type pressures: list(float)
+        :param temps: temperatures at which to evaluate (K)
+        :type temps: numpy.ndarray (1-D)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :param derivs: also return the derivatives of the k(T,P)s
+        :type derivs: bool
+        :return ktp_arr: rate constants, NaN where not valid
+        :rtype: numpy.ndarray (nrxn, nP+1, nT)
+        :return valid: where each reaction has a value
+        :rtype: numpy.ndarray(bool) (nrxn, nP+1)
+        :return dinvt_arr, dlnp_arr: if derivs, d ln k / d(1/T) and
+            d ln k / d ln P, NaN where not valid
+        :rtype: numpy.ndarray (nrxn, nP+1, nT)
+    """
+
+    assert numpy.ndim(temps) == 1, (
+        'Compiled evaluation requires a 1-D array of temperatures')
+    assert not (log10 and derivs), (
+        'Derivatives are returned along with k(T,P)s, not log10 k(T,P)s')
+    temps = numpy.asarray(temps, dtype=float)
+    pressures = numpy.asarray(pressures, dtype=float)
+    nrxns, npres = len(cmp_dct['rxns']), len(pressures)
+
+    # Rates, followed by the (k-weighted, for duplicates) derivatives
+    arrs = [numpy.zeros((nrxns, npres+1, len(temps)))
+            for _ in range(3 if derivs else 1)]
+    ktp_arr = arrs[0]
+    valid = numpy.zeros((nrxns, npres+1), dtype=bool)
+    valid_parts = []
+    dup_idxs = []
+    for expr_type in EXPR_TYPES:
+        grp_dct = cmp_dct[expr_type]
+        if log10:
+            dups = grp_dct['dups']
+            parts = ((_take_terms(grp_dct, ~dups), True),
+                     (_take_terms(grp_dct, dups), False))
+            dup_idxs.append(grp_dct['rxn_idxs'][dups])
+        else:
+            parts = ((grp_dct, False),)
+
+        for part_dct, part_log10 in parts:
+            if not part_dct['rxn_idxs'].size:
+                continue
+            grp_arrs, grp_valid = _group_vals(
+                expr_type, part_dct, cmp_dct['t_ref'], temps, pressures,
+                part_log10, derivs=derivs)
+            if derivs:
+                dups = part_dct['dups'][:, None, None]
+                grp_arrs[1:] = [numpy.where(dups, grp_arrs[0] * vals, vals)
+                                for vals in grp_arrs[1:]]
+
+            # Scatter-add onto the reactions; duplicates only need add.at
+            rxn_idxs, firsts = part_dct['rxn_idxs'], part_dct['firsts']
+            for arr, grp_vals in zip(arrs, grp_arrs):
+                arr[rxn_idxs[firsts]] += grp_vals[firsts]
+                numpy.add.at(arr, rxn_idxs[~firsts], grp_vals[~firsts])
+            valid_parts.append((rxn_idxs, part_dct['tup_idxs'], grp_valid))
+
+    # Take the validity of the first expression defined somewhere
+    undefined = numpy.iinfo(int).max
+    first_tups = numpy.full(nrxns, undefined)
+    for rxn_idxs, tup_idxs, grp_valid in valid_parts:
+        numpy.minimum.at(first_tups, rxn_idxs, numpy.where(
+            grp_valid.any(axis=1), tup_idxs, undefined))
+    for rxn_idxs, tup_idxs, grp_valid in valid_parts:
+        keep = tup_idxs == first_tups[rxn_idxs]
+        valid[rxn_idxs[keep]] = grp_valid[keep]
+
+    if dup_idxs:
+        dup_idxs = numpy.unique(numpy.concatenate(dup_idxs))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ktp_arr[dup_idxs] = numpy.log10(ktp_arr[dup_idxs])
+
+    # Turn the k-weighted sums of the derivatives of duplicates into
+    # averages, leaving NaN where the summed k is zero
+    if derivs:
+        dups = numpy.zeros(nrxns, dtype=bool)
+        for expr_type in EXPR_TYPES:
+            grp_dct = cmp_dct[expr_type]
+            dups[grp_dct['rxn_idxs'][grp_dct['dups']]] = True
+        dup_kts = ktp_arr[dups]
+        for arr in arrs[1:]:
+            arr[dups] = numpy.divide(
+                arr[dups], dup_kts, out=numpy.full(dup_kts.shape, numpy.nan),
+                where=dup_kts != 0.0)
+    for arr in arrs:
+        arr[~valid] = numpy.nan
+
+    if derivs:
+        return ktp_arr, valid, arrs[1], arrs[2]
+    return ktp_arr, valid
+
+
+def eval_dense_parallel(rxn_param_dct, pressures, temps, log10=False,
+                        nprocs=None, t_ref=1.0):
+    """ Evaluate a mechanism onto a dense rate array, as with eval_dense,
+        splitting the reactions across several processes.
+
+        The reactions are partitioned so that each process gets a similar
+        estimated cost (see expression_cost). Every process compiles and
+        evaluates its own reactions and writes them straight into an array
+        in shared memory, so no rates are pickled back to the parent.
+
+        :param rxn_param_dct: rate parameters for a mechanism
+        :type rxn_param_dct: dct {rxn1: (param_tup1, param_tup2, ...), ...}
+        :param pressures: pressures at which to evaluate (atm)
+        :type pressures: list(float)
+        :param temps: temperatures at which to evaluate (K)
+        :type temps: numpy.ndarray (1-D)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :param nprocs: number of processes; defaults to one fewer than the
+            number of available processors
+        :type nprocs: int
+        :return ktp_arr: rate constants, NaN where not valid
+        :rtype: numpy.ndarray (nrxn, nP+1, nT)
+        :return valid: where each reaction has a value
+        :rtype: numpy.ndarray(bool) (nrxn, nP+1)
+    """
+
+    if nprocs is None:
+        affinity = getattr(os, 'sched_getaffinity', None)
+        ncpus = len(affinity(0)) if affinity else os.cpu_count()
+        nprocs = max((ncpus or 1) - 1, 1)
+    nprocs = min(nprocs, len(rxn_param_dct))
+    if nprocs <= 1:
+        cmp_dct = compile_rxn_param_dct(rxn_param_dct, t_ref=t_ref)
+        return eval_dense(cmp_dct, pressures, temps, log10=log10)
+
+    # Shared output buffers, written to by the workers
+    shape = (len(rxn_param_dct), len(pressures)+1, len(temps))
+    ktp_buf = multiprocessing.RawArray('d', int(numpy.prod(shape)))
+    valid_buf = multiprocessing.RawArray('b', shape[0] * shape[1])
+
+    rxns = list(rxn_param_dct.keys())
+    procs = []
+    for rxn_idxs in partition_rxns(rxn_param_dct, nprocs, len(pressures)):
+        sub_rxn_param_dct = {rxns[idx]: rxn_param_dct[rxns[idx]]
+                             for idx in rxn_idxs}
+        proc = multiprocessing.Process(
+            target=_eval_dense_part,
+            args=(ktp_buf, valid_buf, shape, rxn_idxs, sub_rxn_param_dct,
+                  pressures, temps, log10, t_ref))
+        procs.append(proc)
+        proc.start()
+    for proc in procs:
+        proc.join()
+    # Checked explicitly (not asserted) so that the rates of a crashed
+    # worker are never silently dropped, even under python -O
+    failed = [(proc.name, proc.exitcode) for proc in procs
+              if proc.exitcode != 0]
+    if failed:
+        raise RuntimeError(
+            'Worker processes failed while evaluating the rates: ' +
+            ', '.join(f'{name} (exit code {code})' for name, code in failed))
+
+    ktp_arr = numpy.frombuffer(ktp_buf, dtype=float).reshape(shape)
+    valid = numpy.frombuffer(valid_buf, dtype=numpy.int8).reshape(
+        shape[:2]).view(bool)
+
+    return ktp_arr, valid
+
+
+def partition_rxns(rxn_param_dct, nparts, npres=1):
+    """ Split the reactions of a mechanism into groups of similar total
+        cost, assigning the most expensive reactions first (greedy LPT).
+
+        :param rxn_param_dct: rate parameters for a mechanism
+        :type rxn_param_dct: dct {rxn1: (param_tup1, param_tup2, ...), ...}
+        :param nparts: number of groups
+        :type nparts: int
+        :param npres: number of pressures the rates are evaluated at
+        :type npres: int
+        :return parts: sorted indices of the reactions in each group
+        :rtype: list(list(int))
+    """
+    costs = [sum(expression_cost(param_tup, npres) for param_tup in tups)
+             for tups in rxn_param_dct.values()]
+    heap = [(0.0, part_idx) for part_idx in range(nparts)]
+    parts = [[] for _ in range(nparts)]
+    for rxn_idx in numpy.argsort(costs)[::-1]:
+        load, part_idx = heapq.heappop(heap)
+        parts[part_idx].append(int(rxn_idx))
+        heapq.heappush(heap, (load + costs[rxn_idx], part_idx))
+
+    return [sorted(part) for part in parts if part]
+
+
+def expression_cost(param_tup, npres=1):
+    """ Relative cost of evaluating a rate expression at each temperature,
+        in units of one Arrhenius term
+
+        :param param_tup: parameters for a single rate expression
+        :type param_tup: tuple
+        :param npres: number of pressures the rate is evaluated at
+        :type npres: int
+        :rtype: float
+    """
+    expr_type = expression_type(param_tup)
+    if expr_type == 'arrhenius':
+        cost = 1.0
+    elif expr_type == 'lindemann':
+        cost = 2.0 + npres
+    elif expr_type == 'troe':
+        cost = 4.0 + 2.0 * npres
+    elif expr_type == 'plog':
+        cost = 2.0 * len(param_tup[4]) + 2.0 * npres
+    else:
+        cost = numpy.size(param_tup[3]['alpha_elm']) * npres / 2.0
+
+    return cost
+
+
+def _eval_dense_part(ktp_buf, valid_buf, shape, rxn_idxs, rxn_param_dct,
+                     pressures, temps, log10, t_ref):
+    """ Evaluate part of a mechanism in a worker process and store the
+        rates in the rows of the shared output buffers
+    """
+    cmp_dct = compile_rxn_param_dct(rxn_param_dct, t_ref=t_ref)
+    ktp_arr, valid = eval_dense(cmp_dct, pressures, temps, log10=log10)
+
+    numpy.frombuffer(ktp_buf, dtype=float).reshape(shape)[rxn_idxs] = ktp_arr
+    numpy.frombuffer(valid_buf, dtype=numpy.int8).reshape(
+        shape[:2])[rxn_idxs] = valid
+
+
+def _group_vals(expr_type, grp_dct, t_ref, temps, pressures, log10,
+                derivs=False):
+    """ Evaluate one group of expressions onto the (nP+1) pressure layout
+
+        :return grp_arrs: rate constants, followed by d ln k / d(1/T) and
+            d ln k / d ln P if derivs, all zero where not valid
+        :rtype: list(numpy.ndarray (nterm, nP+1, nT))
+        :return grp_valid: where each expression has a value
+        :rtype: numpy.ndarray(bool) (nterm, nP+1)
+    """
+    npres = len(pressures)
+    if derivs:
+        ktps, pvalid, highp_kts = _DERIV_EVALUATORS[expr_type](
+            grp_dct, t_ref, temps, pressures)
+    else:
+        ktps, pvalid, highp_kts = _EVALUATORS[expr_type](
+            grp_dct, t_ref, temps, pressures, log10)
+        ktps = None if ktps is None else (ktps,)
+        highp_kts = None if highp_kts is None else (highp_kts,)
+
+    nterms = len(grp_dct['rxn_idxs'])
+    grp_valid = numpy.zeros((nterms, npres+1), dtype=bool)
+    grp_arrs = [numpy.zeros((nterms, npres+1, len(temps)))
+                for _ in range(3 if derivs else 1)]
+    if ktps is not None:
+        grp_valid[:, :npres] = pvalid
+        for grp_vals, vals in zip(grp_arrs, ktps):
+            grp_vals[:, :npres] = numpy.where(pvalid[..., None], vals, 0.0)
+    if highp_kts is not None:
+        grp_valid[:, npres] = True
+        for grp_vals, vals in zip(grp_arrs, highp_kts):
+            grp_vals[:, npres] = vals  # d ln k / d ln P stays zero
+
+    return grp_arrs, grp_valid
+
+
+def _take_terms(grp_dct, mask):
+    """ Select a subset of the expressions in a group
+    """
+    return {key: val[mask] for key, val in grp_dct.items()}
+
+
+def _rxn_ktp_dct(rxns, ktp_arr, valid, pressures, temps):
+    """ Unpack a dense rate array into a rxn_ktp_dct. The k(T)s in each
+        ktp_dct are views of the rows of the array.
+    """
+    keys = list(pressures) + ['high']
+    rxn_ktp_dct = {}
+    for rxn_idx, rxn in enumerate(rxns):
+        ktp_dct = {}
+        for key_idx in numpy.flatnonzero(valid[rxn_idx]):
+            ktp_dct[keys[key_idx]] = (temps, ktp_arr[rxn_idx, key_idx])
+        rxn_ktp_dct[rxn] = ktp_dct
+
+    return rxn_ktp_dct
+
+
+def _rxn_ktp_tables(rxns, ktp_arr, valid, pressures, temps):
+    """ Unpack a dense rate array into a KTPTable for each reaction
+    """
+    npres = len(pressures)
+    rxn_ktp_dct = {}
+    for rxn_idx, rxn in enumerate(rxns):
+        pvalid = valid[rxn_idx, :npres]
+        if numpy.all(pvalid):
+            rxn_pressures, kts = pressures, ktp_arr[rxn_idx, :npres]
+        else:
+            rxn_pressures = [pressure for pressure, keep
+                             in zip(pressures, pvalid) if keep]
+            kts = ktp_arr[rxn_idx, :npres][pvalid]
+        highp_kts = ktp_arr[rxn_idx, npres] if valid[rxn_idx, npres] else None
+        rxn_ktp_dct[rxn] = ratefit.ktptable.KTPTable(
+            temps, rxn_pressures, kts, highp_kts=highp_kts)
+
+    return rxn_ktp_dct
+
+
+# Functions to stack the parameters of each expression type
+def _stack_arrhenius(param_tups):
+    return {'params': _stack_params(param_tups, 0)}
+
+
+def _stack_lindemann(param_tups):
+    return {'highp_params': _stack_params(param_tups, 0),
+            'lowp_params': _stack_params(param_tups, 1)}
+
+
+def _stack_troe(param_tups):
+    troe_params = numpy.full((len(param_tups), 4), numpy.nan)
+    for idx, param_tup in enumerate(param_tups):
+        troe_params[idx, :len(param_tup[2])] = param_tup[2]
+    grp_dct = _stack_lindemann(param_tups)
+    grp_dct['troe_params'] = troe_params
+    return grp_dct
+
+
+def _stack_plog(param_tups):
+    plog_pressures, plog_params = ratefit.calc.stack_plog(
+        [tup[4] for tup in param_tups])
+    return {'plog_pressures': plog_pressures, 'plog_params': plog_params}
+
+
+def _stack_chebyshev(param_tups):
+    alphas, t_limits, p_limits = ratefit.calc.stack_chebyshev(
+        [tup[3] for tup in param_tups])
+    return {'alphas': alphas, 't_limits': t_limits, 'p_limits': p_limits}
+
+
+def _stack_params(param_tups, idx):
+    return ratefit.calc.stack_arrhenius([tup[idx] for tup in param_tups])
+
+
+# Functions to evaluate each group: (k(T,P)s, validity, high-P k(T)s)
+def _eval_arrhenius(grp_dct, t_ref, temps, _, log10):
+    kts = ratefit.calc.arrhenius_batch(
+        grp_dct['params'], t_ref, temps, log10=log10)
+    return None, None, kts
+
+
+def _eval_lindemann(grp_dct, t_ref, temps, pressures, log10):
+    highp_kts, lowp_kts = _highp_lowp_kts(grp_dct, t_ref, temps, log10)
+    ktps = ratefit.calc.lindemann_batch(
+        highp_kts, lowp_kts, temps, pressures, log10=log10)
+    return ktps, _all_valid(ktps), highp_kts
+
+
+def _eval_troe(grp_dct, t_ref, temps, pressures, log10):
+    highp_kts, lowp_kts = _highp_lowp_kts(grp_dct, t_ref, temps, log10)
+    ktps = ratefit.calc.troe_batch(
+        highp_kts, lowp_kts, temps, pressures, grp_dct['troe_params'],
+        log10=log10)
+    return ktps, _all_valid(ktps), highp_kts
+
+
+def _eval_plog(grp_dct, t_ref, temps, pressures, log10):
+    plog_pressures = grp_dct['plog_pressures']
+    ktps = ratefit.calc.plog_batch(
+        plog_pressures, grp_dct['plog_params'], t_ref, temps, pressures,
+        log10=log10)
+    return ktps, _plog_valid(grp_dct, pressures), None
+
+
+def _eval_chebyshev(grp_dct, _, temps, pressures, log10):
+    ktps = ratefit.calc.chebyshev_batch(
+        grp_dct['alphas'], grp_dct['t_limits'], grp_dct['p_limits'],
+        temps, pressures, log10=log10)
+    return ktps, _all_valid(ktps), None
+
+
+# Functions to evaluate each group with derivatives:
+# ((k(T,P)s, d/d(1/T), d/d ln P), validity, (high-P k(T)s, d/d(1/T)))
+def _derivs_arrhenius(grp_dct, t_ref, temps, _):
+    highp_derivs = ratefit.calc.arrhenius_derivs_batch(
+        grp_dct['params'], t_ref, temps)
+    return None, None, highp_derivs
+
+
+def _derivs_lindemann(grp_dct, t_ref, temps, pressures):
+    highp_derivs, lowp_derivs = _highp_lowp_derivs(grp_dct, t_ref, temps)
+    ktp_derivs = ratefit.calc.lindemann_derivs_batch(
+        highp_derivs[0], lowp_derivs[0], temps, pressures, highp_derivs[1],
+        lowp_derivs[1])
+    return ktp_derivs, _all_valid(ktp_derivs[0]), highp_derivs
+
+
+def _derivs_troe(grp_dct, t_ref, temps, pressures):
+    highp_derivs, lowp_derivs = _highp_lowp_derivs(grp_dct, t_ref, temps)
+    ktp_derivs = ratefit.calc.troe_derivs_batch(
+        highp_derivs[0], lowp_derivs[0], temps, pressures,
+        grp_dct['troe_params'], highp_derivs[1], lowp_derivs[1])
+    return ktp_derivs, _all_valid(ktp_derivs[0]), highp_derivs
+
+
+def _derivs_plog(grp_dct, t_ref, temps, pressures):
+    ktp_derivs = ratefit.calc.plog_derivs_batch(
+        grp_dct['plog_pressures'], grp_dct['plog_params'], t_ref, temps,
+        pressures)
+    return ktp_derivs, _plog_valid(grp_dct, pressures), None
+
+
+def _derivs_chebyshev(grp_dct, _, temps, pressures):
+    ktp_derivs = ratefit.calc.chebyshev_derivs_batch(
+        grp_dct['alphas'], grp_dct['t_limits'], grp_dct['p_limits'],
+        temps, pressures)
+    return ktp_derivs, _all_valid(ktp_derivs[0]), None
+
+
+# Functions to evaluate each group at paired (T, P) points: k(T,P)s
+def _points_arrhenius(grp_dct, t_ref, temps, _, log10):
+    return ratefit.calc.arrhenius_batch(
+        grp_dct['params'], t_ref, temps, log10=log10)
+
+
+def _points_lindemann(grp_dct, t_ref, temps, pressures, log10):
+    highp_kts, lowp_kts = _highp_lowp_kts(grp_dct, t_ref, temps, log10)
+    return ratefit.calc.lindemann_points(
+        highp_kts, lowp_kts, temps, pressures, log10=log10)
+
+
+def _points_troe(grp_dct, t_ref, temps, pressures, log10):
+    highp_kts, lowp_kts = _highp_lowp_kts(grp_dct, t_ref, temps, log10)
+    return ratefit.calc.troe_points(
+        highp_kts, lowp_kts, temps, pressures, grp_dct['troe_params'],
+        log10=log10)
+
+
+def _points_plog(grp_dct, t_ref, temps, pressures, log10):
+    return ratefit.calc.plog_points(
+        grp_dct['plog_pressures'], grp_dct['plog_params'], t_ref, temps,
+        pressures, log10=log10)
+
+
+def _points_chebyshev(grp_dct, _, temps, pressures, log10):
+    return ratefit.calc.chebyshev_points(
+        grp_dct['alphas'], grp_dct['t_limits'], grp_dct['p_limits'],
+        temps, pressures, log10=log10)
+
+
+def _highp_lowp_kts(grp_dct, t_ref, temps, log10):
+    highp_kts = ratefit.calc.arrhenius_batch(
+        grp_dct['highp_params'], t_ref, temps, log10=log10)
+    lowp_kts = ratefit.calc.arrhenius_batch(
+        grp_dct['lowp_params'], t_ref, temps, log10=log10)
+    return highp_kts, lowp_kts
+
+
+def _highp_lowp_derivs(grp_dct, t_ref, temps):
+    highp_derivs = ratefit.calc.arrhenius_derivs_batch(
+        grp_dct['highp_params'], t_ref, temps)
+    lowp_derivs = ratefit.calc.arrhenius_derivs_batch(
+        grp_dct['lowp_params'], t_ref, temps)
+    return highp_derivs, lowp_derivs
+
+
+def _plog_valid(grp_dct, pressures):
+    plog_pressures = grp_dct['plog_pressures']
+    pmins = numpy.nanmin(plog_pressures, axis=1)[:, None]
+    pmaxs = numpy.nanmax(plog_pressures, axis=1)[:, None]
+    return (pressures[None, :] >= pmins) & (pressures[None, :] <= pmaxs)
+
+
+def _all_valid(ktps):
+    return numpy.ones(ktps.shape[:2], dtype=bool)
+
+
+_STACKERS = {
+    'arrhenius': _stack_arrhenius,
+    'lindemann': _stack_lindemann,
+    'troe': _stack_troe,
+    'plog': _stack_plog,
+    'chebyshev': _stack_chebyshev,
+}
+
+_EVALUATORS = {
+    'arrhenius': _eval_arrhenius,
+    'lindemann': _eval_lindemann,
+    'troe': _eval_troe,
+    'plog': _eval_plog,
+    'chebyshev': _eval_chebyshev,
+}
+
+_DERIV_EVALUATORS = {
+    'arrhenius': _derivs_arrhenius,
+    'lindemann': _derivs_lindemann,
+    'troe': _derivs_troe,
+    'plog': _derivs_plog,
+    'chebyshev': _derivs_chebyshev,
+}
+
+_POINT_EVALUATORS = {
+    'arrhenius': _points_arrhenius,
+    'lindemann': _points_lindemann,
+    'troe': _points_troe,
+    'plog': _points_plog,
+    'chebyshev': _points_chebyshev,
+}
@@ -0,0 +1,208 @@
+"""
+Equilibrium constants and reverse rates for many reactions at once
+"""
+
+import numpy
+import scipy.sparse
+from phydat import phycon
+import ratefit
+
+RC_CAL = phycon.RC_CAL  # universal gas constant in cal/mol-K
+
+
+def gibbs_matrix(spc_thermo_dct, spcs):
+    """ Stack the Gibbs free energies of a set of species into one array;
+        values that could not be calculated (None) become NaN
+
+        :param spc_thermo_dct: thermochemical values for all species
+        :type spc_thermo_dct: dict {spc1: thermo_array1, spc2: ...}
+        :param spcs: species, in the order of the rows of the array
+        :type spcs: list(str)
+        :return gibbs: Gibbs free energy of each species at each temperature
+        :rtype: numpy.ndarray (nspc, nT)
+    """
+    # [4] accesses Gibbs
+    return numpy.array([numpy.asarray(spc_thermo_dct[spc][4], dtype=float)
+                        for spc in spcs], dtype=float)
+
+
+def stoich_matrix(rxns, spcs):
+    """ Net stoichiometric coefficients (products minus reactants) of a
+        set of reactions, as a sparse matrix; third bodies are not counted
+
+        :param rxns: rxn keys, e.g., those of a rxn_param_dct
+        :type rxns: list(tuple (rcts, prds, third_bods))
+        :param spcs: species, in the order of the columns of the matrix
+        :type spcs: list(str)
+        :return stoich: net coefficient of each species in each reaction
+        :rtype: scipy.sparse.csr_matrix (nrxn, nspc)
+    """
+    spc_idx_dct = {spc: idx for idx, spc in enumerate(spcs)}
+    rows, cols, vals = [], [], []
+    for rxn_idx, (rcts, prds, _) in enumerate(rxns):
+        for spcs_, val in ((rcts, -1.0), (prds, 1.0)):
+            for spc in spcs_:
+                rows.append(rxn_idx)
+                cols.append(spc_idx_dct[spc])
+                vals.append(val)
+
+    # Repeated (row, col) entries, e.g., for A+A or A=>A+B, are summed
+    return scipy.sparse.csr_matrix(
+        (vals, (rows, cols)), shape=(len(rxns), len(spcs)))
+
+
+def delta_gibbs(stoich, gibbs):
+    """ Gibbs free energy of reaction of each reaction
+
+        :param stoich: net stoichiometric coefficients
+        :type stoich: scipy.sparse.csr_matrix or numpy.ndarray (nrxn, nspc)
+        :param gibbs: Gibbs free energies of the species
+        :type gibbs: numpy.ndarray (nspc, nT)
+        :return rxn_gibbs: Gibbs free energy of reaction (units of gibbs)
+        :rtype: numpy.ndarray (nrxn, nT)
+    """
+    return numpy.asarray(stoich.dot(gibbs))
+
+
+def delta_ns(stoich):
+    """ Change in the number of moles of each reaction
+
+        :param stoich: net stoichiometric coefficients
+        :type stoich: scipy.sparse.csr_matrix or numpy.ndarray (nrxn, nspc)
+        :rtype: numpy.ndarray (nrxn,)
+    """
+    return numpy.asarray(stoich.sum(axis=1)).ravel()
+
+
+def kp_equils(stoich, gibbs, temps, rval=RC_CAL):
+    """ Equilibrium constants in pressure units, Kp = exp(-dG/RT), with a
+        standard pressure of 1 atm
+
+        :param stoich: net stoichiometric coefficients
+        :type stoich: scipy.sparse.csr_matrix or numpy.ndarray (nrxn, nspc)
+        :param gibbs: Gibbs free energies of the species (units of rval)
+        :type gibbs: numpy.ndarray (nspc, nT)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param rval: universal gas constant, in the units of gibbs
+        :type rval: float
+        :return kps: Kp of each reaction at each temperature
+        :rtype: numpy.ndarray (nrxn, nT)
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    return numpy.exp(-delta_gibbs(stoich, gibbs) / (rval * temps))
+
+
+def kc_equils(stoich, gibbs, temps, rval=RC_CAL):
+    """ Equilibrium constants in concentration units (mol/cm^3)^dn,
+        Kc = Kp (P0/RT)^dn
+
+        :param stoich: net stoichiometric coefficients
+        :type stoich: scipy.sparse.csr_matrix or numpy.ndarray (nrxn, nspc)
+        :param gibbs: Gibbs free energies of the species (units of rval)
+        :type gibbs: numpy.ndarray (nspc, nT)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param rval: universal gas constant, in the units of gibbs
+        :type rval: float
+        :return kcs: Kc of each reaction at each temperature
+        :rtype: numpy.ndarray (nrxn, nT)
+    """
+    return numpy.exp(_log_kcs(stoich, gibbs, temps, rval=rval))
+
+
+def reverse_rate_factors(stoich, gibbs, temps, rval=RC_CAL):
+    """ Factors 1/Kc that turn forward rates into reverse rates, with Kc
+        in concentration units (mol/cm^3)^dn
+
+        :param stoich: net stoichiometric coefficients
+        :type stoich: scipy.sparse.csr_matrix or numpy.ndarray (nrxn, nspc)
+        :param gibbs: Gibbs free energies of the species (units of rval)
+        :type gibbs: numpy.ndarray (nspc, nT)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param rval: universal gas constant, in the units of gibbs
+        :type rval: float
+        :return factors: 1/Kc of each reaction at each temperature
+        :rtype: numpy.ndarray (nrxn, nT)
+    """
+    return numpy.exp(-_log_kcs(stoich, gibbs, temps, rval=rval))
+
+
+def mech_k_equils(rxns, spc_thermo_dct, temps, rval=RC_CAL):
+    """ Gibbs free energies of reaction and equilibrium constants of every
+        reaction of a mechanism
+
+        :param rxns: rxn keys, e.g., a rxn_param_dct or rxn_ktp_dct
+        :type rxns: list(tuple (rcts, prds, third_bods))
+        :param spc_thermo_dct: thermochemical values for all species, at temps
+        :type spc_thermo_dct: dict {spc1: thermo_array1, spc2: ...}
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param rval: universal gas constant, in the units of the thermo
+        :type rval: float
+        :return rxn_gibbs, kps, kcs: dG, Kp, and Kc of each reaction, in the
+            order of rxns
+        :rtype: tuple(numpy.ndarray (nrxn, nT))
+    """
+    rxns = list(rxns)
+    temps = numpy.asarray(temps, dtype=float)
+    if not rxns:
+        empty = numpy.zeros((0, len(temps)))
+        return empty, empty, empty
+    spcs = sorted({spc for rcts, prds, _ in rxns for spc in rcts + prds})
+    stoich = stoich_matrix(rxns, spcs)
+
+    # Kc = Kp (P0/RT)^dn, from the same dG
+    rxn_gibbs = delta_gibbs(stoich, gibbs_matrix(spc_thermo_dct, spcs))
+    kps = numpy.exp(-rxn_gibbs / (rval * temps))
+    kcs = kps * ratefit.calc.p_to_m(1.0, temps)**delta_ns(stoich)[:, None]
+
+    return rxn_gibbs, kps, kcs
+
+
+def reverse_rxn_ktp_dct(rxn_ktp_dct, spc_thermo_dct, temps):
+    """ Reverse the rates of every reaction of a rxn_ktp_dct at once. The
+        k(T)s of each ktp_dct must be given at temps. The input is not
+        modified.
+
+        :param rxn_ktp_dct: rate constants of the reactions to reverse
+        :type rxn_ktp_dct: dict {rxn1: ktp_dct1, rxn2: ...}
+        :param spc_thermo_dct: thermochemical values for all species
+        :type spc_thermo_dct: dict {spc1: thermo_array1, spc2: ...}
+        :param temps: temperatures at which to do calculations (Kelvin)
+        :type temps: list [float]
+        :return rev_rxn_ktp_dct: reverse rate constants, under the (forward)
+            rxn keys of the input
+        :rtype: dict {rxn1: rev_ktp_dct1, rxn2: ...}
+    """
+    rxns = list(rxn_ktp_dct)
+    if not rxns:
+        return {}
+    spcs = sorted({spc for rcts, prds, _ in rxns for spc in rcts + prds})
+    factors = reverse_rate_factors(
+        stoich_matrix(rxns, spcs), gibbs_matrix(spc_thermo_dct, spcs), temps)
+
+    # Stack the k(T)s at every pressure of every reaction, and scale them
+    # by the factor of their reaction in one operation
+    keys = [(rxn_idx, pressure) for rxn_idx, rxn in enumerate(rxns)
+            for pressure in rxn_ktp_dct[rxn]]
+    kts = numpy.array([rxn_ktp_dct[rxns[rxn_idx]][pressure][1]
+                       for rxn_idx, pressure in keys], dtype=float)
+    kts = kts.reshape(len(keys), len(temps))
+    rev_kts = kts * factors[[rxn_idx for rxn_idx, _ in keys]]
+
+    rev_rxn_ktp_dct = {rxn: {} for rxn in rxns}
+    for (rxn_idx, pressure), row in zip(keys, rev_kts):
+        rev_rxn_ktp_dct[rxns[rxn_idx]][pressure] = (temps, row)
+
+    return rev_rxn_ktp_dct
+
+
+def _log_kcs(stoich, gibbs, temps, rval=RC_CAL):
+    """ ln Kc = -dG/RT + dn ln(P0/RT), with P0 = 1 atm
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    log_densities = numpy.log(ratefit.calc.p_to_m(1.0, temps))
+    return (-delta_gibbs(stoich, gibbs) / (rval * temps) +
+            numpy.outer(delta_ns(stoich), log_densities))
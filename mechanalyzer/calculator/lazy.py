@@ -0,0 +1,79 @@
+"""
+Evaluate the rates of a mechanism only as they are needed
+"""
+
+from collections.abc import Mapping
+from mechanalyzer.calculator import rates
+
+
+class LazyRxnKtpDct(Mapping):
+    """ rxn_ktp_dct whose ktp_dcts are evaluated on first access.
+
+        The rxn_param_dct is kept, and a reaction's ktp_dct is only
+        evaluated (and then memoized) when its key is looked up. Known
+        subsets of reactions are best fetched together with prefetch, which
+        evaluates them in a single compiled pass; iterating over items or
+        values prefetches the whole mechanism.
+    """
+
+    def __init__(self, rxn_param_dct, pressures, temps, log10=False):
+        """ :param rxn_param_dct: rate parameters for a mechanism
+            :type rxn_param_dct: dct {rxn1: (param_tup1, ...), ...}
+            :param pressures: pressures (atm)
+            :type pressures: list(float)
+            :param temps: temperatures (K)
+            :type temps: numpy.ndarray
+            :param log10: return log10 k(T,P)s instead of k(T,P)s
+            :type log10: bool
+        """
+        self.rxn_param_dct = rxn_param_dct
+        self.pressures = pressures
+        self.temps = temps
+        self.log10 = log10
+        self.ktp_dcts = {}
+
+    def prefetch(self, rxns=None):
+        """ Evaluate a set of reactions at once, skipping any that have
+            already been evaluated
+
+            :param rxns: reactions to evaluate; all of them if None
+            :type rxns: list
+        """
+        if rxns is None:
+            rxns = self.rxn_param_dct.keys()
+        missing_dct = {rxn: self.rxn_param_dct[rxn] for rxn in rxns
+                       if rxn not in self.ktp_dcts}
+        if missing_dct:
+            self.ktp_dcts.update(rates.eval_rxn_param_dct(
+                missing_dct, self.pressures, self.temps, log10=self.log10))
+
+    def evaluated(self, rxn):
+        """ Whether a reaction has been evaluated yet
+
+            :param rxn: reaction name
+            :type rxn: tuple
+            :rtype: bool
+        """
+        return rxn in self.ktp_dcts
+
+    def items(self):
+        self.prefetch()
+        return super().items()
+
+    def values(self):
+        self.prefetch()
+        return super().values()
+
+    def __getitem__(self, rxn):
+        if rxn not in self.ktp_dcts:
+            self.prefetch([rxn])
+        return self.ktp_dcts[rxn]
+
+    def __contains__(self, rxn):
+        return rxn in self.rxn_param_dct
+
+    def __iter__(self):
+        return iter(self.rxn_param_dct)
+
+    def __len__(self):
+        return len(self.rxn_param_dct)
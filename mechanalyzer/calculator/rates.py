@@ -2,25 +2,52 @@
 Calculate rates with various fitting functions
 """
 
-import copy
+import os
+import itertools
 import numpy
+from numpy.lib.format import open_memmap
 from phydat import phycon
 import ratefit.calc
+from mechanalyzer.calculator import compiled
 
 
 RC = phycon.RC_CAL  # gas constant in cal/(mol.K)
 RC2 = phycon.RC_ATM  # gas constant in cm^3.atm/(mol.K)
 
 
-def eval_rxn_param_dct(rxn_param_dct, pressures, temps):
+def eval_rxn_param_dct(rxn_param_dct, pressures, temps, log10=False,
+                       tables=False, parallel=False, nprocs=None, cache=None,
+                       derivs=False):
     """ Loop through all rxns in a rxn_param_dct and get a ktp_dct for
         each one. Return a rxn_ktp_dct.
+
+        For a 1-D array of temperatures, the whole mechanism is evaluated
+        at once with the compiled (stacked-parameter) evaluator.
+
         :param rxn_param_dct:
         :type rxn_param_dct:
         :param pressures:
         :type pressures:
         :param temps:
         :type temps:
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :param tables: return a ratefit KTPTable for each rxn instead of a
+            ktp_dct (requires a 1-D array of temperatures)
+        :type tables: bool
+        :param parallel: split the rxns across several processes
+            (requires a 1-D array of temperatures)
+        :type parallel: bool
+        :param nprocs: number of processes used if parallel
+        :type nprocs: int
+        :param cache: cache holding the rates of previously evaluated rxns
+        :type cache: mechanalyzer.calculator.cache.EvalCache
+        :param derivs: also return the analytic derivatives d ln k / d(1/T)
+            and d ln k / d ln P, evaluated in the same compiled pass
+            (requires a 1-D array of temperatures)
+        :type derivs: bool
+        :return: rxn_ktp_dct or, if derivs, (rxn_ktp_dct, rxn_dinvt_dct,
+            rxn_dlnp_dct), with the derivatives formatted as ktp_dcts
     """
 
     def add_ktp_dcts(ktp_dct1, ktp_dct2):
@@ -31,8 +58,8 @@ def eval_rxn_param_dct(rxn_param_dct, pressures, temps):
             with a pressure-independent rate.
         """
 
-        if not ktp_dct1:  # if starting dct is empty, copy the addition
-            added_dct = copy.deepcopy(ktp_dct2)
+        if not ktp_dct1:  # if starting dct is empty, take the addition
+            added_dct = dict(ktp_dct2)  # k(T)s are never modified in place
         else:
             added_dct = {}
             for pressure, (temps, kts1) in ktp_dct1.items():
@@ -45,18 +72,204 @@ def eval_rxn_param_dct(rxn_param_dct, pressures, temps):
         return added_dct
 
     ratefit.ktpdct.check_p_t(pressures, temps)  # enforce formatting rules
+    if derivs:
+        assert numpy.ndim(temps) == 1, (
+            'Derivatives require a 1-D array of temperatures')
+        assert not (log10 or tables or parallel or cache is not None), (
+            'Derivatives are only evaluated in the compiled pass')
+        cmp_dct = compiled.compile_rxn_param_dct(rxn_param_dct)
+        return compiled.eval_compiled(cmp_dct, pressures, temps, derivs=True)
+    if cache is not None:
+        assert not (tables or parallel), (
+            'The cache holds ktp_dcts evaluated in this process')
+        return cache.eval_rxn_param_dct(
+            rxn_param_dct, pressures, temps, log10=log10)
+    if numpy.ndim(temps) == 1 and parallel:
+        ktp_arr, valid = compiled.eval_dense_parallel(
+            rxn_param_dct, pressures, temps, log10=log10, nprocs=nprocs)
+        return compiled.unpack_dense(
+            list(rxn_param_dct.keys()), ktp_arr, valid, pressures, temps,
+            tables=tables)
+    if numpy.ndim(temps) == 1:
+        cmp_dct = compiled.compile_rxn_param_dct(rxn_param_dct)
+        return compiled.eval_compiled(
+            cmp_dct, pressures, temps, log10=log10, tables=tables)
+    assert not (tables or parallel), (
+        'KTPTables and parallel evaluation require 1-D temperatures')
+
     rxn_ktp_dct = {}
     for rxn, param_tups in rxn_param_dct.items():
         ktp_dct = {}
         for param_tup in param_tups:
             new_ktp_dct = eval_param_tup(param_tup, pressures, temps)
             ktp_dct = add_ktp_dcts(ktp_dct, new_ktp_dct)
+        if log10:  # duplicates are summed before taking the log
+            ktp_dct = {pressure: (temps, numpy.log10(kts))
+                       for pressure, (temps, kts) in ktp_dct.items()}
         rxn_ktp_dct[rxn] = ktp_dct
 
     return rxn_ktp_dct
 
 
-def eval_param_tup(param_tup, pressures, temps, t_ref=1.0):
+def eval_rxn_param_dct_dense(rxn_param_dct, pressures, temps, log10=False,
+                             parallel=False, nprocs=None):
+    """ Evaluate every rxn in a rxn_param_dct onto a single dense array,
+        instead of a dct of ktp_dcts.
+
+        The pressure axis holds the input pressures followed by the
+        high-pressure limit, mirroring the keys of a ktp_dct. Entries
+        where a rxn has no value (e.g., the high-P limit of a PLOG, or a
+        pressure outside of its range) are NaN and flagged in the mask.
+
+        :param rxn_param_dct:
+        :type rxn_param_dct:
+        :param pressures:
+        :type pressures:
+        :param temps:
+        :type temps: numpy.ndarray (1-D)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :param parallel: split the rxns across several processes
+        :type parallel: bool
+        :param nprocs: number of processes used if parallel
+        :type nprocs: int
+        :return ktp_arr: rate constants
+        :rtype: numpy.ndarray (nrxn, nP+1, nT)
+        :return valid: where each rxn has a value
+        :rtype: numpy.ndarray(bool) (nrxn, nP+1)
+        :return rxn_idx_dct: index of each rxn along the first axis
+        :rtype: dct {rxn1: idx1, rxn2: ...}
+    """
+    ratefit.ktpdct.check_p_t(pressures, temps)  # enforce formatting rules
+    if parallel:
+        ktp_arr, valid = compiled.eval_dense_parallel(
+            rxn_param_dct, pressures, temps, log10=log10, nprocs=nprocs)
+    else:
+        cmp_dct = compiled.compile_rxn_param_dct(rxn_param_dct)
+        ktp_arr, valid = compiled.eval_dense(
+            cmp_dct, pressures, temps, log10=log10)
+    rxn_idx_dct = {rxn: idx for idx, rxn in enumerate(rxn_param_dct)}
+
+    return ktp_arr, valid, rxn_idx_dct
+
+
+def iter_rxn_param_dct(rxn_param_dct, pressures, temps, chunk_size=1000,
+                       log10=False):
+    """ Evaluate a rxn_param_dct in chunks of rxns, yielding one
+        rxn_ktp_dct per chunk so that only one chunk is held in memory
+        at a time (if the caller lets go of the previous ones).
+
+        :param rxn_param_dct:
+        :type rxn_param_dct:
+        :param pressures:
+        :type pressures:
+        :param temps:
+        :type temps:
+        :param chunk_size: number of rxns evaluated at once
+        :type chunk_size: int
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return rxn_ktp_dcts: rxn_ktp_dct of each chunk, in dct order
+        :rtype: generator(dct)
+    """
+    assert chunk_size > 0, f'chunk_size is {chunk_size}; should be > 0'
+    rxn_iter = iter(rxn_param_dct.items())
+    while True:
+        chunk_dct = dict(itertools.islice(rxn_iter, chunk_size))
+        if not chunk_dct:
+            break
+        yield eval_rxn_param_dct(chunk_dct, pressures, temps, log10=log10)
+
+
+def write_rxn_param_dct_dense(rxn_param_dct, pressures, temps, path,
+                              chunk_size=1000, log10=False):
+    """ Evaluate a rxn_param_dct in chunks of rxns straight into the dense
+        layout of eval_rxn_param_dct_dense, stored on disk as memory-mapped
+        .npy files (ktps.npy and valid.npy in a directory). Peak memory is
+        set by the chunk size rather than the size of the mechanism.
+
+        :param rxn_param_dct:
+        :type rxn_param_dct:
+        :param pressures:
+        :type pressures:
+        :param temps:
+        :type temps: numpy.ndarray (1-D)
+        :param path: directory to write the arrays to
+        :type path: str
+        :param chunk_size: number of rxns evaluated at once
+        :type chunk_size: int
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktp_arr: rate constants, memory-mapped
+        :rtype: numpy.memmap (nrxn, nP+1, nT)
+        :return valid: where each rxn has a value, memory-mapped
+        :rtype: numpy.memmap(bool) (nrxn, nP+1)
+        :return rxn_idx_dct: index of each rxn along the first axis
+        :rtype: dct {rxn1: idx1, rxn2: ...}
+    """
+
+    assert chunk_size > 0, f'chunk_size is {chunk_size}; should be > 0'
+    ratefit.ktpdct.check_p_t(pressures, temps)  # enforce formatting rules
+    os.makedirs(path, exist_ok=True)
+    nrxns = len(rxn_param_dct)
+    ktp_arr = open_memmap(
+        os.path.join(path, 'ktps.npy'), mode='w+', dtype=float,
+        shape=(nrxns, len(pressures)+1, len(temps)))
+    valid = open_memmap(
+        os.path.join(path, 'valid.npy'), mode='w+', dtype=bool,
+        shape=(nrxns, len(pressures)+1))
+
+    rxns = list(rxn_param_dct.keys())
+    for start in range(0, nrxns, chunk_size):
+        chunk_dct = {rxn: rxn_param_dct[rxn]
+                     for rxn in rxns[start:start+chunk_size]}
+        cmp_dct = compiled.compile_rxn_param_dct(chunk_dct)
+        chunk_ktp_arr, chunk_valid = compiled.eval_dense(
+            cmp_dct, pressures, temps, log10=log10)
+        ktp_arr[start:start+chunk_size] = chunk_ktp_arr
+        valid[start:start+chunk_size] = chunk_valid
+    ktp_arr.flush()
+    valid.flush()
+    rxn_idx_dct = {rxn: idx for idx, rxn in enumerate(rxns)}
+
+    return ktp_arr, valid, rxn_idx_dct
+
+
+def read_rxn_dense(path, mmap_mode='r'):
+    """ Read the dense arrays written by write_rxn_param_dct_dense
+
+        :param path: directory the arrays were written to
+        :type path: str
+        :param mmap_mode: memory-map mode passed to numpy.load
+        :type mmap_mode: str
+        :return ktp_arr, valid: rate constants and where they are valid
+        :rtype: (numpy.memmap, numpy.memmap)
+    """
+    ktp_arr = numpy.load(os.path.join(path, 'ktps.npy'), mmap_mode=mmap_mode)
+    valid = numpy.load(os.path.join(path, 'valid.npy'), mmap_mode=mmap_mode)
+    return ktp_arr, valid
+
+
+def eval_rxn_param_dct_points(rxn_param_dct, temps, pressures, log10=False):
+    """ Evaluate every rxn in a rxn_param_dct at a set of paired (T, P)
+        points in one vectorized pass, without building any ktp_dcts.
+
+        :param rxn_param_dct:
+        :type rxn_param_dct:
+        :param temps: temperature of each point (K)
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: pressure of each point (atm)
+        :type pressures: numpy.ndarray (npts,)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: rate constants, one row per rxn (in dct order)
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+    cmp_dct = compiled.compile_rxn_param_dct(rxn_param_dct)
+    return compiled.eval_points(cmp_dct, temps, pressures, log10=log10)
+
+
+def eval_param_tup(param_tup, pressures, temps, t_ref=1.0, log10=False):
     """ Look through a param_tup and evaluate k(T,P) based on the contents.
         Return a ktp_dct.
 
@@ -66,6 +279,8 @@ def eval_param_tup(param_tup, pressures, temps, t_ref=1.0):
         :type pressures:
         :param temps:
         :type temps:
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
         :return ktp_dct: rate constant as a function of temp and pressure
         :rtype: dct {pressure1: {temps1, kts1}, pressures2: ...}
     """
@@ -75,11 +290,12 @@ def eval_param_tup(param_tup, pressures, temps, t_ref=1.0):
         p_limits = param_tup[3]['p_limits']
         ktp_dct = ratefit.calc.chebyshev(
             alpha, t_limits[0], t_limits[1], p_limits[0], p_limits[1],
-            temps, pressures)
+            temps, pressures, log10=log10)
 
     elif param_tup[4] is not None:  # PLOG
         plog_dct = param_tup[4]
-        ktp_dct = ratefit.calc.plog(plog_dct, t_ref, temps, pressures)
+        ktp_dct = ratefit.calc.plog(
+            plog_dct, t_ref, temps, pressures, log10=log10)
 
     elif param_tup[2] is not None:  # Troe
         assert param_tup[0] is not None, (
@@ -99,30 +315,128 @@ def eval_param_tup(param_tup, pressures, temps, t_ref=1.0):
         else:
             ts2 = None
 
-        highp_kts = ratefit.calc.arrhenius(param_tup[0], t_ref, temps)
-        lowp_kts = ratefit.calc.arrhenius(param_tup[1], t_ref, temps)
+        highp_kts = ratefit.calc.arrhenius(
+            param_tup[0], t_ref, temps, log10=log10)
+        lowp_kts = ratefit.calc.arrhenius(
+            param_tup[1], t_ref, temps, log10=log10)
         ktp_dct = ratefit.calc.troe(
             highp_kts, lowp_kts, temps, pressures,
-            alpha, ts3, ts1, ts2, collid_factor=1.0)
+            alpha, ts3, ts1, ts2, collid_factor=1.0, log10=log10)
 
     elif param_tup[1] is not None:  # Lindemann
         assert param_tup[0] is not None, (
             'Low-P parameters are included,',
             'but the high-P parameters are absent'
             )
-        highp_kts = ratefit.calc.arrhenius(param_tup[0], t_ref, temps)
-        lowp_kts = ratefit.calc.arrhenius(param_tup[1], t_ref, temps)
+        highp_kts = ratefit.calc.arrhenius(
+            param_tup[0], t_ref, temps, log10=log10)
+        lowp_kts = ratefit.calc.arrhenius(
+            param_tup[1], t_ref, temps, log10=log10)
         ktp_dct = ratefit.calc.lindemann(
             highp_kts, lowp_kts,
-            temps, pressures, collid_factor=1.0)
+            temps, pressures, collid_factor=1.0, log10=log10)
 
     else:  # Arrhenius
         assert param_tup[0] is not None, (
             'The param_tup does not seem to contain any useful information.'
             )
         # Case is unique as kTP dict contains only one key-value pair
-        kts = ratefit.calc.arrhenius(param_tup[0], t_ref, temps)
+        kts = ratefit.calc.arrhenius(param_tup[0], t_ref, temps, log10=log10)
         ktp_dct = {}
         ktp_dct['high'] = (temps, kts)
 
     return ktp_dct
+
+
+def eval_rxn_derivs(rxn_param_dct, pressures, temps):
+    """ Get the k(T,P)s of every rxn in a rxn_param_dct along with their
+        analytic derivatives, d ln k / d(1/T) and d ln k / d ln P; same as
+        eval_rxn_param_dct(..., derivs=True). Duplicate expressions are
+        summed, and the derivatives of the sum are the k-weighted averages
+        of the derivatives of each expression (NaN where the sum is zero).
+
+        :param rxn_param_dct:
+        :type rxn_param_dct:
+        :param pressures:
+        :type pressures:
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray (1-D)
+        :return rxn_ktp_dct, rxn_dinvt_dct, rxn_dlnp_dct: k(T,P)s and
+            their derivatives for each rxn, all formatted as ktp_dcts
+        :rtype: (dict, dict, dict)
+    """
+    return eval_rxn_param_dct(rxn_param_dct, pressures, temps, derivs=True)
+
+
+def eval_param_tup_derivs(param_tup, pressures, temps, t_ref=1.0):
+    """ Look through a param_tup and evaluate k(T,P) based on the contents,
+        together with the analytic derivatives d ln k / d(1/T) and
+        d ln k / d ln P. The derivatives are stored under the same keys
+        as the k(T,P)s; the 'high' entries have d ln k / d ln P = 0.
+
+        :param param_tup:
+        :type param_tup:
+        :param pressures:
+        :type pressures:
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray (1-D)
+        :return ktp_dct, dinvt_dct, dlnp_dct: k(T,P)s and their derivatives
+        :rtype: (dict, dict, dict)
+    """
+
+    highp_derivs = None
+    if param_tup[3] is not None:  # Chebyshev
+        alpha = param_tup[3]['alpha_elm']
+        t_limits = param_tup[3]['t_limits']
+        p_limits = param_tup[3]['p_limits']
+        grids = ratefit.calc.chebyshev_derivs(
+            alpha, t_limits[0], t_limits[1], p_limits[0], p_limits[1],
+            temps, pressures)
+
+    elif param_tup[4] is not None:  # PLOG
+        grids = ratefit.calc.plog_derivs(
+            param_tup[4], t_ref, temps, pressures)
+
+    elif param_tup[1] is not None:  # Troe or Lindemann
+        assert param_tup[0] is not None, (
+            'Low-P parameters are included,',
+            'but the high-P parameters are absent'
+            )
+        highp_derivs = ratefit.calc.arrhenius_derivs(
+            param_tup[0], t_ref, temps)
+        lowp_derivs = ratefit.calc.arrhenius_derivs(
+            param_tup[1], t_ref, temps)
+        if param_tup[2] is not None:  # Troe
+            troe_params = param_tup[2]
+            ts2 = troe_params[3] if len(troe_params) == 4 else None
+            grids = ratefit.calc.troe_derivs(
+                highp_derivs[0], lowp_derivs[0], temps, pressures,
+                troe_params[0], troe_params[1], troe_params[2], ts2=ts2,
+                highp_dinvts=highp_derivs[1], lowp_dinvts=lowp_derivs[1])
+        else:
+            grids = ratefit.calc.lindemann_derivs(
+                highp_derivs[0], lowp_derivs[0], temps, pressures,
+                highp_derivs[1], lowp_derivs[1])
+
+    else:  # Arrhenius
+        assert param_tup[0] is not None, (
+            'The param_tup does not seem to contain any useful information.'
+            )
+        kts, dinvts = ratefit.calc.arrhenius_derivs(param_tup[0], t_ref, temps)
+        return ({'high': (temps, kts)},
+                {'high': (temps, dinvts)},
+                {'high': (temps, numpy.zeros(numpy.shape(kts)))})
+
+    # Sort the grids into ktp_dcts, skipping pressures out of range
+    ktp_dct, dinvt_dct, dlnp_dct = {}, {}, {}
+    for pressure, kts, dinvts, dlnps in zip(pressures, *grids):
+        if not numpy.all(numpy.isnan(kts)):
+            ktp_dct[pressure] = (temps, kts)
+            dinvt_dct[pressure] = (temps, dinvts)
+            dlnp_dct[pressure] = (temps, dlnps)
+    if highp_derivs is not None:
+        ktp_dct['high'] = (temps, highp_derivs[0])
+        dinvt_dct['high'] = (temps, highp_derivs[1])
+        dlnp_dct['high'] = (temps, numpy.zeros(numpy.shape(temps)))
+
+    return ktp_dct, dinvt_dct, dlnp_dct
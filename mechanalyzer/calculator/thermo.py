@@ -6,8 +6,14 @@ from phydat import phycon
 
 RC = phycon.RC_CAL  # gas constant in cal/(mol.K)
 
+# Fields of a nasa7_consistency scan; the jumps are in the units of rval
+NASA7_SCAN_DTYPE = numpy.dtype([
+    ('spc', 'U64'), ('t_low', float), ('t_mid', float), ('t_high', float),
+    ('d_h', float), ('d_cp', float), ('d_s', float),
+    ('n_out', int), ('t_out_min', float), ('t_out_max', float)])
 
-def create_spc_thermo_dct(spc_nasa7_dct, temps, rval=RC):
+
+def create_spc_thermo_dct(spc_nasa7_dct, temps, rval=RC, cache=None):
     """ Create a spc_thermo_dct. If left with the default input rval=phycon.RC_cal, the
         thermo quantities will have units of cal/mol for h(T) and g(T) and units of cal/mol-K
         for cp(T) and s(T).
@@ -18,33 +24,200 @@ def create_spc_thermo_dct(spc_nasa7_dct, temps, rval=RC):
         :type temps: list
         :param rval: universal gas constant (units decided by the user)
         :type rval: float
+        :param cache: cache holding the thermo of previously evaluated species
+        :type cache: mechanalyzer.calculator.cache.ThermoCache
+        :return spc_thermo_dct: species dictionary with arrays of T, h(T), cp(T), s(T), and g(T)
+        :rtype: dct {spc1: thermo_array1, spc2: ...}
+    """
+    if cache is not None:
+        return cache.create_spc_thermo_dct(spc_nasa7_dct, temps, rval=rval)
+    if not spc_nasa7_dct:
+        return {}
+
+    # Evaluate every species at every temperature at once
+    temps = numpy.array(temps)
+    spcs, cfts, t_lims = stack_nasa7_params(spc_nasa7_dct)
+    thermo_arrs = nasa7_thermo(cfts, t_lims, temps, rval=rval)
+
+    return build_spc_thermo_dct(spcs, thermo_arrs, t_lims, temps)
+
+
+def build_spc_thermo_dct(spcs, thermo_arrs, t_lims, temps):
+    """ Create a spc_thermo_dct from the stacked thermo values of a set of species,
+        with None at the temperatures outside the range of each species
+
+        :param spcs: species, in the order of the rows of the arrays
+        :type spcs: list(str)
+        :param thermo_arrs: h(T), cp(T), s(T), and g(T) of each species, from nasa7_thermo
+        :type thermo_arrs: tuple(numpy.ndarray (nspc, nT))
+        :param t_lims: low, mid, and high temperatures of each species
+        :type t_lims: numpy.ndarray (nspc, 3)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
         :return spc_thermo_dct: species dictionary with arrays of T, h(T), cp(T), s(T), and g(T)
         :rtype: dct {spc1: thermo_array1, spc2: ...}
     """
     spc_thermo_dct = {}
-    for spc, nasa7_params in spc_nasa7_dct.items():
-        h_t, cp_t, s_t, g_t, = [], [], [], []
-        for temp in temps:
-            h_t.append(enthalpy(nasa7_params, temp, rval=rval))
-            cp_t.append(heat_capacity(nasa7_params, temp, rval=rval))
-            s_t.append(entropy(nasa7_params, temp, rval=rval))
-            g_t.append(gibbs(nasa7_params, temp, rval=rval))
-
-            if h_t[-1] is None or cp_t[-1] is None or s_t[-1] is None or g_t[-1] is None:
-                print(f'Failed to calculate thermo at {temp} K for {spc} due to an invalid temp.')
-
-        # Convert to numpy arrays
-        temps = numpy.array(temps)
-        h_t = numpy.array(h_t)
-        cp_t = numpy.array(cp_t)
-        s_t = numpy.array(s_t)
-        g_t = numpy.array(g_t)
+    valid = valid_temps(t_lims, temps)
+
+    for spc_idx, spc in enumerate(spcs):
+        for temp in temps[~valid[spc_idx]]:
+            print(f'Failed to calculate thermo at {temp} K for {spc} due to an invalid temp.')
+
+        # Values at invalid temps are None, as for the single-point functions
+        if valid[spc_idx].all():
+            h_t, cp_t, s_t, g_t = (arr[spc_idx] for arr in thermo_arrs)
+        else:
+            h_t, cp_t, s_t, g_t = (
+                numpy.where(valid[spc_idx], arr[spc_idx], None) for arr in thermo_arrs)
 
         spc_thermo_dct[spc] = (temps, h_t, cp_t, s_t, g_t)
 
     return spc_thermo_dct
 
 
+def stack_nasa7_params(spc_nasa7_dct):
+    """ Pack the NASA-7 polynomials of a set of species into arrays
+
+        :param spc_nasa7_dct: species dictionary describing the NASA-7 polynomials
+        :type spc_nasa7_dct: dct {spc1: nasa7_dct1, spc2: ...}
+        :return spcs: species, in the order of the rows of the arrays
+        :rtype: list(str)
+        :return cfts: low-T (index 0) and high-T (index 1) coefficients of each species
+        :rtype: numpy.ndarray (nspc, 2, 7)
+        :return t_lims: low, mid, and high temperatures of each species
+        :rtype: numpy.ndarray (nspc, 3)
+    """
+    spcs = list(spc_nasa7_dct)
+    cfts = numpy.zeros((len(spcs), 2, 7))
+    t_lims = numpy.zeros((len(spcs), 3))
+    for spc_idx, spc in enumerate(spcs):
+        nasa7_params = spc_nasa7_dct[spc]
+        low_temp, high_temp, mid_temp = nasa7_params[3]  # the NASA order
+        t_lims[spc_idx] = (low_temp, mid_temp, high_temp)
+        cfts[spc_idx, 0] = nasa7_params[4][1]
+        cfts[spc_idx, 1] = nasa7_params[4][0]
+
+    return spcs, cfts, t_lims
+
+
+def nasa7_thermo(cfts, t_lims, temps, rval=RC):
+    """ Calculate the enthalpy, heat capacity, entropy, and Gibbs free energy of
+        a set of species at a set of temperatures, using the low-T coefficients up
+        to the mid temperature of each species and the high-T ones above it. The
+        values at temperatures outside the range of a species are extrapolated
+        (see valid_temps).
+
+        :param cfts: low-T and high-T NASA-7 coefficients of each species
+        :type cfts: numpy.ndarray (nspc, 2, 7)
+        :param t_lims: low, mid, and high temperatures of each species
+        :type t_lims: numpy.ndarray (nspc, 3)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param rval: universal gas constant (units decided by the user)
+        :type rval: float
+        :return h_t, cp_t, s_t, g_t: thermo values of each species at each temperature
+        :rtype: tuple(numpy.ndarray (nspc, nT))
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    terms = numpy.concatenate(_nasa7_terms(temps), axis=1)
+
+    # Evaluate both ranges, and keep the one that applies at each point
+    use_high = temps > t_lims[:, 1:2]
+    low_vals, high_vals = (numpy.dot(cfts[:, idx], terms) for idx in (0, 1))
+    vals = numpy.where(numpy.tile(use_high, 3), high_vals, low_vals).reshape(
+        len(cfts), 3, len(temps))
+
+    h_t = vals[:, 0] * (rval * temps)
+    cp_t = vals[:, 1] * rval
+    s_t = vals[:, 2] * rval
+    g_t = h_t - s_t * temps
+
+    return h_t, cp_t, s_t, g_t
+
+
+def valid_temps(t_lims, temps):
+    """ Whether each temperature is within the range of each species
+
+        :param t_lims: low, mid, and high temperatures of each species
+        :type t_lims: numpy.ndarray (nspc, 3)
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :rtype: numpy.ndarray (nspc, nT) of bool
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    return (t_lims[:, 0:1] <= temps) & (temps <= t_lims[:, 2:3])
+
+
+def nasa7_consistency(spc_nasa7_dct, temps=None, rval=RC):
+    """ Scan the NASA-7 polynomials of a set of species for jumps between the low-T
+        and high-T polynomials at the mid temperature and, if temps are given, for
+        temperatures outside the range of each species
+
+        :param spc_nasa7_dct: species dictionary describing the NASA-7 polynomials
+        :type spc_nasa7_dct: dct {spc1: nasa7_dct1, spc2: ...}
+        :param temps: temperatures that the polynomials should cover (K)
+        :type temps: list
+        :param rval: universal gas constant (units decided by the user)
+        :type rval: float
+        :return scan: one row per species, with the fields of NASA7_SCAN_DTYPE; the
+            jumps are the high-T minus the low-T values at the mid temperature
+        :rtype: numpy.ndarray (nspc,) of NASA7_SCAN_DTYPE
+    """
+    if not spc_nasa7_dct:
+        return numpy.zeros(0, dtype=NASA7_SCAN_DTYPE)
+    spcs, cfts, t_lims = stack_nasa7_params(spc_nasa7_dct)
+    mid_temps = t_lims[:, 1]
+
+    # Both polynomials of each species at its own mid temperature: the
+    # h(T)/RT, cp(T)/R, and s(T)/R jumps, (3, nspc)
+    terms = numpy.stack(_nasa7_terms(mid_temps))
+    jumps = rval * (numpy.einsum('ij,kji->ki', cfts[:, 1], terms) -
+                    numpy.einsum('ij,kji->ki', cfts[:, 0], terms))
+    d_h = jumps[0] * mid_temps
+    d_cp = jumps[1]
+    d_s = jumps[2]
+
+    scan = numpy.zeros(len(spcs), dtype=NASA7_SCAN_DTYPE)
+    scan['spc'] = spcs
+    scan['t_low'], scan['t_mid'], scan['t_high'] = t_lims.T
+    scan['d_h'], scan['d_cp'], scan['d_s'] = d_h, d_cp, d_s
+    if temps is not None and len(temps) > 0:
+        temps = numpy.asarray(temps, dtype=float)
+        valid = valid_temps(t_lims, temps)
+        scan['n_out'] = numpy.sum(~valid, axis=1)
+        scan['t_out_min'] = numpy.where(valid, numpy.inf, temps).min(axis=1)
+        scan['t_out_max'] = numpy.where(valid, -numpy.inf, temps).max(axis=1)
+    no_out = scan['n_out'] == 0
+    scan['t_out_min'][no_out] = numpy.nan
+    scan['t_out_max'][no_out] = numpy.nan
+
+    return scan
+
+
+def nasa7_problems(scan, cp_tol=0.01, h_tol=1.0, s_tol=0.01):
+    """ Select the species of a nasa7_consistency scan whose polynomials jump at the
+        mid temperature by more than the tolerances, or that do not cover the temps
+
+        :param scan: output of nasa7_consistency
+        :type scan: numpy.ndarray of NASA7_SCAN_DTYPE
+        :param cp_tol: largest allowed jump in cp(T) (units of rval)
+        :type cp_tol: float
+        :param h_tol: largest allowed jump in h(T) (units of rval times K)
+        :type h_tol: float
+        :param s_tol: largest allowed jump in s(T) (units of rval)
+        :type s_tol: float
+        :return problems: rows of the scan with a problem
+        :rtype: numpy.ndarray of NASA7_SCAN_DTYPE
+    """
+    bad = ((numpy.abs(scan['d_cp']) > cp_tol) |
+           (numpy.abs(scan['d_h']) > h_tol) |
+           (numpy.abs(scan['d_s']) > s_tol) |
+           (scan['n_out'] > 0))
+
+    return scan[bad]
+
+
 def enthalpy(nasa7_params, temp, rval=RC):
     """ Calculate the enthalpy of a species using the
         coefficients of its NASA-7 polynomial.
@@ -179,3 +352,21 @@ def coeffs_for_specific_temp(nasa7_params, temp):
         cfts = None
 
     return cfts
+
+
+def _nasa7_terms(temps):
+    """ Terms of the dimensionless NASA-7 h(T)/RT, cp(T)/R, and s(T)/R polynomials,
+        which multiply the 7 coefficients
+
+        :param temps: temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :rtype: tuple(numpy.ndarray (7, nT))
+    """
+    ones, zeros = numpy.ones_like(temps), numpy.zeros_like(temps)
+    h_terms = numpy.array([ones, temps / 2.0, temps**2 / 3.0, temps**3 / 4.0,
+                           temps**4 / 5.0, 1.0 / temps, zeros])
+    cp_terms = numpy.array([ones, temps, temps**2, temps**3, temps**4, zeros, zeros])
+    s_terms = numpy.array([numpy.log(temps), temps, temps**2 / 2.0,
+                           temps**3 / 3.0, temps**4 / 4.0, zeros, ones])
+
+    return h_terms, cp_terms, s_terms
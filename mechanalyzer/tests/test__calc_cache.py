@@ -0,0 +1,196 @@
+"""
+Test the mechanalyzer.calculator.cache functions
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+from mechanalyzer.calculator import rates
+from mechanalyzer.calculator import thermo
+from mechanalyzer.calculator import cache
+
+
+PRESSURES = np.array([0.1, 1.0, 10.0])
+TEMPS = np.array([1000.0, 1500.0, 2000.0])
+ARR_PARAMS = [1.04E+15, 0, 59810]
+HIGH_P_PARAMS = [1.26E+12, 0, 62620]
+PLOG_DCT = {0.1: [1.04E+15, 0, 59810],
+            1: [1.04E+16, 0, 59810],
+            10: [1.04E+17, 0, 59810]}
+
+RXN_PARAM_DCT = {
+    (('A',), ('B',), (None,)): ((ARR_PARAMS, None, None, None, None, None),),
+    (('B',), ('C',), ('(+M)',)): (
+        (HIGH_P_PARAMS, ARR_PARAMS, [0.6, 1e3, 7.0], None, None, None),),
+    (('C',), ('D',), (None,)): (
+        (ARR_PARAMS, None, None, None, PLOG_DCT, None),
+        (HIGH_P_PARAMS, None, None, None, None, None)),
+}
+
+N2O_NASA7 = [
+    'L 7/88', 'N   1O   1          ', 'G', [200.0, 6000.0, 1000.0],
+    ([0.48230729E+01, 0.26270251E-02, -0.95850872E-06, 0.16000712E-09,
+      -0.97752302E-14, 0.80734047E+04, -0.22017208E+01],
+     [0.22571502E+01, 0.11304728E-01, -0.13671319E-04, 0.96819803E-08,
+      -0.29307182E-11, 0.87417746E+04, 0.10757992E+02])]
+SPC_NASA7_DCT = {
+    'N2O': N2O_NASA7,
+    'N2O_COPY': N2O_NASA7,
+    'N2O_NARROW': N2O_NASA7[:3] + [[300.0, 1600.0, 1200.0], N2O_NASA7[4]],
+}
+
+
+def test__param_hash():
+    """ test cache.param_hash
+    """
+    param_tups = RXN_PARAM_DCT[(('C',), ('D',), (None,))]
+    same_param_tups = (
+        (tuple(ARR_PARAMS), None, None, None,
+         {1.0: np.array(PLOG_DCT[1]), 10.0: PLOG_DCT[10],
+          0.1: PLOG_DCT[0.1]}, None),
+        (HIGH_P_PARAMS, None, None, None, None, None))
+    assert cache.param_hash(param_tups) == cache.param_hash(same_param_tups)
+    assert cache.param_hash(param_tups) != cache.param_hash(param_tups[:1])
+    new_plog_dct = dict(PLOG_DCT)
+    new_plog_dct[10] = [1.04E+17, 0, 59811]
+    assert cache.param_hash(param_tups) != cache.param_hash(
+        ((ARR_PARAMS, None, None, None, new_plog_dct, None), param_tups[1]))
+    assert cache.grid_hash(PRESSURES, TEMPS) != cache.grid_hash(
+        PRESSURES, TEMPS, log10=True)
+
+
+def test__eval_cache():
+    """ test cache.EvalCache
+    """
+    eval_cache = cache.EvalCache()
+    rxn_ktp_dct = eval_cache.eval_rxn_param_dct(
+        RXN_PARAM_DCT, PRESSURES, TEMPS)
+    assert eval_cache.nmisses == 3 and eval_cache.nhits == 0
+    _check(rxn_ktp_dct, rates.eval_rxn_param_dct(
+        RXN_PARAM_DCT, PRESSURES, TEMPS))
+
+    # Tweak one reaction: only it is evaluated again
+    rxn_param_dct = dict(RXN_PARAM_DCT)
+    rxn_param_dct[(('A',), ('B',), (None,))] = (
+        ([2.0E+15, 0, 59810], None, None, None, None, None),)
+    new_rxn_ktp_dct = eval_cache.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS)
+    assert eval_cache.nmisses == 4 and eval_cache.nhits == 2
+    _check(new_rxn_ktp_dct, rates.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS))
+    rxn = (('B',), ('C',), ('(+M)',))
+    assert new_rxn_ktp_dct[rxn] is rxn_ktp_dct[rxn]
+
+    # A new grid misses everything; pruning keeps the current entries
+    eval_cache.eval_rxn_param_dct(rxn_param_dct, PRESSURES, TEMPS[:2])
+    assert eval_cache.nmisses == 7 and len(eval_cache.ktp_dcts) == 7
+    eval_cache.prune(rxn_param_dct, PRESSURES, TEMPS[:2])
+    assert len(eval_cache.ktp_dcts) == 3
+    eval_cache.clear()
+    assert not eval_cache.ktp_dcts
+
+    # Only the most recently used entries are kept in memory
+    eval_cache = cache.EvalCache(max_entries=2)
+    rxn_ktp_dct = eval_cache.eval_rxn_param_dct(
+        RXN_PARAM_DCT, PRESSURES, TEMPS)
+    assert len(rxn_ktp_dct) == 3 and len(eval_cache.ktp_dcts) == 2
+    _check(rxn_ktp_dct, rates.eval_rxn_param_dct(
+        RXN_PARAM_DCT, PRESSURES, TEMPS))
+    eval_cache.eval_rxn_param_dct(RXN_PARAM_DCT, PRESSURES, TEMPS)
+    assert eval_cache.nmisses == 4 and eval_cache.nhits == 2
+    assert len(eval_cache.ktp_dcts) == 2
+
+
+def test__disk_cache():
+    """ test cache.EvalCache with an on-disk store
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        eval_cache = cache.EvalCache(path=tmp_dir)
+        rxn_ktp_dct = rates.eval_rxn_param_dct(
+            RXN_PARAM_DCT, PRESSURES, TEMPS, cache=eval_cache)
+        assert len(os.listdir(tmp_dir)) == 3
+        entry_size = eval_cache.disk_size() / 3
+
+        # A new cache (e.g., a new run) reads the rates back from disk
+        new_cache = cache.EvalCache(path=tmp_dir)
+        new_rxn_ktp_dct = new_cache.eval_rxn_param_dct(
+            RXN_PARAM_DCT, PRESSURES, TEMPS)
+        assert new_cache.nmisses == 0 and new_cache.nhits == 3
+        _check(new_rxn_ktp_dct, rxn_ktp_dct)
+
+        # Least recently used entries are evicted beyond the size limit
+        time.sleep(0.01)
+        small_cache = cache.EvalCache(path=tmp_dir, max_size=3.5*entry_size)
+        rxn = (('A',), ('B',), (None,))
+        small_cache.eval_rxn_param_dct(
+            {rxn: RXN_PARAM_DCT[rxn]}, PRESSURES, TEMPS)
+        small_cache.eval_rxn_param_dct(
+            {rxn: ((HIGH_P_PARAMS, None, None, None, None, None),)},
+            PRESSURES, TEMPS)
+        assert len(os.listdir(tmp_dir)) == 3
+        assert small_cache.disk_size() <= 3.5 * entry_size
+        new_cache = cache.EvalCache(path=tmp_dir)
+        new_cache.eval_rxn_param_dct(RXN_PARAM_DCT, PRESSURES, TEMPS)
+        assert new_cache.nmisses == 1
+
+        small_cache.clear(disk=True)
+        assert not os.listdir(tmp_dir)
+
+
+def test__thermo_cache():
+    """ test cache.ThermoCache
+    """
+    ref_spc_thermo_dct = thermo.create_spc_thermo_dct(SPC_NASA7_DCT, TEMPS)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        thermo_cache = cache.ThermoCache(path=tmp_dir)
+        spc_thermo_dct = thermo.create_spc_thermo_dct(
+            SPC_NASA7_DCT, TEMPS, cache=thermo_cache)
+        # Species with the same polynomials share an entry
+        assert thermo_cache.nmisses == 2 and thermo_cache.nhits == 1
+        assert len(os.listdir(tmp_dir)) == 2
+        _check_thermo(spc_thermo_dct, ref_spc_thermo_dct)
+
+        new_cache = cache.ThermoCache(path=tmp_dir)
+        spc_thermo_dct = new_cache.create_spc_thermo_dct(SPC_NASA7_DCT, TEMPS)
+        assert new_cache.nmisses == 0
+        _check_thermo(spc_thermo_dct, ref_spc_thermo_dct)
+        assert spc_thermo_dct['N2O_NARROW'][1][2] is None
+
+        new_cache.create_spc_thermo_dct(SPC_NASA7_DCT, TEMPS[:2])
+        assert new_cache.nmisses == 2 and len(os.listdir(tmp_dir)) == 4
+
+        new_cache.clear(disk=True)
+        assert not os.listdir(tmp_dir)
+
+    # Only the most recently used entries are kept in memory
+    thermo_cache = cache.ThermoCache(max_entries=1)
+    spc_thermo_dct = thermo_cache.create_spc_thermo_dct(SPC_NASA7_DCT, TEMPS)
+    assert len(thermo_cache.thermo_arrs) == 1
+    _check_thermo(spc_thermo_dct, ref_spc_thermo_dct)
+
+
+def _check_thermo(spc_thermo_dct, ref_spc_thermo_dct):
+    """ Check that two spc_thermo_dcts hold the same values
+    """
+    assert list(spc_thermo_dct) == list(ref_spc_thermo_dct)
+    for spc, thermo_arrs in spc_thermo_dct.items():
+        for arr, ref_arr in zip(thermo_arrs, ref_spc_thermo_dct[spc]):
+            assert list(arr) == list(ref_arr)
+
+
+def _check(rxn_ktp_dct, ref_rxn_ktp_dct):
+    """ Check that two rxn_ktp_dcts hold the same rates
+    """
+    assert list(rxn_ktp_dct) == list(ref_rxn_ktp_dct)
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(ktp_dct) == list(ref_rxn_ktp_dct[rxn])
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.allclose(kts, ref_rxn_ktp_dct[rxn][pressure][1])
+
+
+if __name__ == '__main__':
+    test__param_hash()
+    test__eval_cache()
+    test__disk_cache()
+    test__thermo_cache()
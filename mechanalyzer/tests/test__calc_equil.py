@@ -0,0 +1,88 @@
+"""
+Test the mechanalyzer.calculator.equil functions
+"""
+
+import numpy as np
+from phydat import phycon
+from mechanalyzer.calculator import equil
+
+
+TEMPS = np.array([500.0, 1000.0, 1500.0])
+KTS = np.array([1e10, 1e11, 1e12])
+GIBBS = {
+    'H': np.array([38112.076, 22159.224, 4906.621]),
+    'O': np.array([40013.929, 18462.122, -4399.717]),
+    'OH': np.array([-13437.716, -38594.342, -65664.835]),
+    'H2': np.array([-16011.014, -34787.090, -55449.573]),
+    'O2': np.array([-24919.542, -52791.487, -82818.011]),
+}
+SPC_THERMO_DCT = {spc: (TEMPS, None, None, None, gibbs)
+                  for spc, gibbs in GIBBS.items()}
+RXN_KTP_DCT = {
+    (('H2', 'O'), ('OH', 'H'), (None,)): {1: (TEMPS, KTS), 10: (TEMPS, KTS)},
+    (('H', 'O'), ('OH',), ('(+M)',)): {'high': (TEMPS, KTS), 1: (TEMPS, KTS)},
+    (('O2',), ('O', 'O'), (None,)): {'high': (TEMPS, KTS)},
+    (('H', 'H', 'O'), ('H2', 'O'), (None,)): {1: (TEMPS, KTS)},
+}
+
+
+def test__reverse_rxn_ktp_dct():
+    """ test equil.reverse_rxn_ktp_dct
+    """
+    kts_copy = KTS.copy()
+    rev_rxn_ktp_dct = equil.reverse_rxn_ktp_dct(
+        RXN_KTP_DCT, SPC_THERMO_DCT, TEMPS)
+    assert np.array_equal(KTS, kts_copy)
+    assert list(rev_rxn_ktp_dct) == list(RXN_KTP_DCT)
+
+    # Compare with kr = kf/Kc, with Kc = Kp (P0/RT)^dn
+    densities = 1.0 / (phycon.RC_ATM * TEMPS)
+    for rxn, rev_ktp_dct in rev_rxn_ktp_dct.items():
+        rcts, prds, _ = rxn
+        rxn_gibbs = (sum(GIBBS[prd] for prd in prds) -
+                     sum(GIBBS[rct] for rct in rcts))
+        k_equils = (np.exp(-rxn_gibbs / (phycon.RC_CAL * TEMPS)) *
+                    densities**(len(prds) - len(rcts)))
+        assert list(rev_ktp_dct) == list(RXN_KTP_DCT[rxn])
+        for temps, kts in rev_ktp_dct.values():
+            assert np.array_equal(temps, TEMPS)
+            assert np.allclose(kts, KTS / k_equils, rtol=1e-10)
+
+    assert not equil.reverse_rxn_ktp_dct({}, SPC_THERMO_DCT, TEMPS)
+
+
+def test__k_equils():
+    """ test equil.stoich_matrix and equil.mech_k_equils
+    """
+    rxns = list(RXN_KTP_DCT)
+    spcs = ['H', 'H2', 'O', 'O2', 'OH']
+    stoich = equil.stoich_matrix(rxns, spcs)
+    assert stoich.shape == (4, 5)
+    assert np.array_equal(stoich.toarray(), [
+        [1, -1, -1, 0, 1],
+        [-1, 0, -1, 0, 1],
+        [0, 0, 2, -1, 0],
+        [-2, 1, 0, 0, 0]])
+    assert np.array_equal(equil.delta_ns(stoich), [0, -1, 1, -1])
+
+    rxn_gibbs, kps, kcs = equil.mech_k_equils(rxns, SPC_THERMO_DCT, TEMPS)
+    densities = 1.0 / (phycon.RC_ATM * TEMPS)
+    for rxn_idx, (rcts, prds, _) in enumerate(rxns):
+        ref_gibbs = (sum(GIBBS[prd] for prd in prds) -
+                     sum(GIBBS[rct] for rct in rcts))
+        ref_kps = np.exp(-ref_gibbs / (phycon.RC_CAL * TEMPS))
+        ref_kcs = ref_kps * densities**(len(prds) - len(rcts))
+        assert np.allclose(rxn_gibbs[rxn_idx], ref_gibbs, rtol=1e-12)
+        assert np.allclose(kps[rxn_idx], ref_kps, rtol=1e-10)
+        assert np.allclose(kcs[rxn_idx], ref_kcs, rtol=1e-10)
+
+    gibbs = equil.gibbs_matrix(SPC_THERMO_DCT, spcs)
+    assert np.allclose(equil.kp_equils(stoich, gibbs, TEMPS), kps)
+    assert np.allclose(equil.kc_equils(stoich, gibbs, TEMPS), kcs)
+    assert np.allclose(
+        equil.reverse_rate_factors(stoich, gibbs, TEMPS) * kcs, 1.0)
+
+
+if __name__ == '__main__':
+    test__reverse_rxn_ktp_dct()
+    test__k_equils()
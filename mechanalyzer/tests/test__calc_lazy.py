@@ -0,0 +1,58 @@
+"""
+Test the mechanalyzer.calculator.lazy functions
+"""
+
+import numpy as np
+from mechanalyzer.calculator import rates
+from mechanalyzer.calculator import lazy
+
+
+PRESSURES = np.array([0.1, 1.0, 10.0])
+TEMPS = np.array([1000.0, 1500.0, 2000.0])
+ARR_PARAMS = [1.04E+15, 0, 59810]
+HIGH_P_PARAMS = [1.26E+12, 0, 62620]
+
+RXN_PARAM_DCT = {
+    (('A',), ('B',), (None,)): ((ARR_PARAMS, None, None, None, None, None),),
+    (('B',), ('C',), ('(+M)',)): (
+        (HIGH_P_PARAMS, ARR_PARAMS, [0.6, 1e3, 7.0], None, None, None),),
+    (('C',), ('D',), (None,)): (
+        (ARR_PARAMS, None, None, None,
+         {0.1: ARR_PARAMS, 1.0: HIGH_P_PARAMS}, None),),
+}
+RXNS = list(RXN_PARAM_DCT)
+
+
+def test__lazy():
+    """ test lazy.LazyRxnKtpDct
+    """
+    ref_rxn_ktp_dct = rates.eval_rxn_param_dct(
+        RXN_PARAM_DCT, PRESSURES, TEMPS)
+    rxn_ktp_dct = lazy.LazyRxnKtpDct(RXN_PARAM_DCT, PRESSURES, TEMPS)
+
+    # Nothing is evaluated until a reaction is accessed
+    assert list(rxn_ktp_dct) == RXNS and len(rxn_ktp_dct) == 3
+    assert RXNS[0] in rxn_ktp_dct and 'X' not in rxn_ktp_dct
+    assert not any(rxn_ktp_dct.evaluated(rxn) for rxn in RXNS)
+
+    ktp_dct = rxn_ktp_dct[RXNS[1]]
+    assert rxn_ktp_dct.evaluated(RXNS[1])
+    assert not rxn_ktp_dct.evaluated(RXNS[0])
+    assert rxn_ktp_dct[RXNS[1]] is ktp_dct
+    assert rxn_ktp_dct.get('X') is None
+
+    rxn_ktp_dct.prefetch(RXNS[:2])
+    assert rxn_ktp_dct.evaluated(RXNS[0])
+    assert not rxn_ktp_dct.evaluated(RXNS[2])
+    assert rxn_ktp_dct[RXNS[1]] is ktp_dct
+
+    # Iterating over the items evaluates the rest
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(ktp_dct) == list(ref_rxn_ktp_dct[rxn])
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.allclose(kts, ref_rxn_ktp_dct[rxn][pressure][1])
+    assert all(rxn_ktp_dct.evaluated(rxn) for rxn in RXNS)
+
+
+if __name__ == '__main__':
+    test__lazy()
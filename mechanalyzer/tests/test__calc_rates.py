@@ -2,9 +2,13 @@
 Test the mechanalyzer.calculator.rates functions
 """
 
+import os
+import tempfile
+import warnings
 import numpy as np
 import ratefit.ktpdct
 from mechanalyzer.calculator import rates
+from mechanalyzer.calculator import compiled
 
 
 PRESSURES = np.array([0.316, 1.0, 10.0, 100.0])
@@ -85,6 +89,16 @@ DUPLICATE_PLOG_RXN_PARAM_DCT = {
              100: [1.04E+18, 0, 59810]}, None)
     )
 }
+DISJOINT_PLOG_RXN_PARAM_DCT = {
+    HIGH_P_RXN: (
+        (LOW_P_PARAMS, None, None, None,
+            {0.01: [1.04E+13, 0, 59810],
+             0.1: [1.04E+15, 0, 59810]}, None),
+        (LOW_P_PARAMS, None, None, None,
+            {1: [1.04E+16, 0, 59810],
+             100: [1.04E+18, 0, 59810]}, None)
+    )
+}
 
 
 def test__arrhenius():
@@ -150,6 +164,312 @@ def test__dup_plog():
     assert np.allclose(calc_rates, 2*PLOG_10ATM_KTS, rtol=1e-3)
 
 
+def test__dup_plog_disjoint():
+    """ Test the PLOG calculator for a duplicate reaction whose first
+        expression is not defined at any of the pressures
+    """
+    pressures = np.array([1.0, 10.0])
+    ref_ktp_dct = rates.eval_param_tup(
+        DISJOINT_PLOG_RXN_PARAM_DCT[HIGH_P_RXN][1], pressures, TEMPS)
+    assert list(ref_ktp_dct) == [1.0, 10.0]
+
+    rxn_ktp_dct = rates.eval_rxn_param_dct(
+        DISJOINT_PLOG_RXN_PARAM_DCT, pressures, TEMPS)
+    ktp_dct = rxn_ktp_dct[HIGH_P_RXN]
+    assert list(ktp_dct) == [1.0, 10.0]
+    for pressure, (_, kts) in ktp_dct.items():
+        assert np.allclose(kts, ref_ktp_dct[pressure][1], rtol=1e-10)
+
+    ktps = rates.eval_rxn_param_dct_points(
+        DISJOINT_PLOG_RXN_PARAM_DCT, TEMPS, np.array([1.0, 10.0, 1000.0]))
+    assert np.allclose(ktps[0, :2], [ref_ktp_dct[1.0][1][0],
+                                     ref_ktp_dct[10.0][1][1]], rtol=1e-10)
+    assert np.isnan(ktps[0, 2])
+
+
+def test__compiled():
+    """ Test the compiled evaluator against evaluating each param_tup
+    """
+    # Mechanism with every expression type and a mixed-type duplicate
+    param_tups_lst = (
+        ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN],
+        LINDEMANN_RXN_PARAM_DCT[HIGH_P_RXN],
+        TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+        PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+        CHEBYSHEV_RXN_PARAM_DCT[HIGH_P_RXN],
+        DUPLICATE_PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+        (TROE_RXN_PARAM_DCT[HIGH_P_RXN][0],
+         ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN][0],
+         PLOG_RXN_PARAM_DCT[HIGH_P_RXN][0]),
+    )
+    rxn_param_dct = {
+        (('R{}'.format(idx),), ('P',), (None,)): param_tups
+        for idx, param_tups in enumerate(param_tups_lst)}
+    pressures = np.array([0.01, 0.316, 1.0, 10.0, 100.0, 1000.0])
+
+    cmp_dct = compiled.compile_rxn_param_dct(rxn_param_dct)
+    rxn_ktp_dct = compiled.eval_compiled(cmp_dct, pressures, TEMPS)
+    assert list(rxn_ktp_dct) == list(rxn_param_dct)
+    for rxn, param_tups in rxn_param_dct.items():
+        ktp_dct = rxn_ktp_dct[rxn]
+        ref_ktp_dcts = [rates.eval_param_tup(param_tup, pressures, TEMPS)
+                        for param_tup in param_tups]
+        assert list(ktp_dct) == list(next(
+            ref_ktp_dct for ref_ktp_dct in ref_ktp_dcts if ref_ktp_dct))
+        for pressure, (_, kts) in ktp_dct.items():
+            ref_kts = sum(ref_ktp_dct[pressure][1]
+                          for ref_ktp_dct in ref_ktp_dcts
+                          if pressure in ref_ktp_dct)
+            assert np.allclose(kts, ref_kts, rtol=1e-10)
+
+    # Tables hold the same rates as the ktp_dcts
+    rxn_ktp_tables = compiled.eval_compiled(
+        cmp_dct, pressures, TEMPS, tables=True)
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(rxn_ktp_tables[rxn]) == list(ktp_dct)
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.array_equal(rxn_ktp_tables[rxn][pressure][1], kts)
+
+
+def test__log10():
+    """ Test the log10 output of the mechanism evaluator
+    """
+    # Duplicate with a negative A has to be summed before the log
+    neg_params = [-LOW_P_PARAMS[0] / 2.0] + LOW_P_PARAMS[1:]
+    rxn_param_dct = dict(TROE_RXN_PARAM_DCT)
+    rxn_param_dct[LOW_P_RXN] = (
+        (LOW_P_PARAMS, None, None, None, None, None),
+        (neg_params, None, None, None, None, None))
+
+    rxn_ktp_dct = rates.eval_rxn_param_dct(rxn_param_dct, PRESSURES, TEMPS)
+    log_rxn_ktp_dct = rates.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS, log10=True)
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(log_rxn_ktp_dct[rxn]) == list(ktp_dct)
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.allclose(
+                log_rxn_ktp_dct[rxn][pressure][1], np.log10(kts))
+    assert np.allclose(
+        log_rxn_ktp_dct[LOW_P_RXN]['high'][1], np.log10(ARRHENIUS_KTS / 2.0),
+        atol=1e-3)
+
+
+def test__derivs():
+    """ Test the analytic derivatives of the mechanism evaluator against
+        finite differences of its k(T,P)s
+    """
+    rxn_param_dct = {
+        (('R0',), ('P',), (None,)): TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R1',), ('P',), (None,)): CHEBYSHEV_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R2',), ('P',), (None,)): (
+            TROE_RXN_PARAM_DCT[HIGH_P_RXN][0],
+            ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN][0],
+            PLOG_RXN_PARAM_DCT[HIGH_P_RXN][0]),
+    }
+    pressures = np.array([0.01, 0.316, 3.0, 30.0])
+    step = 1e-5
+
+    rxn_ktp_dct, rxn_dinvt_dct, rxn_dlnp_dct = rates.eval_rxn_derivs(
+        rxn_param_dct, pressures, TEMPS)
+    ref_rxn_ktp_dct = rates.eval_rxn_param_dct(
+        rxn_param_dct, pressures, TEMPS)
+    fd_rxn_ktp_dcts = [
+        rates.eval_rxn_param_dct(rxn_param_dct, pressures, temps)
+        for temps in (TEMPS / (1 + step), TEMPS / (1 - step))]
+    fd_rxn_ktp_dcts += [
+        rates.eval_rxn_param_dct(rxn_param_dct, pressures * fac, TEMPS)
+        for fac in (np.exp(step), np.exp(-step))]
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(ktp_dct) == list(ref_rxn_ktp_dct[rxn])
+        fd_lst = [[kts for _, kts in fd_dct[rxn].values()]
+                  for fd_dct in fd_rxn_ktp_dcts]
+        for idx, (pressure, (_, kts)) in enumerate(ktp_dct.items()):
+            assert np.allclose(kts, ref_rxn_ktp_dct[rxn][pressure][1])
+            fd_dinvts = (np.log(fd_lst[0][idx] / fd_lst[1][idx]) /
+                         (2 * step / TEMPS))
+            fd_dlnps = np.log(fd_lst[2][idx] / fd_lst[3][idx]) / (2 * step)
+            assert np.allclose(
+                rxn_dinvt_dct[rxn][pressure][1], fd_dinvts, rtol=1e-5)
+            assert np.allclose(
+                rxn_dlnp_dct[rxn][pressure][1], fd_dlnps, atol=1e-5)
+
+    # Duplicates without a valid first expression, or summing to zero
+    neg_params = [-LOW_P_PARAMS[0]] + LOW_P_PARAMS[1:]
+    rxn_param_dct = {
+        (('R0',), ('P',), (None,)): DISJOINT_PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R1',), ('P',), (None,)): (
+            (LOW_P_PARAMS, None, None, None, None, None),
+            (neg_params, None, None, None, None, None)),
+    }
+    pressures = np.array([1.0, 10.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        rxn_ktp_dct, rxn_dinvt_dct, rxn_dlnp_dct = rates.eval_rxn_param_dct(
+            rxn_param_dct, pressures, TEMPS, derivs=True)
+    ref_dcts = rates.eval_param_tup_derivs(
+        DISJOINT_PLOG_RXN_PARAM_DCT[HIGH_P_RXN][1], pressures, TEMPS)
+    for rxn_dct, ref_dct in zip(
+            (rxn_ktp_dct, rxn_dinvt_dct, rxn_dlnp_dct), ref_dcts):
+        assert list(rxn_dct[(('R0',), ('P',), (None,))]) == [1.0, 10.0]
+        for pressure, (_, vals) in rxn_dct[(('R0',), ('P',), (None,))].items():
+            assert np.allclose(vals, ref_dct[pressure][1], rtol=1e-10)
+    assert np.all(rxn_ktp_dct[(('R1',), ('P',), (None,))]['high'][1] == 0.0)
+    assert np.all(np.isnan(
+        rxn_dinvt_dct[(('R1',), ('P',), (None,))]['high'][1]))
+
+
+def test__points():
+    """ Test the evaluation of a mechanism at paired (T, P) points
+    """
+    rxn_param_dct = {
+        (('R0',), ('P',), (None,)): ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN],
+        (('R1',), ('P',), (None,)): LINDEMANN_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R2',), ('P',), (None,)): TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R3',), ('P',), (None,)): CHEBYSHEV_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R4',), ('P',), (None,)): (
+            PLOG_RXN_PARAM_DCT[HIGH_P_RXN][0],
+            TROE_RXN_PARAM_DCT[HIGH_P_RXN][0],
+            ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN][0]),
+        (('R5',), ('P',), (None,)): DISJOINT_PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R6',), ('P',), (None,)): PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+    }
+    temps = np.array([800.0, 1000.0, 1250.0, 1500.0, 2000.0])
+    pressures = np.array([0.01, 0.316, 1.0, 30.0, 100.0])
+
+    ktps = rates.eval_rxn_param_dct_points(rxn_param_dct, temps, pressures)
+    log_ktps = rates.eval_rxn_param_dct_points(
+        rxn_param_dct, temps, pressures, log10=True)
+    assert ktps.shape == (len(rxn_param_dct), len(temps))
+    assert np.allclose(log_ktps, np.log10(ktps), equal_nan=True)
+
+    # Compare against evaluating each point on its own
+    for rxn_idx, param_tups in enumerate(rxn_param_dct.values()):
+        for pt_idx, (temp, pressure) in enumerate(zip(temps, pressures)):
+            ref_ktp_dcts = [
+                rates.eval_param_tup(
+                    param_tup, [pressure], np.array([temp]))
+                for param_tup in param_tups]
+            if not any(ref_ktp_dcts):  # PLOG out of range
+                assert np.isnan(ktps[rxn_idx, pt_idx])
+                continue
+            # P-independent duplicates contribute at every pressure
+            ref_kt = sum(
+                ktp_dct[pressure if pressure in ktp_dct else 'high'][1]
+                for ktp_dct in ref_ktp_dcts if ktp_dct)
+            assert np.allclose(ktps[rxn_idx, pt_idx], ref_kt, rtol=1e-10)
+
+
+def test__dense():
+    """ Test the dense array output of the mechanism evaluator
+    """
+    rxn_param_dct = {
+        (('R0',), ('P',), (None,)): ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN],
+        (('R1',), ('P',), (None,)): TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+        (('R2',), ('P',), (None,)): DUPLICATE_PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+    }
+    pressures = np.array([0.01, 1.0, 10.0])
+    ktp_arr, valid, rxn_idx_dct = rates.eval_rxn_param_dct_dense(
+        rxn_param_dct, pressures, TEMPS)
+    rxn_ktp_dct = rates.eval_rxn_param_dct(rxn_param_dct, pressures, TEMPS)
+
+    assert ktp_arr.shape == (3, 4, len(TEMPS))
+    assert np.array_equal(valid, [[False, False, False, True],
+                                  [True, True, True, True],
+                                  [False, True, True, False]])
+    assert np.all(np.isnan(ktp_arr[~valid]))
+    keys = list(pressures) + ['high']
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        rxn_idx = rxn_idx_dct[rxn]
+        assert [keys[idx] for idx in np.flatnonzero(valid[rxn_idx])] == (
+            list(ktp_dct))
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.allclose(ktp_arr[rxn_idx, keys.index(pressure)], kts)
+
+
+def test__parallel():
+    """ Test the parallel evaluation of a mechanism
+    """
+    param_tups_lst = (
+        ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN],
+        LINDEMANN_RXN_PARAM_DCT[HIGH_P_RXN],
+        TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+        PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+        CHEBYSHEV_RXN_PARAM_DCT[HIGH_P_RXN],
+        DUPLICATE_PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+    ) * 3
+    rxn_param_dct = {
+        (('R{}'.format(idx),), ('P',), (None,)): param_tups
+        for idx, param_tups in enumerate(param_tups_lst)}
+
+    # Every reaction is assigned once, with the costs spread evenly
+    parts = compiled.partition_rxns(rxn_param_dct, 3, len(PRESSURES))
+    assert sorted(sum(parts, [])) == list(range(len(rxn_param_dct)))
+    loads = [sum(compiled.expression_cost(tup, len(PRESSURES))
+                 for idx in part
+                 for tup in param_tups_lst[idx]) for part in parts]
+    assert max(loads) <= 1.5 * min(loads)
+
+    ref_rxn_ktp_dct = rates.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS)
+    rxn_ktp_dct = rates.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS, parallel=True, nprocs=3)
+    assert list(rxn_ktp_dct) == list(ref_rxn_ktp_dct)
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        assert list(ktp_dct) == list(ref_rxn_ktp_dct[rxn])
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.array_equal(kts, ref_rxn_ktp_dct[rxn][pressure][1])
+
+    # A failed worker raises, rather than dropping its reactions
+    bad_rxn_param_dct = dict(rxn_param_dct)
+    bad_rxn_param_dct[(('R0',), ('P',), (None,))] = (
+        ([1.0, 2.0], None, None, None, None, None),)
+    raised = False
+    try:
+        compiled.eval_dense_parallel(
+            bad_rxn_param_dct, PRESSURES, TEMPS, nprocs=3)
+    except RuntimeError:
+        raised = True
+    assert raised
+
+
+def test__chunks():
+    """ Test the chunked evaluation of a mechanism, in memory and on disk
+    """
+    rxn_param_dct = {
+        (('R{}'.format(idx),), ('P',), (None,)): param_tups
+        for idx, param_tups in enumerate((
+            ARRHENIUS_RXN_PARAM_DCT[LOW_P_RXN],
+            TROE_RXN_PARAM_DCT[HIGH_P_RXN],
+            PLOG_RXN_PARAM_DCT[HIGH_P_RXN],
+            CHEBYSHEV_RXN_PARAM_DCT[HIGH_P_RXN],
+            DUPLICATE_PLOG_RXN_PARAM_DCT[HIGH_P_RXN]))}
+    ref_rxn_ktp_dct = rates.eval_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS)
+
+    rxn_ktp_dcts = list(rates.iter_rxn_param_dct(
+        rxn_param_dct, PRESSURES, TEMPS, chunk_size=2))
+    assert [len(rxn_ktp_dct) for rxn_ktp_dct in rxn_ktp_dcts] == [2, 2, 1]
+    rxn_ktp_dct = {}
+    for chunk_rxn_ktp_dct in rxn_ktp_dcts:
+        rxn_ktp_dct.update(chunk_rxn_ktp_dct)
+    assert list(rxn_ktp_dct) == list(ref_rxn_ktp_dct)
+    for rxn, ktp_dct in rxn_ktp_dct.items():
+        for pressure, (_, kts) in ktp_dct.items():
+            assert np.array_equal(kts, ref_rxn_ktp_dct[rxn][pressure][1])
+
+    ref_ktp_arr, ref_valid, _ = rates.eval_rxn_param_dct_dense(
+        rxn_param_dct, PRESSURES, TEMPS)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'rates')
+        _, _, rxn_idx_dct = rates.write_rxn_param_dct_dense(
+            rxn_param_dct, PRESSURES, TEMPS, path, chunk_size=2)
+        ktp_arr, valid = rates.read_rxn_dense(path)
+        assert list(rxn_idx_dct) == list(rxn_param_dct)
+        assert np.allclose(ktp_arr, ref_ktp_arr, rtol=0.0, atol=0.0, equal_nan=True)
+        assert np.array_equal(valid, ref_valid)
+        del ktp_arr, valid
+
+
 if __name__ == '__main__':
     test__arrhenius()
     test__lindemann()
@@ -158,3 +478,11 @@ if __name__ == '__main__':
     test__chebyshev()
     test__dup_arrhenius()
     test__dup_plog()
+    test__dup_plog_disjoint()
+    test__compiled()
+    test__log10()
+    test__derivs()
+    test__points()
+    test__dense()
+    test__parallel()
+    test__chunks()
@@ -1,8 +1,8 @@
 """ Test the calculator/thermo.py functions
 """
 
-from mechanalyzer.calculator import thermo
 import numpy as np
+from mechanalyzer.calculator import thermo
 
 TEMPS = np.array([1000, 1500, 2000])
 BAD_TEMPS = np.array([1000, 1500, 7000])
@@ -51,6 +51,63 @@ def test__invalid_temps():
     assert calc_g[2] is None
 
 
+def test__stacked():
+    """ Test the thermo calculator for stacked species arrays
+    """
+    spc_nasa7_dct = dict(SPC_NASA7_DCT)
+    spc_nasa7_dct['N2O_NARROW'] = SPC_NASA7_DCT['N2O'][:3] + [
+        [300.0, 1600.0, 1200.0], SPC_NASA7_DCT['N2O'][4]]
+    spcs, cfts, t_lims = thermo.stack_nasa7_params(spc_nasa7_dct)
+    assert spcs == ['N2O', 'N2O_NARROW']
+    assert cfts.shape == (2, 2, 7) and t_lims.shape == (2, 3)
+
+    thermo_arrs = thermo.nasa7_thermo(cfts, t_lims, BAD_TEMPS)
+    valid = thermo.valid_temps(t_lims, BAD_TEMPS)
+    assert np.array_equal(valid, [[True, True, False], [True, True, False]])
+    for spc_idx, spc in enumerate(spcs):
+        for temp_idx, temp in enumerate(BAD_TEMPS[:2]):
+            ref_vals = (
+                thermo.enthalpy(spc_nasa7_dct[spc], temp),
+                thermo.heat_capacity(spc_nasa7_dct[spc], temp),
+                thermo.entropy(spc_nasa7_dct[spc], temp),
+                thermo.gibbs(spc_nasa7_dct[spc], temp))
+            for arr, ref_val in zip(thermo_arrs, ref_vals):
+                assert np.isclose(arr[spc_idx, temp_idx], ref_val, rtol=1e-12)
+
+
+def test__nasa7_consistency():
+    """ Test the scan of the NASA-7 polynomials for jumps and range coverage
+    """
+    # Shift the constant of the high-T cp(T) polynomial by 0.5 R
+    nasa7_params = SPC_NASA7_DCT['N2O']
+    high_cfts = list(nasa7_params[4][0])
+    high_cfts[0] += 0.5
+    spc_nasa7_dct = dict(SPC_NASA7_DCT)
+    spc_nasa7_dct['N2O_JUMP'] = nasa7_params[:4] + [(high_cfts, nasa7_params[4][1])]
+    spc_nasa7_dct['N2O_NARROW'] = nasa7_params[:3] + [
+        [300.0, 1600.0, 1000.0], nasa7_params[4]]
+
+    scan = thermo.nasa7_consistency(spc_nasa7_dct, temps=BAD_TEMPS)
+    assert list(scan['spc']) == ['N2O', 'N2O_JUMP', 'N2O_NARROW']
+    assert np.array_equal(scan['t_mid'], [1000.0, 1000.0, 1000.0])
+    assert np.allclose(scan['d_cp'][1] - scan['d_cp'][0], 0.5 * thermo.RC)
+    assert np.allclose(scan['d_h'][1] - scan['d_h'][0], 0.5 * thermo.RC * 1000.0)
+    assert np.allclose(scan['d_s'][1] - scan['d_s'][0],
+                       0.5 * thermo.RC * np.log(1000.0))
+    assert list(scan['n_out']) == [1, 1, 1]
+    assert np.array_equal(scan['t_out_min'], [7000.0, 7000.0, 7000.0])
+
+    # The original polynomials are continuous at the mid temperature
+    scan = thermo.nasa7_consistency(spc_nasa7_dct, temps=TEMPS)
+    assert list(scan['n_out']) == [0, 0, 1]
+    assert np.isnan(scan['t_out_min'][0]) and scan['t_out_max'][2] == 2000.0
+    problems = thermo.nasa7_problems(scan)
+    assert list(problems['spc']) == ['N2O_JUMP', 'N2O_NARROW']
+    assert not thermo.nasa7_consistency({}).size
+
+
 if __name__ == '__main__':
     test__valid_temps()
     test__invalid_temps()
+    test__stacked()
+    test__nasa7_consistency()
@@ -1,4 +1,5 @@
 import mechanalyzer.calculator.compare as compare
+import mechanalyzer.calculator.cache as calc_cache
 import mechanalyzer.plotter.rates as plot_rates
 import numpy as np
 import mechanalyzer.parser.mech as mech_parser
@@ -17,10 +18,30 @@ pressures = np.array([1, 10, 100])
 # Sorting; either 'rates', 'ratios', or None
 sort_method = 'ratios'
 
+# Directories of on-disk rate and thermo caches shared across runs, or None
+rate_cache_path = None
+rate_cache_size = 2 * 1024**3  # bytes
+rate_cache_entries = 100000  # ktp_dcts kept in memory
+thermo_cache_path = None
+thermo_cache_size = 256 * 1024**2  # bytes
+thermo_cache_entries = 20000  # thermo arrays kept in memory
+
 # Load dcts
 JOB_PATH = sys.argv[1]
-rxn_ktp_dcts = compare.load_rxn_ktp_dcts_chemkin(mech_filenames, JOB_PATH, temps, pressures)
-spc_thermo_dcts = compare.load_spc_thermo_dcts_chemkin(thermo_filenames, JOB_PATH, temps)
+if rate_cache_path is not None:
+    rate_cache = calc_cache.EvalCache(path=rate_cache_path, max_size=rate_cache_size,
+                                      max_entries=rate_cache_entries)
+else:
+    rate_cache = None
+if thermo_cache_path is not None:
+    thermo_cache = calc_cache.ThermoCache(path=thermo_cache_path, max_size=thermo_cache_size,
+                                          max_entries=thermo_cache_entries)
+else:
+    thermo_cache = None
+rxn_ktp_dcts = compare.load_rxn_ktp_dcts_chemkin(
+    mech_filenames, JOB_PATH, temps, pressures, cache=rate_cache)
+spc_thermo_dcts = compare.load_spc_thermo_dcts_chemkin(
+    thermo_filenames, JOB_PATH, temps, cache=thermo_cache)
 spc_ident_dcts = compare.load_spc_ident_dcts(spc_csv_filenames, JOB_PATH)
 
 # Get the aligned_rxn_ktp_dct 
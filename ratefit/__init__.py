@@ -3,12 +3,14 @@
 """
 
 from ratefit import ktpdct
+from ratefit import ktptable
 from ratefit import calc
 from ratefit import fit
 
 
 __all__ = [
     'ktpdct',
+    'ktptable',
     'calc',
     'fit'
 ]
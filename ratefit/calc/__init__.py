@@ -8,9 +8,44 @@ from ratefit.calc._rates import arrhenius
 from ratefit.calc._rates import lowp_limit
 from ratefit.calc._rates import lindemann
 from ratefit.calc._rates import troe
-from ratefit.calc._rates import plog
+from ratefit.calc._plog import plog
 from ratefit.calc._rates import chebyshev
+from ratefit.calc._rates import lowp_limit_grid
+from ratefit.calc._rates import lindemann_grid
+from ratefit.calc._rates import troe_grid
+from ratefit.calc._rates import troe_temp_terms
+from ratefit.calc._rates import troe_from_temp_terms
+from ratefit.calc._plog import plog_grid
+from ratefit.calc._plog import PlogInterpolator
+from ratefit.calc._rates import chebyshev_grid
+from ratefit.calc._rates import chebyshev_batch
+from ratefit.calc._batch import stack_arrhenius
+from ratefit.calc._batch import arrhenius_batch
+from ratefit.calc._batch import lindemann_batch
+from ratefit.calc._batch import troe_batch
+from ratefit.calc._batch import troe_temp_terms_batch
+from ratefit.calc._batch import stack_plog
+from ratefit.calc._batch import plog_batch
+from ratefit.calc._batch import stack_chebyshev
+from ratefit.calc._batch import lindemann_points
+from ratefit.calc._batch import troe_points
+from ratefit.calc._batch import plog_points
+from ratefit.calc._batch import chebyshev_points
 from ratefit.calc._rates import p_to_m
+from ratefit.calc._backend import set_backend
+from ratefit.calc._backend import get_backend
+from ratefit.calc._backend import available_backends
+from ratefit.calc._rates import log10_sum
+from ratefit.calc._deriv import arrhenius_derivs
+from ratefit.calc._deriv import lindemann_derivs
+from ratefit.calc._deriv import troe_derivs
+from ratefit.calc._deriv import plog_derivs
+from ratefit.calc._deriv import chebyshev_derivs
+from ratefit.calc._deriv import arrhenius_derivs_batch
+from ratefit.calc._deriv import lindemann_derivs_batch
+from ratefit.calc._deriv import troe_derivs_batch
+from ratefit.calc._deriv import plog_derivs_batch
+from ratefit.calc._deriv import chebyshev_derivs_batch
 
 
 __all__ = [
@@ -22,5 +57,40 @@ __all__ = [
     'troe',
     'plog',
     'chebyshev',
+    'lowp_limit_grid',
+    'lindemann_grid',
+    'troe_grid',
+    'troe_temp_terms',
+    'troe_from_temp_terms',
+    'plog_grid',
+    'PlogInterpolator',
+    'chebyshev_grid',
+    'chebyshev_batch',
+    'stack_arrhenius',
+    'arrhenius_batch',
+    'lindemann_batch',
+    'troe_batch',
+    'troe_temp_terms_batch',
+    'stack_plog',
+    'plog_batch',
+    'stack_chebyshev',
+    'lindemann_points',
+    'troe_points',
+    'plog_points',
+    'chebyshev_points',
     'p_to_m',
+    'log10_sum',
+    'arrhenius_derivs',
+    'lindemann_derivs',
+    'troe_derivs',
+    'plog_derivs',
+    'chebyshev_derivs',
+    'arrhenius_derivs_batch',
+    'lindemann_derivs_batch',
+    'troe_derivs_batch',
+    'plog_derivs_batch',
+    'chebyshev_derivs_batch',
+    'set_backend',
+    'get_backend',
+    'available_backends',
 ]
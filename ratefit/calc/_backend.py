@@ -0,0 +1,66 @@
+"""
+Select the backend used to evaluate the ratefit.calc kernels
+
+'numpy': vectorized NumPy code (default, always available)
+'numba': JIT-compiled, loop-fused kernels (requires numba)
+"""
+
+import importlib.util
+
+
+BACKENDS = ('numpy', 'numba')
+_STATE = {'backend': 'numpy', 'kernels': None}
+
+
+def available_backends():
+    """ Backends that can be used in the current environment
+
+        :rtype: tuple(str)
+    """
+    # numba is only imported (through _jit) once it is selected, so that
+    # importing ratefit does not pay for it
+    return tuple(backend for backend in BACKENDS
+                 if backend != 'numba' or
+                 importlib.util.find_spec('numba') is not None)
+
+
+def set_backend(backend):
+    """ Select the backend used by the arrhenius, troe, plog, and
+        chebyshev functions. The numba kernels are compiled on first use.
+
+        :param backend: name of the backend, 'numpy' or 'numba'
+        :type backend: str
+    """
+
+    assert backend in BACKENDS, (
+        f'backend is {backend}; should be one of {BACKENDS}'
+    )
+    assert backend in available_backends(), (
+        f'backend {backend} is not available; is the package installed?'
+    )
+
+    if backend == 'numba':
+        from ratefit.calc import _jit
+        _STATE['kernels'] = _jit.KERNELS
+    else:
+        _STATE['kernels'] = None
+    _STATE['backend'] = backend
+
+
+def get_backend():
+    """ Name of the backend currently in use
+
+        :rtype: str
+    """
+    return _STATE['backend']
+
+
+def kernel(name):
+    """ Compiled kernel for a functional form under the current backend,
+        or None if the NumPy code should be used
+
+        :param name: 'arrhenius', 'troe', 'plog', or 'chebyshev'
+        :type name: str
+    """
+    kernels = _STATE['kernels']
+    return None if kernels is None else kernels[name]
@@ -0,0 +1,592 @@
+"""
+Calculate rates for many reactions at once from stacked parameter arrays
+
+Every function here works on parameters stacked along a leading reaction
+axis. Temperatures and pressures are laid out on a grid, so that the
+P-dependent functions return arrays of shape (nrxn, nP, nT). The *_points
+functions instead take paired temperatures and pressures, (T_i, P_i), and
+return arrays of shape (nrxn, npts).
+"""
+
+import numpy as np
+from ratefit.calc._rates import RC
+from ratefit.calc._rates import RC2
+from ratefit.calc._rates import LN10
+from ratefit.calc._rates import p_to_m
+from ratefit.calc._rates import troe_temp_terms
+from ratefit.calc._rates import troe_from_temp_terms
+from ratefit.calc._rates import log10_sum
+from ratefit.calc._rates import log10_falloff
+from ratefit.calc._cheb import pad_alphas
+from ratefit.calc._cheb import reduced_temps
+from ratefit.calc._cheb import reduced_pressures
+from ratefit.calc._cheb import log10k_batch
+
+
+def stack_arrhenius(params_lst):
+    """ Stack single and double Arrhenius parameter sets into one array.
+        Single expressions are padded with a second term where A = 0.
+
+        :param params_lst: Arrhenius fitting parameters for each reaction
+        :type params_lst: list(list(float))
+        :return params: stacked parameters, [A, n, Ea] for each term
+        :rtype: numpy.ndarray (nrxn, 2, 3)
+    """
+    params = np.zeros((len(params_lst), 2, 3))
+    for idx, arr_params in enumerate(params_lst):
+        assert len(arr_params) in (3, 6)
+        params[idx, :len(arr_params) // 3] = np.reshape(arr_params, (-1, 3))
+
+    return params
+
+
+def arrhenius_batch(params, t_ref, temps, rval=RC, log10=False):
+    """ Calculates T-dependent rate constants [k(T)]s for a stack of
+        single or double Arrhenius expressions.
+
+        :param params: stacked parameters from stack_arrhenius
+        :type params: numpy.ndarray (nrxn, nterm, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray
+        :param log10: return log10 k(T)s instead of k(T)s
+        :type log10: bool
+        :return kts: T-dependent rate constants
+        :rtype: numpy.ndarray (nrxn,) + temps.shape
+    """
+
+    params = np.asarray(params, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    nterms = params.shape[1]
+    if log10:
+        return _log10_arrhenius_batch(params, t_ref, temps, rval)
+
+    kts = np.zeros((params.shape[0],) + temps.shape)
+    for tidx in range(nterms):
+        # Skip padded terms altogether if no reaction uses them
+        if tidx > 0 and not np.any(params[:, tidx, 0]):
+            continue
+        a_pars, n_pars, ea_pars = (
+            expand_pars(params[:, tidx, pidx], temps.ndim) for pidx in range(3))
+        kts += (
+            a_pars * ((temps / t_ref)**n_pars) *
+            np.exp(-ea_pars/(rval*temps))
+        )
+
+    return kts
+
+
+def lindemann_batch(highp_kts, lowp_kts, temps, pressures,
+                    collid_factor=1.0, log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s for a stack of
+        Lindemann expressions.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, nT)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, nT)
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, nP, nT)
+    """
+    temps, pressures = grid_axes(temps, pressures)
+    return _lindemann(tgrid(highp_kts), tgrid(lowp_kts), temps, pressures,
+                      collid_factor, log10)
+
+
+def lindemann_points(highp_kts, lowp_kts, temps, pressures,
+                     collid_factor=1.0, log10=False):
+    """ Calculates k(T,P)s for a stack of Lindemann expressions at paired
+        temperatures and pressures.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, npts)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, npts)
+        :param temps: Temperature of each point
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: Pressure of each point
+        :type pressures: numpy.ndarray (npts,)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+    temps, pressures = _point_axes(temps, pressures)
+    return _lindemann(np.asarray(highp_kts), np.asarray(lowp_kts), temps,
+                      pressures, collid_factor, log10)
+
+
+def troe_batch(highp_kts, lowp_kts, temps, pressures, troe_params,
+               collid_factor=1.0, temp_terms=None, log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s for a stack of
+        Troe expressions.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, nT)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, nT)
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param troe_params: [alpha, T3, T1, T2] for each reaction,
+            with T2 set to NaN if it is omitted
+        :type troe_params: numpy.ndarray (nrxn, 4)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param temp_terms: terms from troe_temp_terms_batch, to skip
+            recomputing them
+        :type temp_terms: tuple(numpy.ndarray)
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, nP, nT)
+    """
+
+    if temp_terms is None:
+        temp_terms = troe_temp_terms_batch(
+            highp_kts, lowp_kts, temps, troe_params, log10=log10)
+    _, pressures = grid_axes(temps, pressures)
+
+    return troe_from_temp_terms(
+        tgrid(highp_kts), temp_terms, pressures, collid_factor=collid_factor,
+        log10=log10)
+
+
+def troe_temp_terms_batch(highp_kts, lowp_kts, temps, troe_params,
+                          log10=False):
+    """ Calculates the temperature-only terms of a stack of Troe
+        expressions once, for reuse with troe_batch at any pressures.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, nT)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, nT)
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param troe_params: [alpha, T3, T1, T2] for each reaction,
+            with T2 set to NaN if it is omitted
+        :type troe_params: numpy.ndarray (nrxn, 4)
+        :param log10: k(T)s are given, and Pr/P returned, as log10 values
+        :type log10: bool
+        :return temp_terms: Pr/P, log10(Fcent), c, and n terms
+        :rtype: tuple(numpy.ndarray (nrxn, 1, nT))
+    """
+    temps, _ = grid_axes(temps, [])
+    alpha, ts3, ts1, ts2 = (
+        expand_pars(np.asarray(troe_params, dtype=float)[:, idx], temps.ndim)
+        for idx in range(4))
+
+    return troe_temp_terms(
+        tgrid(highp_kts), tgrid(lowp_kts), temps, alpha, ts3, ts1, ts2=ts2,
+        log10=log10)
+
+
+def troe_points(highp_kts, lowp_kts, temps, pressures, troe_params,
+                collid_factor=1.0, log10=False):
+    """ Calculates k(T,P)s for a stack of Troe expressions at paired
+        temperatures and pressures.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, npts)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, npts)
+        :param temps: Temperature of each point
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: Pressure of each point
+        :type pressures: numpy.ndarray (npts,)
+        :param troe_params: [alpha, T3, T1, T2] for each reaction,
+            with T2 set to NaN if it is omitted
+        :type troe_params: numpy.ndarray (nrxn, 4)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+    temps, pressures = _point_axes(temps, pressures)
+    alpha, ts3, ts1, ts2 = (
+        expand_pars(np.asarray(troe_params, dtype=float)[:, idx], 1)
+        for idx in range(4))
+    temp_terms = troe_temp_terms(
+        highp_kts, lowp_kts, temps, alpha, ts3, ts1, ts2=ts2, log10=log10)
+
+    return troe_from_temp_terms(
+        highp_kts, temp_terms, pressures, collid_factor=collid_factor,
+        log10=log10)
+
+
+def stack_plog(plog_dcts):
+    """ Stack the PLOG expressions of several reactions. Reactions with
+        fewer PLOG pressures are padded with NaN pressures.
+
+        :param plog_dcts: PLOG parameters for each reaction
+        :type plog_dcts: list(dict[pressure: [fit_params]])
+        :return plog_pressures: sorted PLOG pressures for each reaction
+        :rtype: numpy.ndarray (nrxn, max nodes)
+        :return plog_params: Arrhenius parameters at each PLOG pressure
+        :rtype: numpy.ndarray (nrxn, max nodes, 2, 3)
+    """
+
+    nnodes = max((len(plog_dct) for plog_dct in plog_dcts), default=1)
+    plog_pressures = np.full((len(plog_dcts), nnodes), np.nan)
+    plog_params = np.zeros((len(plog_dcts), nnodes, 2, 3))
+    for idx, plog_dct in enumerate(plog_dcts):
+        sort_pressures = sorted(plog_dct.keys())
+        plog_pressures[idx, :len(sort_pressures)] = sort_pressures
+        plog_params[idx, :len(sort_pressures)] = stack_arrhenius(
+            [plog_dct[pressure] for pressure in sort_pressures])
+
+    return plog_pressures, plog_params
+
+
+def plog_batch(plog_pressures, plog_params, t_ref, temps, pressures,
+               out_of_range='drop', log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s for a stack of
+        PLOG expressions, interpolating in log(P) for every reaction and
+        pressure at once.
+
+        :param plog_pressures: sorted PLOG pressures from stack_plog
+        :type plog_pressures: numpy.ndarray (nrxn, max nodes)
+        :param plog_params: Arrhenius parameters from stack_plog
+        :type plog_params: numpy.ndarray (nrxn, max nodes, 2, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param out_of_range: 'drop' (NaN), 'clamp', or 'extrapolate'
+            pressures outside of the PLOG range
+        :type out_of_range: str
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, nP, nT)
+    """
+    temps, pressures = grid_axes(temps, pressures)
+    logktps = _plog_log10_ktps(
+        plog_pressures, plog_params, t_ref, temps, pressures,
+        out_of_range=out_of_range)
+
+    return logktps if log10 else 10**logktps
+
+
+def plog_points(plog_pressures, plog_params, t_ref, temps, pressures,
+                out_of_range='drop', log10=False):
+    """ Calculates k(T,P)s for a stack of PLOG expressions at paired
+        temperatures and pressures.
+
+        :param plog_pressures: sorted PLOG pressures from stack_plog
+        :type plog_pressures: numpy.ndarray (nrxn, max nodes)
+        :param plog_params: Arrhenius parameters from stack_plog
+        :type plog_params: numpy.ndarray (nrxn, max nodes, 2, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temperature of each point
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: Pressure of each point
+        :type pressures: numpy.ndarray (npts,)
+        :param out_of_range: 'drop' (NaN), 'clamp', or 'extrapolate'
+            pressures outside of the PLOG range
+        :type out_of_range: str
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+    temps, pressures = _point_axes(temps, pressures)
+    logktps = _plog_log10_ktps(
+        plog_pressures, plog_params, t_ref, temps[0], pressures[0],
+        out_of_range=out_of_range)
+
+    return logktps if log10 else 10**logktps
+
+
+def _plog_log10_ktps(plog_pressures, plog_params, t_ref, temps, pressures,
+                     out_of_range='drop'):
+    """ Interpolate log10 k(T,P)s of stacked PLOG expressions at
+        temperatures and pressures that broadcast against each other
+        and have the same number of dimensions.
+    """
+
+    assert out_of_range in ('drop', 'clamp', 'extrapolate')
+    node_logks = plog_node_vals(
+        arrhenius_batch, plog_params, t_ref, temps, log10=True)
+    _, _, lidxs, hidxs, pres_terms, in_range = plog_brackets(
+        plog_pressures, pressures, out_of_range)
+
+    # Calculate log K(T,P)s with PLOG expression
+    logkt_low = take_nodes(node_logks, lidxs)
+    logkt_high = take_nodes(node_logks, hidxs)
+    logktps = logkt_low + (logkt_high - logkt_low) * pres_terms
+
+    # Mask out the pressures that are not in the range of the PLOG
+    if out_of_range == 'drop':
+        logktps = np.where(in_range, logktps, np.nan)
+
+    return logktps
+
+
+def plog_node_vals(fxn, plog_params, t_ref, temps, **kwargs):
+    """ Evaluate a batch Arrhenius function at every PLOG pressure of
+        every reaction at once.
+
+        :param fxn: function of stacked Arrhenius parameters, t_ref, and
+            temps, such as arrhenius_batch
+        :type fxn: function
+        :param plog_params: stacked parameters from stack_plog
+        :type plog_params: numpy.ndarray (nrxn, nodes, 2, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray
+        :param kwargs: keyword arguments passed on to fxn
+        :return vals: output(s) of fxn at each PLOG pressure
+        :rtype: numpy.ndarray (nrxn, nodes) + temps.shape, or a tuple of
+            them if fxn returns a tuple
+    """
+    nrxns, max_nodes = plog_params.shape[:2]
+    vals = fxn(plog_params.reshape(nrxns * max_nodes, 2, 3), t_ref, temps,
+               **kwargs)
+    if isinstance(vals, tuple):
+        return tuple(val.reshape((nrxns, max_nodes) + temps.shape)
+                     for val in vals)
+    return vals.reshape((nrxns, max_nodes) + temps.shape)
+
+
+def plog_brackets(plog_pressures, pressures, out_of_range):
+    """ Find, for every reaction and pressure, the segment of PLOG
+        pressures whose interpolation line covers the pressure (seg_lidxs,
+        seg_hidxs), the PLOG pressures to interpolate between (lidxs,
+        hidxs; the same node where the pressure is a PLOG pressure), the
+        position between them in log P, and whether the pressure is in
+        the range of the PLOG.
+
+        :param plog_pressures: PLOG pressures of each reaction, NaN padded
+        :type plog_pressures: numpy.ndarray (nrxn, nodes)
+        :param pressures: Pressures (atm), laid out as by grid_axes
+        :type pressures: numpy.ndarray
+        :param out_of_range: handling of pressures outside the PLOG range
+        :type out_of_range: str
+        :return: seg_lidxs, seg_hidxs, lidxs, hidxs, pres_terms, in_range
+        :rtype: tuple(numpy.ndarray), each (nrxn,) + pressures.shape
+    """
+
+    nrxns, max_nodes = plog_pressures.shape
+    ndim = pressures.ndim
+
+    # Pressures of each reaction, with the NaN padding pushed to +inf
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_nodes = np.where(
+            np.isnan(plog_pressures), np.inf, np.log10(plog_pressures))
+    nnodes = np.sum(~np.isnan(plog_pressures), axis=1)
+    log_pmin = expand_pars(log_nodes[:, 0], ndim)
+    log_pmax = expand_pars(log_nodes[np.arange(nrxns), nnodes-1], ndim)
+
+    log_pressures = np.log10(pressures)[None, ...]
+    in_range = (log_pressures >= log_pmin) & (log_pressures <= log_pmax)
+    if out_of_range == 'clamp':
+        log_pressures = np.clip(log_pressures, log_pmin, log_pmax)
+
+    # Find the PLOG pressures bracketing each pressure
+    node_axes = (slice(None), slice(None)) + (None,) * ndim
+    counts = np.sum(log_nodes[node_axes] <= log_pressures[:, None], axis=1)
+    seg_hidxs = np.clip(counts, 1, expand_pars(np.maximum(nnodes-1, 1), ndim))
+    seg_lidxs = seg_hidxs - 1
+    seg_hidxs = np.where(expand_pars(nnodes, ndim) == 1, seg_lidxs, seg_hidxs)
+
+    # Use the PLOG pressure itself if the pressure is (nearly) defined
+    matches = np.isclose(
+        pressures[None, None, ...], plog_pressures[node_axes], atol=1.0e-3)
+    matched = np.any(matches, axis=1)
+    midxs = max_nodes - 1 - np.argmax(matches[:, ::-1], axis=1)
+    lidxs = np.where(matched, midxs, seg_lidxs)
+    hidxs = np.where(matched, midxs, seg_hidxs)
+
+    # Calculate pressure term for PLOG expression
+    log_plow = take_nodes(log_nodes[node_axes], lidxs)
+    log_phigh = take_nodes(log_nodes[node_axes], hidxs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pres_terms = np.where(
+            hidxs == lidxs, 0.0,
+            (log_pressures - log_plow) / (log_phigh - log_plow))
+
+    return seg_lidxs, seg_hidxs, lidxs, hidxs, pres_terms, in_range
+
+
+def stack_chebyshev(cheb_dcts):
+    """ Stack the Chebyshev expressions of several reactions for use
+        with chebyshev_batch. Coefficient matrices are zero-padded.
+
+        :param cheb_dcts: Chebyshev parameters for each reaction
+        :type cheb_dcts: list(dict)
+        :return alphas: zero-padded coefficient matrices
+        :rtype: numpy.ndarray (nrxn, max nT-terms, max nP-terms)
+        :return t_limits: [tmin, tmax] for each reaction
+        :rtype: numpy.ndarray (nrxn, 2)
+        :return p_limits: [pmin, pmax] for each reaction
+        :rtype: numpy.ndarray (nrxn, 2)
+    """
+    alphas = pad_alphas([cheb_dct['alpha_elm'] for cheb_dct in cheb_dcts])
+    t_limits = np.reshape(
+        [cheb_dct['t_limits'] for cheb_dct in cheb_dcts], (-1, 2))
+    p_limits = np.reshape(
+        [cheb_dct['p_limits'] for cheb_dct in cheb_dcts], (-1, 2))
+
+    return alphas, t_limits, p_limits
+
+
+def chebyshev_points(alphas, t_limits, p_limits, temps, pressures,
+                     log10=False):
+    """ Calculates k(T,P)s for a stack of Chebyshev expressions at paired
+        temperatures and pressures.
+
+        :param alphas: zero-padded coefficient matrices from stack_chebyshev
+        :type alphas: numpy.ndarray (nrxn, max nT-terms, max nP-terms)
+        :param t_limits: [tmin, tmax] for each reaction
+        :type t_limits: numpy.ndarray (nrxn, 2)
+        :param p_limits: [pmin, pmax] for each reaction
+        :type p_limits: numpy.ndarray (nrxn, 2)
+        :param temps: Temperature of each point
+        :type temps: numpy.ndarray (npts,)
+        :param pressures: Pressure of each point
+        :type pressures: numpy.ndarray (npts,)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray (nrxn, npts)
+    """
+    temps, pressures = _point_axes(temps, pressures)
+    t_limits = np.reshape(np.asarray(t_limits, dtype=float), (-1, 2, 1))
+    p_limits = np.reshape(np.asarray(p_limits, dtype=float), (-1, 2, 1))
+    ctemps = reduced_temps(temps, t_limits[:, 0], t_limits[:, 1])
+    cpresses = reduced_pressures(pressures, p_limits[:, 0], p_limits[:, 1])
+    logktps = log10k_batch(alphas, ctemps, cpresses)
+
+    return logktps if log10 else 10**logktps
+
+
+# Helper functions
+def _log10_arrhenius_batch(params, t_ref, temps, rval):
+    """ Calculates log10 k(T)s for stacked Arrhenius expressions, summing
+        the terms in log space; reactions with a negative A fall back to
+        the log10 of the linear sum
+    """
+
+    a_pars = params[:, :, 0]
+    logkts = np.full((params.shape[0],) + temps.shape, -np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for tidx in range(params.shape[1]):
+            if tidx > 0 and not np.any(a_pars[:, tidx]):
+                continue
+            a_pars_t, n_pars, ea_pars = (
+                expand_pars(params[:, tidx, pidx], temps.ndim)
+                for pidx in range(3))
+            logkts = log10_sum(logkts, (
+                np.log10(a_pars_t) + n_pars * np.log10(temps / t_ref) -
+                ea_pars / (rval * temps * LN10)))
+
+        negs = np.any(a_pars < 0.0, axis=1)
+        if np.any(negs):
+            logkts[negs] = np.log10(
+                arrhenius_batch(params[negs], t_ref, temps, rval=rval))
+
+    return logkts
+
+
+def _lindemann(highp_kts, lowp_kts, temps, pressures, collid_factor,
+               log10):
+    """ Lindemann k(T,P)s from stacked k(T)s, temperatures, and pressures
+        that broadcast against each other
+    """
+    if log10:
+        log_prs = lowp_kts - highp_kts + np.log10(
+            p_to_m(pressures, temps) * collid_factor)
+        return highp_kts + log10_falloff(log_prs)
+
+    pr_terms = _pr_terms(highp_kts, lowp_kts, temps, pressures,
+                         collid_factor)
+
+    return highp_kts * (pr_terms / (1.0 + pr_terms))
+
+
+def expand_pars(pars, ndim):
+    """ Reshape a per-reaction parameter vector so it broadcasts against
+        arrays with a leading reaction axis followed by ndim axes.
+
+        :param pars: one parameter value per reaction
+        :type pars: numpy.ndarray (nrxn,)
+        :param ndim: number of axes following the reaction axis
+        :type ndim: int
+        :rtype: numpy.ndarray (nrxn,) + (1,)*ndim
+    """
+    return np.reshape(pars, (-1,) + (1,) * ndim)
+
+
+def take_nodes(node_vals, idxs):
+    """ Pick the value at a PLOG node for every reaction and condition.
+
+        :param node_vals: values at each PLOG pressure, from plog_node_vals
+        :type node_vals: numpy.ndarray (nrxn, nodes, ...)
+        :param idxs: PLOG pressure to pick, from plog_brackets
+        :type idxs: numpy.ndarray (nrxn, ...)
+        :rtype: numpy.ndarray (nrxn, ...)
+    """
+    return np.take_along_axis(node_vals, idxs[:, None], 1)[:, 0]
+
+
+def grid_axes(temps, pressures):
+    """ Lay the temperatures (1, nT) and pressures (nP, 1) out on a grid.
+
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray (nT,)
+        :param pressures: Pressures (atm)
+        :type pressures: numpy.ndarray (nP,)
+        :rtype: (numpy.ndarray (1, nT), numpy.ndarray (nP, 1))
+    """
+    temps = np.reshape(np.asarray(temps, dtype=float), (1, -1))
+    pressures = np.reshape(np.asarray(pressures, dtype=float), (-1, 1))
+    return temps, pressures
+
+
+def _point_axes(temps, pressures):
+    """ Lay paired temperatures and pressures out as (1, npts) rows
+    """
+    temps = np.reshape(np.asarray(temps, dtype=float), (1, -1))
+    pressures = np.reshape(np.asarray(pressures, dtype=float), (1, -1))
+    assert temps.shape == pressures.shape, (
+        'Temperatures and pressures must be paired, one of each per point')
+    return temps, pressures
+
+
+def tgrid(kts):
+    """ Insert a pressure axis into stacked k(T)s, so that they broadcast
+        against (nrxn, nP, nT) grids.
+
+        :param kts: T-dependent values of each reaction
+        :type kts: numpy.ndarray (nrxn, nT)
+        :rtype: numpy.ndarray (nrxn, 1, nT)
+    """
+    return np.asarray(kts)[:, None, :]
+
+
+def _pr_terms(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0,
+              rval=RC2):
+    """ Calculates the reduced pressure terms for stacked high- and
+        low-pressure k(T)s
+    """
+    return (lowp_kts / highp_kts) * p_to_m(pressures, temps, rval=rval) * (
+        collid_factor)
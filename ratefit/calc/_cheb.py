@@ -0,0 +1,153 @@
+"""
+Vectorized kernels for evaluating Chebyshev rate expressions
+"""
+
+import numpy as np
+
+
+def reduced_temps(temps, tmin, tmax):
+    """ Map temperatures onto the reduced [-1, 1] coordinate used
+        by the Chebyshev expression (linear in 1/T).
+
+        :param temps: Temperatures (K); any shape
+        :type temps: numpy.ndarray
+        :param tmin: minimum temperature Chebyshev model is defined
+        :type tmin: float or numpy.ndarray
+        :param tmax: maximum temperature Chebyshev model is defined
+        :type tmax: float or numpy.ndarray
+        :return ctemps: reduced temperatures
+        :rtype: numpy.ndarray
+    """
+    temps = np.asarray(temps, dtype=float)
+    return (
+        (2.0 / temps - 1.0 / tmin - 1.0 / tmax) /
+        (1.0 / tmax - 1.0 / tmin)
+    )
+
+
+def reduced_pressures(pressures, pmin, pmax):
+    """ Map pressures onto the reduced [-1, 1] coordinate used
+        by the Chebyshev expression (linear in log(P)).
+
+        :param pressures: Pressures (atm); any shape
+        :type pressures: numpy.ndarray
+        :param pmin: minimum pressure Chebyshev model is defined
+        :type pmin: float or numpy.ndarray
+        :param pmax: maximum pressure Chebyshev model is defined
+        :type pmax: float or numpy.ndarray
+        :return cpresses: reduced pressures
+        :rtype: numpy.ndarray
+    """
+    pressures = np.asarray(pressures, dtype=float)
+    return (
+        (2.0 * np.log10(pressures) - np.log10(pmin) - np.log10(pmax)) /
+        (np.log10(pmax) - np.log10(pmin))
+    )
+
+
+def basis(xvals, nterms):
+    """ Evaluate the Chebyshev polynomials T_0 ... T_(nterms-1) at
+        every point of an array using the three-term recurrence.
+
+        :param xvals: points to evaluate the polynomials at
+        :type xvals: numpy.ndarray
+        :param nterms: number of polynomials
+        :type nterms: int
+        :return polys: T_n(x), with the polynomial index leading
+        :rtype: numpy.ndarray (nterms,) + xvals.shape
+    """
+    xvals = np.asarray(xvals, dtype=float)
+    polys = np.empty((nterms,) + xvals.shape)
+    polys[0] = 1.0
+    if nterms > 1:
+        polys[1] = xvals
+    for idx in range(2, nterms):
+        polys[idx] = 2.0 * xvals * polys[idx-1] - polys[idx-2]
+
+    return polys
+
+
+def clenshaw(coeffs, xvals):
+    """ Sum a Chebyshev series, sum_n c_n T_n(x), using the Clenshaw
+        recurrence over whole arrays. The coefficients may themselves
+        be arrays that broadcast against the points.
+
+        :param coeffs: series coefficients, with the series index leading
+        :type coeffs: numpy.ndarray (nterms, ...)
+        :param xvals: points to evaluate the series at
+        :type xvals: numpy.ndarray
+        :return vals: value of the series
+        :rtype: numpy.ndarray
+    """
+    nterms = len(coeffs)
+    shape = np.broadcast(coeffs[0], xvals).shape
+    bk1 = np.zeros(shape)
+    bk2 = np.zeros(shape)
+    for idx in range(nterms-1, 0, -1):
+        bk1, bk2 = coeffs[idx] + 2.0 * xvals * bk1 - bk2, bk1
+
+    return coeffs[0] + xvals * bk1 - bk2
+
+
+def log10k(alpha, ctemps, cpresses):
+    """ Evaluate log10 k(T,P) of a Chebyshev expression at reduced
+        temperatures and pressures that broadcast against each other.
+
+        The pressure series is collapsed first with the polynomial
+        recurrence; the temperature series is then summed with Clenshaw.
+
+        :param alpha: Chebyshev coefficient matrix (nT-terms, nP-terms)
+        :type alpha: numpy.ndarray
+        :param ctemps: reduced temperatures
+        :type ctemps: numpy.ndarray
+        :param cpresses: reduced pressures
+        :type cpresses: numpy.ndarray
+        :return logktps: log10 k(T,P)s, shape of broadcast(ctemps, cpresses)
+        :rtype: numpy.ndarray
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    ppolys = basis(cpresses, alpha.shape[1])
+    tcoeffs = np.tensordot(alpha, ppolys, axes=(1, 0))
+
+    return clenshaw(tcoeffs, ctemps)
+
+
+def log10k_batch(alphas, ctemps, cpresses):
+    """ Evaluate log10 k(T,P) for a stack of Chebyshev expressions at
+        once. The reaction index leads every array; the reduced
+        temperatures and pressures must broadcast against each other.
+
+        :param alphas: coefficient matrices, zero-padded to a common shape
+        :type alphas: numpy.ndarray (nrxn, nT-terms, nP-terms)
+        :param ctemps: reduced temperatures for each reaction
+        :type ctemps: numpy.ndarray (nrxn, ...)
+        :param cpresses: reduced pressures for each reaction
+        :type cpresses: numpy.ndarray (nrxn, ...)
+        :return logktps: log10 k(T,P)s
+        :rtype: numpy.ndarray (nrxn, ...)
+    """
+    alphas = np.asarray(alphas, dtype=float)
+
+    # Collapse the pressure series: c_j = sum_k alpha_jk T_k(P~)
+    ppolys = basis(cpresses, alphas.shape[2])
+    tcoeffs = np.einsum('rjk,kr...->jr...', alphas, ppolys)
+
+    return clenshaw(tcoeffs, ctemps)
+
+
+def pad_alphas(alphas):
+    """ Stack Chebyshev coefficient matrices of possibly different
+        shapes into a single zero-padded array.
+
+        :param alphas: Chebyshev coefficient matrices
+        :type alphas: list(numpy.ndarray)
+        :rtype: numpy.ndarray (nrxn, max nT-terms, max nP-terms)
+    """
+    alphas = [np.asarray(alpha, dtype=float) for alpha in alphas]
+    nrows = max((alpha.shape[0] for alpha in alphas), default=1)
+    ncols = max((alpha.shape[1] for alpha in alphas), default=1)
+    padded = np.zeros((len(alphas), nrows, ncols))
+    for idx, alpha in enumerate(alphas):
+        padded[idx, :alpha.shape[0], :alpha.shape[1]] = alpha
+
+    return padded
@@ -0,0 +1,524 @@
+"""
+Calculate rates together with their analytic derivatives
+
+Every function returns the rate constants along with
+    d ln k / d(1/T) (K; the effective activation energy is -R times this)
+and, for the P-dependent forms,
+    d ln k / d ln P
+evaluated on the same (nP, nT) grid as the rates.
+"""
+
+import numpy as np
+from numpy.polynomial import chebyshev as npcheb
+from ratefit.calc import _cheb
+from ratefit.calc._rates import RC
+from ratefit.calc._rates import RC2
+from ratefit.calc._rates import LN10
+from ratefit.calc._rates import single_arrhenius
+from ratefit.calc._rates import p_to_m
+from ratefit.calc._rates import _pcol
+from ratefit.calc._plog import PlogInterpolator
+from ratefit.calc._batch import expand_pars
+from ratefit.calc._batch import take_nodes
+from ratefit.calc._batch import grid_axes
+from ratefit.calc._batch import tgrid
+from ratefit.calc._batch import plog_node_vals
+from ratefit.calc._batch import plog_brackets
+
+
+def arrhenius_derivs(params, t_ref, temps, rval=RC):
+    """ Calculates k(T)s and d ln k / d(1/T) of a single or double
+        Arrhenius expression.
+
+        :param params: fitting parameters
+        :type params: list(float)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray
+        :return kts: T-dependent rate constants
+        :rtype: numpy.ndarray
+        :return dinvts: d ln k / d(1/T)
+        :rtype: numpy.ndarray
+    """
+
+    assert len(params) in (3, 6)
+    temps = np.asarray(temps, dtype=float)
+
+    # ln k = ln A + n ln(T/Tref) - Ea/RT -> d ln k / d(1/T) = -nT - Ea/R
+    terms = np.reshape(params, (-1, 3))
+    if len(terms) == 1:
+        a_par, n_par, ea_par = terms[0]
+        kts = single_arrhenius(a_par, n_par, ea_par, t_ref, temps, rval=rval)
+        dinvts = -n_par * temps - ea_par / rval
+    else:
+        # Sum of terms: d ln k = sum_i (k_i/k) d ln k_i
+        kts = np.zeros(temps.shape)
+        kdinvts = np.zeros(temps.shape)
+        for a_par, n_par, ea_par in terms:
+            term_kts = single_arrhenius(
+                a_par, n_par, ea_par, t_ref, temps, rval=rval)
+            kts += term_kts
+            kdinvts += term_kts * (-n_par * temps - ea_par / rval)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dinvts = kdinvts / kts
+
+    return kts, dinvts
+
+
+def lindemann_derivs(highp_kts, lowp_kts, temps, pressures,
+                     highp_dinvts, lowp_dinvts, collid_factor=1.0):
+    """ Calculates k(T,P)s of a Lindemann expression along with
+        d ln k / d(1/T) and d ln k / d ln P.
+
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param lowp_kts: k(T)s determined at low-pressure
+        :type lowp_kts: numpy.ndarray
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param highp_dinvts: d ln k / d(1/T) of the high-pressure k(T)s
+        :type highp_dinvts: numpy.ndarray
+        :param lowp_dinvts: d ln k / d(1/T) of the low-pressure k(T)s
+        :type lowp_dinvts: numpy.ndarray
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nP, nT), ...)
+    """
+
+    pr_terms, dlnpr_dinvts = _pr_derivs(
+        highp_kts, lowp_kts, temps, pressures, highp_dinvts, lowp_dinvts,
+        collid_factor)
+
+    # ln k = ln kinf + ln(Pr/(1+Pr)); d ln(Pr/(1+Pr)) / d ln Pr = 1/(1+Pr)
+    ktps = highp_kts * (pr_terms / (1.0 + pr_terms))
+    dlnps = 1.0 / (1.0 + pr_terms)
+    dinvts = highp_dinvts + dlnpr_dinvts * dlnps
+
+    return ktps, dinvts, dlnps
+
+
+def troe_derivs(highp_kts, lowp_kts, temps, pressures,
+                alpha, ts3, ts1, ts2=None,
+                highp_dinvts=None, lowp_dinvts=None, collid_factor=1.0):
+    """ Calculates k(T,P)s of a Troe expression along with
+        d ln k / d(1/T) and d ln k / d ln P.
+
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param lowp_kts: k(T)s determined at low-pressure
+        :type lowp_kts: numpy.ndarray
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param alpha: Troe alpha parameter
+        :type alpha: float
+        :param ts3: Troe T3 parameter
+        :type ts3: float
+        :param ts1: Troe T1 parameter
+        :type ts1: float
+        :param ts2: Troe T2 parameter
+        :type ts2: float
+        :param highp_dinvts: d ln k / d(1/T) of the high-pressure k(T)s
+        :type highp_dinvts: numpy.ndarray
+        :param lowp_dinvts: d ln k / d(1/T) of the low-pressure k(T)s
+        :type lowp_dinvts: numpy.ndarray
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nP, nT), ...)
+    """
+
+    assert highp_dinvts is not None and lowp_dinvts is not None, (
+        'The derivatives of the high- and low-P k(T)s are required'
+    )
+    temps = np.asarray(temps, dtype=float)
+    pr_terms, dlnpr_dinvts = _pr_derivs(
+        highp_kts, lowp_kts, temps, pressures, highp_dinvts, lowp_dinvts,
+        collid_factor)
+
+    # Fcent and its derivative with respect to 1/T (dT/d(1/T) = -T^2)
+    exp3, exp1 = np.exp(-temps / ts3), np.exp(-temps / ts1)
+    f_cent = (1.0 - alpha) * exp3 + alpha * exp1
+    df_cent = -(1.0 - alpha) / ts3 * exp3 - alpha / ts1 * exp1
+    if ts2 is not None:
+        # A NaN T2 (from stacked parameters) means the term is omitted
+        has_ts2 = ~np.isnan(ts2)
+        ts2 = np.where(has_ts2, ts2, 0.0)
+        exp2 = np.where(has_ts2, np.exp(-ts2 / temps), 0.0)
+        f_cent = f_cent + exp2
+        df_cent = df_cent + ts2 / temps**2 * exp2
+    log_f_cent = np.log10(f_cent)
+    dlog_f_cent = df_cent * (-temps**2) / (f_cent * LN10)
+
+    # log F = log Fcent / (1 + u^2), u = y / (n - 0.14 y), y = log Pr + c
+    c_val = -0.4 - 0.67 * log_f_cent
+    n_val = 0.75 - 1.27 * log_f_cent
+    y_val = np.log10(pr_terms) + c_val
+    denom = n_val - 0.14 * y_val
+    u_val = y_val / denom
+    log_f = log_f_cent / (1.0 + u_val**2)
+    dlog_f_du = -log_f_cent * 2.0 * u_val / (1.0 + u_val**2)**2
+
+    # Chain rule through y (log Pr and c) and n
+    dy_dinvts = dlnpr_dinvts / LN10 - 0.67 * dlog_f_cent
+    dn_dinvts = -1.27 * dlog_f_cent
+    du_dinvts = (n_val * dy_dinvts - y_val * dn_dinvts) / denom**2
+    dlog_f_dinvts = dlog_f_cent / (1.0 + u_val**2) + dlog_f_du * du_dinvts
+    dlog_f_dlog_pr = dlog_f_du * n_val / denom**2
+
+    ktps = highp_kts * (pr_terms / (1.0 + pr_terms)) * 10**log_f
+    falloff_dlnps = 1.0 / (1.0 + pr_terms)
+    dinvts = (highp_dinvts + dlnpr_dinvts * falloff_dlnps +
+              LN10 * dlog_f_dinvts)
+    dlnps = falloff_dlnps + dlog_f_dlog_pr
+
+    return ktps, dinvts, dlnps
+
+
+def plog_derivs(plog_dct, t_ref, temps, pressures, out_of_range='drop'):
+    """ Calculates k(T,P)s of a PLOG expression along with
+        d ln k / d(1/T) and d ln k / d ln P.
+
+        At a PLOG pressure, d ln k / d ln P is the slope of the segment
+        above it (below it for the highest PLOG pressure). It is zero
+        where the pressure is clamped and NaN where it is dropped.
+
+        :param plog_dct: Arrhenius fitting parameters at several pressures
+        :type plog_dct: dict[pressure: [fit_params]]
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray (1-D)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param out_of_range: 'drop', 'clamp', or 'extrapolate' pressures
+            outside of the PLOG range
+        :type out_of_range: str
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nP, nT), ...)
+    """
+
+    assert np.ndim(temps) == 1, (
+        'PLOG derivatives require a 1-D array of temperatures')
+    pressures = np.asarray(pressures, dtype=float)
+    interp = PlogInterpolator(plog_dct, t_ref, temps)
+    node_dinvts = np.array([
+        arrhenius_derivs(plog_dct[plog_pressure], t_ref, temps)[1]
+        for plog_pressure in sorted(plog_dct.keys())])
+
+    # ln k is interpolated linearly in ln P, and so is its T derivative
+    lidxs, hidxs, pres_terms = interp.weights(
+        pressures, out_of_range=out_of_range)
+    logktps = interp.interpolate(interp.node_logks, lidxs, hidxs, pres_terms)
+    dinvts = interp.interpolate(node_dinvts, lidxs, hidxs, pres_terms)
+
+    # P derivative is the slope of the segment covering each pressure
+    lidxs, hidxs = interp.segments(pressures, out_of_range=out_of_range)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dlnps = np.where(
+            _pcol(hidxs == lidxs), 0.0,
+            (interp.node_logks[hidxs] - interp.node_logks[lidxs]) /
+            _pcol(interp.log_pressures[hidxs] - interp.log_pressures[lidxs]))
+
+    in_range = interp.in_range(pressures)
+    if out_of_range == 'clamp':
+        dlnps[~in_range] = 0.0
+    elif out_of_range == 'drop':
+        for vals in (logktps, dinvts, dlnps):
+            vals[~in_range] = np.nan
+
+    return 10**logktps, dinvts, dlnps
+
+
+def chebyshev_derivs(alpha, tmin, tmax, pmin, pmax, temps, pressures):
+    """ Calculates k(T,P)s of a Chebyshev expression along with
+        d ln k / d(1/T) and d ln k / d ln P, by summing the derivative
+        series of the Chebyshev polynomials.
+
+        :param alpha: Chebyshev coefficient matrix
+        :type alpha: numpy.ndarray
+        :param tmin: minimum temperature Chebyshev model is defined
+        :type tmin: float
+        :param tmax: maximum temperature Chebyshev model is defined
+        :type tmax: float
+        :param pmin: minimum pressure Chebyshev model is defined
+        :type pmin: float
+        :param pmax: maximum pressure Chebyshev model is defined
+        :type pmax: float
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nP, nT), ...)
+    """
+
+    alpha = np.asarray(alpha, dtype=float)
+    ctemps = _cheb.reduced_temps(temps, tmin, tmax)
+    cpresses = _cheb.reduced_pressures(_pcol(pressures), pmin, pmax)
+
+    # Collapse the pressure series once for the value and T derivative
+    tcoeffs = np.tensordot(
+        alpha, _cheb.basis(cpresses, alpha.shape[1]), axes=(1, 0))
+    logktps = _cheb.clenshaw(tcoeffs, ctemps)
+    dlogk_dctemps = _cheb_deriv_sum(tcoeffs, ctemps)
+    dlogk_dcpresses = _cheb.log10k(
+        _cheb_der(alpha, axis=1), ctemps, cpresses)
+
+    # Chain rule through the reduced coordinates
+    dctemp_dinvt = 2.0 / (1.0 / tmax - 1.0 / tmin)
+    dcpress_dlogp = 2.0 / (np.log10(pmax) - np.log10(pmin))
+    dinvts = LN10 * dlogk_dctemps * dctemp_dinvt
+    dlnps = dlogk_dcpresses * dcpress_dlogp * np.ones_like(logktps)
+
+    return 10**logktps, dinvts, dlnps
+
+
+def arrhenius_derivs_batch(params, t_ref, temps, rval=RC):
+    """ Calculates k(T)s and d ln k / d(1/T) for a stack of single or
+        double Arrhenius expressions.
+
+        :param params: stacked parameters from stack_arrhenius
+        :type params: numpy.ndarray (nrxn, nterm, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temperatures (K)
+        :type temps: numpy.ndarray
+        :return kts, dinvts: k(T)s and their derivatives
+        :rtype: (numpy.ndarray (nrxn,) + temps.shape, ...)
+    """
+
+    params = np.asarray(params, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    kts = np.zeros((params.shape[0],) + temps.shape)
+    kdinvts = np.zeros(kts.shape)
+    for tidx in range(params.shape[1]):
+        if tidx > 0 and not np.any(params[:, tidx, 0]):
+            continue
+        a_pars, n_pars, ea_pars = (
+            expand_pars(params[:, tidx, pidx], temps.ndim)
+            for pidx in range(3))
+        term_kts = (a_pars * ((temps / t_ref)**n_pars) *
+                    np.exp(-ea_pars/(rval*temps)))
+        kts += term_kts
+        kdinvts += term_kts * (-n_pars * temps - ea_pars / rval)
+
+    # A single term has the derivative of its exponent, even where A = 0
+    single = ~np.any(params[:, 1:, 0], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dinvts = np.where(
+            expand_pars(single, temps.ndim),
+            -expand_pars(params[:, 0, 1], temps.ndim) * temps -
+            expand_pars(params[:, 0, 2], temps.ndim) / rval,
+            kdinvts / kts)
+
+    return kts, dinvts
+
+
+def lindemann_derivs_batch(highp_kts, lowp_kts, temps, pressures,
+                           highp_dinvts, lowp_dinvts, collid_factor=1.0):
+    """ Calculates k(T,P)s and their derivatives for a stack of Lindemann
+        expressions, as in lindemann_derivs.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, nT)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, nT)
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray (nT,)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param highp_dinvts: d ln k / d(1/T) of the high-pressure k(T)s
+        :type highp_dinvts: numpy.ndarray (nrxn, nT)
+        :param lowp_dinvts: d ln k / d(1/T) of the low-pressure k(T)s
+        :type lowp_dinvts: numpy.ndarray (nrxn, nT)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nrxn, nP, nT), ...)
+    """
+    ktps, dinvts, dlnps = lindemann_derivs(
+        tgrid(highp_kts), tgrid(lowp_kts), temps, pressures,
+        tgrid(highp_dinvts), tgrid(lowp_dinvts),
+        collid_factor=collid_factor)
+
+    return _full(ktps, dinvts, dlnps)
+
+
+def troe_derivs_batch(highp_kts, lowp_kts, temps, pressures, troe_params,
+                      highp_dinvts, lowp_dinvts, collid_factor=1.0):
+    """ Calculates k(T,P)s and their derivatives for a stack of Troe
+        expressions, as in troe_derivs.
+
+        :param highp_kts: k(T)s at high-pressure for each reaction
+        :type highp_kts: numpy.ndarray (nrxn, nT)
+        :param lowp_kts: k(T)s at low-pressure for each reaction
+        :type lowp_kts: numpy.ndarray (nrxn, nT)
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray (nT,)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param troe_params: [alpha, T3, T1, T2] for each reaction,
+            with T2 set to NaN if it is omitted
+        :type troe_params: numpy.ndarray (nrxn, 4)
+        :param highp_dinvts: d ln k / d(1/T) of the high-pressure k(T)s
+        :type highp_dinvts: numpy.ndarray (nrxn, nT)
+        :param lowp_dinvts: d ln k / d(1/T) of the low-pressure k(T)s
+        :type lowp_dinvts: numpy.ndarray (nrxn, nT)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nrxn, nP, nT), ...)
+    """
+    alpha, ts3, ts1, ts2 = (
+        expand_pars(np.asarray(troe_params, dtype=float)[:, idx], 2)
+        for idx in range(4))
+    ktps, dinvts, dlnps = troe_derivs(
+        tgrid(highp_kts), tgrid(lowp_kts), temps, pressures,
+        alpha, ts3, ts1, ts2=ts2, highp_dinvts=tgrid(highp_dinvts),
+        lowp_dinvts=tgrid(lowp_dinvts), collid_factor=collid_factor)
+
+    return _full(ktps, dinvts, dlnps)
+
+
+def plog_derivs_batch(plog_pressures, plog_params, t_ref, temps, pressures,
+                      out_of_range='drop'):
+    """ Calculates k(T,P)s and their derivatives for a stack of PLOG
+        expressions, as in plog_derivs.
+
+        :param plog_pressures: sorted PLOG pressures from stack_plog
+        :type plog_pressures: numpy.ndarray (nrxn, max nodes)
+        :param plog_params: Arrhenius parameters from stack_plog
+        :type plog_params: numpy.ndarray (nrxn, max nodes, 2, 3)
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray (nT,)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param out_of_range: 'drop' (NaN), 'clamp', or 'extrapolate'
+            pressures outside of the PLOG range
+        :type out_of_range: str
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nrxn, nP, nT), ...)
+    """
+
+    assert out_of_range in ('drop', 'clamp', 'extrapolate')
+    temps, pressures = grid_axes(temps, pressures)
+    node_kts, node_dinvts = plog_node_vals(
+        arrhenius_derivs_batch, plog_params, t_ref, temps)
+    with np.errstate(divide='ignore'):
+        node_logks = np.log10(node_kts)
+    seg_lidxs, seg_hidxs, lidxs, hidxs, pres_terms, in_range = (
+        plog_brackets(plog_pressures, pressures, out_of_range))
+
+    # ln k is interpolated linearly in ln P, and so is its T derivative
+    def _interp(node_vals):
+        vals_low = take_nodes(node_vals, lidxs)
+        vals_high = take_nodes(node_vals, hidxs)
+        return vals_low + (vals_high - vals_low) * pres_terms
+
+    logktps = _interp(node_logks)
+    dinvts = _interp(node_dinvts)
+
+    # P derivative is the slope of the segment covering each pressure
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_nodes = np.log10(plog_pressures)[:, :, None, None]
+        dlnps = np.where(
+            seg_hidxs == seg_lidxs, 0.0,
+            (take_nodes(node_logks, seg_hidxs) -
+             take_nodes(node_logks, seg_lidxs)) /
+            (take_nodes(log_nodes, seg_hidxs) -
+             take_nodes(log_nodes, seg_lidxs)))
+
+    ktps, dinvts, dlnps = _full(10**logktps, dinvts, dlnps)
+    if out_of_range == 'clamp':
+        dlnps = np.where(in_range, dlnps, 0.0)
+    elif out_of_range == 'drop':
+        ktps, dinvts, dlnps = (np.where(in_range, vals, np.nan)
+                               for vals in (ktps, dinvts, dlnps))
+
+    return ktps, dinvts, dlnps
+
+
+def chebyshev_derivs_batch(alphas, t_limits, p_limits, temps, pressures):
+    """ Calculates k(T,P)s and their derivatives for a stack of Chebyshev
+        expressions, as in chebyshev_derivs.
+
+        :param alphas: zero-padded coefficient matrices from stack_chebyshev
+        :type alphas: numpy.ndarray (nrxn, max nT-terms, max nP-terms)
+        :param t_limits: [tmin, tmax] for each reaction
+        :type t_limits: numpy.ndarray (nrxn, 2)
+        :param p_limits: [pmin, pmax] for each reaction
+        :type p_limits: numpy.ndarray (nrxn, 2)
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray (nT,)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :return ktps, dinvts, dlnps: k(T,P)s and their derivatives
+        :rtype: (numpy.ndarray (nrxn, nP, nT), ...)
+    """
+
+    alphas = np.asarray(alphas, dtype=float)
+    tmins, tmaxs = np.reshape(
+        np.asarray(t_limits, dtype=float), (-1, 2, 1, 1)).transpose(1, 0, 2, 3)
+    pmins, pmaxs = np.reshape(
+        np.asarray(p_limits, dtype=float), (-1, 2, 1, 1)).transpose(1, 0, 2, 3)
+    ctemps = _cheb.reduced_temps(np.reshape(temps, (1, 1, -1)), tmins, tmaxs)
+    cpresses = _cheb.reduced_pressures(
+        np.reshape(pressures, (1, -1, 1)), pmins, pmaxs)
+
+    # Sum the derivative series along each axis of the coefficients
+    logktps = _cheb.log10k_batch(alphas, ctemps, cpresses)
+    dlogk_dctemps = _cheb.log10k_batch(
+        _cheb_der(alphas, axis=1), ctemps, cpresses)
+    dlogk_dcpresses = _cheb.log10k_batch(
+        _cheb_der(alphas, axis=2), ctemps, cpresses)
+
+    # Chain rule through the reduced coordinates
+    dctemp_dinvts = 2.0 / (1.0 / tmaxs - 1.0 / tmins)
+    dcpress_dlogps = 2.0 / (np.log10(pmaxs) - np.log10(pmins))
+
+    return _full(10**logktps, LN10 * dlogk_dctemps * dctemp_dinvts,
+                 dlogk_dcpresses * dcpress_dlogps)
+
+
+# Helper functions
+def _full(ktps, dinvts, dlnps):
+    """ Broadcast k(T,P)s and their derivatives to a common shape
+    """
+    return tuple(np.array(vals) for vals in np.broadcast_arrays(
+        ktps, dinvts, dlnps))
+
+
+def _pr_derivs(highp_kts, lowp_kts, temps, pressures,
+               highp_dinvts, lowp_dinvts, collid_factor, rval=RC2):
+    """ Reduced pressures and d ln Pr / d(1/T), on the (nP, nT) grid;
+        [M] = P/RT contributes d ln [M] / d(1/T) = T
+    """
+    pr_terms = (
+        (lowp_kts / highp_kts) * p_to_m(_pcol(pressures), temps, rval=rval) *
+        collid_factor)
+    dlnpr_dinvts = (lowp_dinvts - highp_dinvts + temps) * np.ones_like(
+        pr_terms)
+    return pr_terms, dlnpr_dinvts
+
+
+def _cheb_der(coeffs, axis=0):
+    """ Coefficients of the derivative of a Chebyshev series, keeping at
+        least one (zero) coefficient for a constant series
+    """
+    if np.shape(coeffs)[axis] == 1:
+        return np.zeros_like(coeffs)
+    return npcheb.chebder(coeffs, axis=axis)
+
+
+def _cheb_deriv_sum(coeffs, xvals):
+    """ Sum the derivative of a Chebyshev series at a set of points
+    """
+    return _cheb.clenshaw(_cheb_der(coeffs, axis=0), xvals)
@@ -0,0 +1,203 @@
+"""
+JIT-compiled kernels for the ratefit.calc functional forms
+
+Each kernel fuses the loops over temperatures (and pressures) of one
+expression, so that no temporary arrays are created. Only imported
+when the 'numba' backend is selected.
+"""
+
+import math
+import numpy as np
+import numba
+
+
+LN10 = math.log(10.0)
+
+
+@numba.njit(cache=True, error_model='numpy')
+def _log10_add(logk1, logk2):
+    """ log10(10**logk1 + 10**logk2) without leaving log space
+    """
+    if logk1 == -np.inf:
+        return logk2
+    if logk2 == -np.inf:
+        return logk1
+    hi_logk, lo_logk = max(logk1, logk2), min(logk1, logk2)
+    return hi_logk + math.log1p(10.0**(lo_logk - hi_logk)) / LN10
+
+
+@numba.njit(cache=True, error_model='numpy')
+def _log10_falloff(log_pr):
+    """ log10(Pr / (1 + Pr)) from log10(Pr) without overflow
+    """
+    if log_pr < 0.0:
+        return log_pr - math.log1p(10.0**log_pr) / LN10
+    return -math.log1p(10.0**(-log_pr)) / LN10
+
+
+@numba.njit(cache=True, error_model='numpy')
+def _clenshaw(coeffs, xval):
+    """ Sum a Chebyshev series at a single point
+    """
+    bk1 = 0.0
+    bk2 = 0.0
+    for idx in range(len(coeffs)-1, 0, -1):
+        bk1, bk2 = coeffs[idx] + 2.0 * xval * bk1 - bk2, bk1
+    return coeffs[0] + xval * bk1 - bk2
+
+
+@numba.njit(cache=True, error_model='numpy')
+def arrhenius(params, t_ref, temps, rval, log10):
+    """ Single or double Arrhenius k(T)s (or log10 k(T)s)
+    """
+
+    nterms = len(params) // 3
+    negative = False
+    for tidx in range(nterms):
+        if params[3*tidx] < 0.0:
+            negative = True
+
+    kts = np.empty(len(temps))
+    for idx, temp in enumerate(temps):
+        if log10 and not negative:
+            logk = -np.inf
+            for tidx in range(nterms):
+                a_par = params[3*tidx]
+                n_par = params[3*tidx+1]
+                ea_par = params[3*tidx+2]
+                if a_par > 0.0:
+                    logk = _log10_add(logk, (
+                        np.log10(a_par) + n_par * np.log10(temp / t_ref) -
+                        ea_par / (rval * temp * LN10)))
+            kts[idx] = logk
+        else:
+            kval = 0.0
+            for tidx in range(nterms):
+                a_par = params[3*tidx]
+                n_par = params[3*tidx+1]
+                ea_par = params[3*tidx+2]
+                kval += (a_par * (temp / t_ref)**n_par *
+                         math.exp(-ea_par / (rval * temp)))
+            kts[idx] = np.log10(kval) if log10 else kval
+
+    return kts
+
+
+@numba.njit(cache=True, error_model='numpy')
+def troe(highp_kts, lowp_kts, temps, pressures,
+         alpha, ts3, ts1, ts2, collid_factor, rval, log10):
+    """ Troe k(T,P)s (or log10 k(T,P)s), (nP, nT); T2 is NaN if omitted
+    """
+
+    ktps = np.empty((len(pressures), len(temps)))
+    for tidx, temp in enumerate(temps):
+        # Temperature-only terms
+        f_cent = ((1.0 - alpha) * math.exp(-temp / ts3) +
+                  alpha * math.exp(-temp / ts1))
+        if not np.isnan(ts2):
+            f_cent += math.exp(-ts2 / temp)
+        log_f_cent = np.log10(f_cent)
+        c_val = -0.4 - 0.67 * log_f_cent
+        n_val = 0.75 - 1.27 * log_f_cent
+        if log10:
+            pr_coeff = (lowp_kts[tidx] - highp_kts[tidx] -
+                        np.log10(rval * temp))
+        else:
+            pr_coeff = lowp_kts[tidx] / highp_kts[tidx] / (rval * temp)
+
+        # Pressure-dependent terms, in the same form as the numpy kernel
+        # (x/(n - 0.14x) = 1/(n/x - 0.14) with x = log10(Pr) + c), so that
+        # zero or infinite reduced pressures give the same results
+        for pidx, pressure in enumerate(pressures):
+            if log10:
+                log_pr = pr_coeff + np.log10(pressure * collid_factor)
+            else:
+                pr_val = pr_coeff * pressure * collid_factor
+                log_pr = np.log10(pr_val)
+            val = (1.0 / (n_val / (log_pr + c_val) - 0.14))**2
+            log_f = log_f_cent / (1.0 + val)
+            if log10:
+                ktps[pidx, tidx] = (
+                    highp_kts[tidx] + _log10_falloff(log_pr) + log_f)
+            else:
+                ktps[pidx, tidx] = (
+                    highp_kts[tidx] / (1.0 / pr_val + 1.0) * 10.0**log_f)
+
+    return ktps
+
+
+@numba.njit(cache=True, error_model='numpy')
+def plog(plog_pressures, log_nodes, node_logks, pressures, mode):
+    """ PLOG log10 k(T,P)s, (nP, nT), from the log10 k(T)s at the sorted
+        PLOG pressures; mode is 0 (drop), 1 (clamp), or 2 (extrapolate)
+    """
+
+    nnodes = len(log_nodes)
+    logktps = np.empty((len(pressures), node_logks.shape[1]))
+    for pidx, pressure in enumerate(pressures):
+        log_pressure = np.log10(pressure)
+        if mode == 0 and not (
+                plog_pressures[0] <= pressure <= plog_pressures[-1]):
+            logktps[pidx, :] = np.nan
+            continue
+        if mode == 1:
+            log_pressure = min(max(log_pressure, log_nodes[0]),
+                               log_nodes[-1])
+
+        # Find the PLOG pressures bracketing the pressure
+        hidx = 0
+        for nidx in range(nnodes):
+            if log_nodes[nidx] <= log_pressure:
+                hidx = nidx + 1
+        hidx = min(max(hidx, 1), max(nnodes-1, 1))
+        lidx = hidx - 1
+        if nnodes == 1:
+            hidx = lidx
+
+        # Use the PLOG pressure itself if the pressure is (nearly) defined
+        for nidx in range(nnodes):
+            if abs(pressure - plog_pressures[nidx]) <= (
+                    1.0e-3 + 1.0e-5 * abs(plog_pressures[nidx])):
+                lidx = nidx
+                hidx = nidx
+
+        pres_term = 0.0
+        if hidx != lidx:
+            pres_term = ((log_pressure - log_nodes[lidx]) /
+                         (log_nodes[hidx] - log_nodes[lidx]))
+        for tidx in range(node_logks.shape[1]):
+            logktps[pidx, tidx] = node_logks[lidx, tidx] + (
+                node_logks[hidx, tidx] - node_logks[lidx, tidx]) * pres_term
+
+    return logktps
+
+
+@numba.njit(cache=True, error_model='numpy')
+def chebyshev(alpha, tmin, tmax, pmin, pmax, temps, pressures):
+    """ Chebyshev log10 k(T,P)s, (nP, nT)
+    """
+
+    logktps = np.empty((len(pressures), len(temps)))
+    tcoeffs = np.empty(alpha.shape[0])
+    for pidx, pressure in enumerate(pressures):
+        cpress = (
+            (2.0 * np.log10(pressure) -
+             np.log10(pmin) - np.log10(pmax)) /
+            (np.log10(pmax) - np.log10(pmin)))
+        for jidx in range(alpha.shape[0]):
+            tcoeffs[jidx] = _clenshaw(alpha[jidx], cpress)
+        for tidx, temp in enumerate(temps):
+            ctemp = (
+                (2.0 / temp - 1.0 / tmin - 1.0 / tmax) /
+                (1.0 / tmax - 1.0 / tmin))
+            logktps[pidx, tidx] = _clenshaw(tcoeffs, ctemp)
+
+    return logktps
+
+
+KERNELS = {
+    'arrhenius': arrhenius,
+    'troe': troe,
+    'plog': plog,
+    'chebyshev': chebyshev,
+}
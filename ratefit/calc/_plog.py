@@ -0,0 +1,280 @@
+"""
+Calculate rates with PLOG expressions
+"""
+
+import numpy as np
+from ratefit.calc import _backend
+from ratefit.calc._rates import arrhenius
+from ratefit.calc._rates import _pcol
+from ratefit.calc._rates import _ktp_dct
+
+
+OUT_OF_RANGE = ('drop', 'clamp', 'extrapolate')
+
+
+class PlogInterpolator:
+    """ PLOG expression prepared for repeated evaluation on a fixed
+        temperature grid.
+
+        The PLOG pressures are sorted once and the log10 k(T)s of the
+        Arrhenius expression at every PLOG pressure (the node curves)
+        are evaluated once on the temperature grid. Any set of pressures
+        is then interpolated in a single vectorized pass.
+
+        Pressures outside of the PLOG range are handled according to
+        `out_of_range`:
+            'drop': rows of NaN (omitted from ktp_dcts)
+            'clamp': use the k(T)s at the nearest PLOG pressure
+            'extrapolate': extend the end segments linearly in log(P)
+    """
+
+    def __init__(self, plog_dct, t_ref, temps):
+        """ :param plog_dct: Arrhenius fitting parameters at several pressures
+            :type plog_dct: dict[pressure: [fit_params]]
+            :param t_ref: Reference temperature (K)
+            :type t_ref: float
+            :param temps: Temps used to calculate k(T,P)s
+            :type temps: numpy.ndarray
+        """
+        plog_pressures = sorted(plog_dct.keys())
+        self.temps = temps
+        self.pressures = np.array(plog_pressures, dtype=float)
+        self.log_pressures = np.log10(self.pressures)
+        self.node_logks = np.array([
+            arrhenius(plog_dct[plog_pressure], t_ref, temps, log10=True)
+            for plog_pressure in plog_pressures])
+
+    def in_range(self, pressures):
+        """ Assess which pressures sit inside the PLOG range
+
+            :param pressures: Pressures used to calculate k(T,P)s
+            :type pressures: list(float)
+            :rtype: numpy.ndarray(bool)
+        """
+        pressures = np.asarray(pressures, dtype=float)
+        return (
+            (pressures >= self.pressures[0]) &
+            (pressures <= self.pressures[-1]))
+
+    def log10_ktps(self, pressures, out_of_range='drop'):
+        """ Interpolate log10 k(T,P)s at a set of pressures
+
+            :param pressures: Pressures used to calculate k(T,P)s
+            :type pressures: list(float)
+            :param out_of_range: how to treat pressures outside the PLOG range
+            :type out_of_range: str
+            :return logktps: log10 k(T,P)s, one row per pressure
+            :rtype: numpy.ndarray (nP, nT)
+        """
+
+        assert out_of_range in OUT_OF_RANGE, (
+            f'out_of_range is {out_of_range}; should be one of {OUT_OF_RANGE}'
+        )
+
+        pressures = np.asarray(pressures, dtype=float)
+        kernel = _backend.kernel('plog')
+        if kernel is not None and np.ndim(self.temps) == 1:
+            return kernel(
+                self.pressures, self.log_pressures, self.node_logks,
+                np.atleast_1d(pressures), OUT_OF_RANGE.index(out_of_range))
+
+        lidxs, hidxs, pres_terms = self.weights(
+            pressures, out_of_range=out_of_range)
+        logktps = self.interpolate(self.node_logks, lidxs, hidxs, pres_terms)
+
+        # Mask out the pressures that are not in the range of the PLOG
+        if out_of_range == 'drop':
+            logktps[~self.in_range(pressures)] = np.nan
+
+        return logktps
+
+    def weights(self, pressures, out_of_range='drop'):
+        """ Find the PLOG pressures bracketing each pressure and the
+            fractional position of the pressure between them (in log P)
+
+            :param pressures: Pressures used to calculate k(T,P)s
+            :type pressures: list(float)
+            :param out_of_range: how to treat pressures outside the PLOG range
+            :type out_of_range: str
+            :return lidxs: index of the lower PLOG pressure
+            :rtype: numpy.ndarray(int) (nP,)
+            :return hidxs: index of the upper PLOG pressure
+            :rtype: numpy.ndarray(int) (nP,)
+            :return pres_terms: position between the PLOG pressures
+            :rtype: numpy.ndarray (nP,)
+        """
+
+        pressures = np.asarray(pressures, dtype=float)
+        lidxs, hidxs = self.segments(pressures, out_of_range=out_of_range)
+        nnodes = len(self.log_pressures)
+
+        # Use the PLOG pressure itself if the pressure is (nearly) defined
+        matches = np.isclose(
+            pressures[:, None], self.pressures[None, :], atol=1.0e-3)
+        matched = np.any(matches, axis=1)
+        midxs = nnodes - 1 - np.argmax(matches[:, ::-1], axis=1)
+        lidxs = np.where(matched, midxs, lidxs)
+        hidxs = np.where(matched, midxs, hidxs)
+
+        # Calculate pressure term for PLOG expression
+        log_pressures = self._log_pressures(pressures, out_of_range)
+        log_plow = self.log_pressures[lidxs]
+        log_phigh = self.log_pressures[hidxs]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pres_terms = np.where(
+                hidxs == lidxs, 0.0,
+                (log_pressures - log_plow) / (log_phigh - log_plow))
+
+        return lidxs, hidxs, pres_terms
+
+    def segments(self, pressures, out_of_range='drop'):
+        """ Find the pair of adjacent PLOG pressures (the segment) whose
+            interpolation line covers each pressure
+
+            :param pressures: Pressures used to calculate k(T,P)s
+            :type pressures: list(float)
+            :param out_of_range: how to treat pressures outside the PLOG range
+            :type out_of_range: str
+            :return lidxs, hidxs: indices of the lower and upper PLOG pressure
+            :rtype: (numpy.ndarray(int), numpy.ndarray(int))
+        """
+        nnodes = len(self.log_pressures)
+        log_pressures = self._log_pressures(pressures, out_of_range)
+        hidxs = np.clip(
+            np.searchsorted(self.log_pressures, log_pressures, side='right'),
+            1, max(nnodes-1, 1))
+        lidxs = hidxs - 1
+        if nnodes == 1:
+            hidxs = lidxs
+
+        return lidxs, hidxs
+
+    def interpolate(self, node_vals, lidxs, hidxs, pres_terms):
+        """ Interpolate values defined at the PLOG pressures (e.g., the node
+            log10 k(T)s) with the weights of a set of pressures
+
+            :param node_vals: values at each PLOG pressure
+            :type node_vals: numpy.ndarray (nnodes, nT) or (nnodes, nP, nT)
+            :rtype: numpy.ndarray (nP, nT)
+        """
+        # Grab the values at the bracketing pressures (per row for 2-D temps)
+        if np.ndim(node_vals) == 2:
+            vals_low = node_vals[lidxs]
+            vals_high = node_vals[hidxs]
+        else:
+            rows = np.arange(len(lidxs))
+            vals_low = node_vals[lidxs, rows]
+            vals_high = node_vals[hidxs, rows]
+
+        return vals_low + (vals_high - vals_low) * _pcol(pres_terms)
+
+    def _log_pressures(self, pressures, out_of_range):
+        """ log10 of the pressures, clamped to the PLOG range if requested
+        """
+        log_pressures = np.log10(np.asarray(pressures, dtype=float))
+        if out_of_range == 'clamp':
+            log_pressures = np.clip(
+                log_pressures, self.log_pressures[0], self.log_pressures[-1])
+        return log_pressures
+
+    def ktps(self, pressures, out_of_range='drop'):
+        """ Interpolate k(T,P)s at a set of pressures
+
+            :param pressures: Pressures used to calculate k(T,P)s
+            :type pressures: list(float)
+            :param out_of_range: how to treat pressures outside the PLOG range
+            :type out_of_range: str
+            :return ktps: k(T,P)s, one row per pressure
+            :rtype: numpy.ndarray (nP, nT)
+        """
+        return 10**(self.log10_ktps(pressures, out_of_range=out_of_range))
+
+
+def plog(plog_dct, t_ref, temps, pressures, out_of_range='drop',
+         log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s using
+        a PLOG functional expression.
+
+        :param plog_dct: Arrhenius fitting parameters at several pressures
+        :type plog_dct: dict[pressure: [fit_params]]
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param out_of_range: 'drop', 'clamp', or 'extrapolate' pressures
+            outside of the PLOG range
+        :type out_of_range: str
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktp_dct: k(T,Ps) at all temps and pressures
+        :rtype: dict[pressure: temps]
+    """
+
+    interp = PlogInterpolator(plog_dct, t_ref, temps)
+    if log10:
+        ktps = interp.log10_ktps(pressures, out_of_range=out_of_range)
+    else:
+        ktps = interp.ktps(pressures, out_of_range=out_of_range)
+    keep = interp.in_range(pressures) | (out_of_range != 'drop')
+
+    kp_dct = {}
+    for pressure, kts, keep_pressure in zip(pressures, ktps, keep):
+        if keep_pressure:
+            kp_dct[pressure] = kts
+
+    ktp_dct = _ktp_dct(kp_dct, temps)
+
+    return ktp_dct
+
+
+def plog_grid(plog_dct, t_ref, temps, pressures, out_of_range='drop',
+              log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s using
+        a PLOG functional expression, for all pressures at once.
+
+        :param plog_dct: Arrhenius fitting parameters at several pressures
+        :type plog_dct: dict[pressure: [fit_params]]
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param out_of_range: 'drop' (NaN rows), 'clamp', or 'extrapolate'
+            pressures outside of the PLOG range
+        :type out_of_range: str
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s, one row per pressure
+        :rtype: numpy.ndarray (nP, nT)
+    """
+    interp = PlogInterpolator(plog_dct, t_ref, temps)
+    if log10:
+        return interp.log10_ktps(pressures, out_of_range=out_of_range)
+    return interp.ktps(pressures, out_of_range=out_of_range)
+
+
+def plog_one_pressure(plog_dct, t_ref, temps, pressure, log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s using
+        a PLOG functional expression, at a given pressure,
+        across several temperatures.
+
+        :param plog_dct: Arrhenius fitting parameters at several pressures
+        :type plog_dct: dict[pressure: [fit_params]]
+        :param t_ref: Reference temperature (K)
+        :type t_ref: float
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressure: Pressure used to calculate k(T,P)s
+        :type pressure: float
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: Set of k(T,P)s at given pressure
+        :rtype numpy.ndarray
+    """
+    interp = PlogInterpolator(plog_dct, t_ref, temps)
+    if log10:
+        return interp.log10_ktps([pressure])[0]
+    return interp.ktps([pressure])[0]
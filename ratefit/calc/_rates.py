@@ -3,19 +3,24 @@ Calculate rates with various fitting functions
 """
 
 import numpy as np
-from scipy.special import eval_chebyt
 from phydat import phycon
+from ratefit.calc import _cheb
+from ratefit.calc import _backend
 
 
 RC = phycon.RC_CAL  # gas constant in cal/(mol.K)
 RC2 = phycon.RC_ATM  # gas constant in cm^3.atm/(mol.K)
+LN10 = np.log(10.0)
 
 
 def single_arrhenius(a_par, n_par, ea_par,
-                     t_ref, temps, rval=RC):
+                     t_ref, temps, rval=RC, log10=False, out=None, work=None):
     """ Calculates T-dependent rate constants [k(T)]s using
         a single Arrhenius functional expression.
 
+        If out and work buffers are given, the calculation is done in
+        place and no arrays are allocated.
+
         :param a_par: pre-exponential A parmater
         :type a_par: float
         :param n_par: temperature exponent n parmater
@@ -26,19 +31,47 @@ def single_arrhenius(a_par, n_par, ea_par,
          :type t_ref: float
         :param temps: List of Temperatures (K)
         :type temps: numpy.ndarray
+        :param log10: return log10 k(T)s instead of k(T)s
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray
         :return kts: T-dependent rate constants
         :rtype: numpy.ndarray
     """
-    kts = a_par * ((temps / t_ref)**n_par) * np.exp(-ea_par/(rval*temps))
-    return kts
+
+    out = _buffer(out, np.shape(temps))
+    work = _buffer(work, np.shape(temps))
+    np.divide(temps, t_ref, out=out)
+    if log10:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.log10(out, out=out)
+            out *= n_par
+            np.multiply(temps, rval * LN10, out=work)
+            np.divide(ea_par, work, out=work)
+            out -= work
+            out += np.log10(a_par)
+    else:
+        np.power(out, n_par, out=out)
+        np.multiply(temps, rval, out=work)
+        np.divide(-ea_par, work, out=work)
+        np.exp(work, out=work)
+        out *= work
+        out *= a_par
+
+    return out
 
 
 def double_arrhenius(a_par1, n_par1, ea_par1,
                      a_par2, n_par2, ea_par2,
-                     t_ref, temps, rval=RC):
+                     t_ref, temps, rval=RC, log10=False, out=None, work=None):
     """ Calculates T-dependent rate constants [k(T)]s using
         a double Arrhenius functional expression.
 
+        If out and work buffers are given, the calculation is done in
+        place and no arrays are allocated.
+
         :param a_par1: 1st pre-exponential A parmater
         :type a_par1: float
         :param n_par1: 1st temperature exponent n parmater
@@ -55,17 +88,40 @@ def double_arrhenius(a_par1, n_par1, ea_par1,
         :type t_ref: float
         :param temps: List of Temperatures (K)
         :type temps: numpy.ndarray
+        :param log10: return log10 k(T)s instead of k(T)s
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray
+        :param work: scratch array, shape (2,) + out.shape
+        :type work: numpy.ndarray
         :return kts: T-dependent rate constants
         :rtype: numpy.ndarray
     """
-    kts = (
-        a_par1 * ((temps / t_ref)**n_par1) * np.exp(-ea_par1/(rval*temps)) +
-        a_par2 * ((temps / t_ref)**n_par2) * np.exp(-ea_par2/(rval*temps))
-    )
-    return kts
+
+    out = _buffer(out, np.shape(temps))
+    work = _buffer(work, (2,) + np.shape(temps))
+
+    # Sum the terms in log space unless a negative A needs a linear sum
+    log_sum = log10 and a_par1 >= 0.0 and a_par2 >= 0.0
+    single_arrhenius(a_par1, n_par1, ea_par1, t_ref, temps, rval=rval,
+                     log10=log_sum, out=out, work=work[0])
+    single_arrhenius(a_par2, n_par2, ea_par2, t_ref, temps, rval=rval,
+                     log10=log_sum, out=work[1], work=work[0])
+    if log_sum:
+        out *= LN10
+        work[1] *= LN10
+        np.logaddexp(out, work[1], out=out)
+        out /= LN10
+    else:
+        out += work[1]
+        if log10:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.log10(out, out=out)
+
+    return out
 
 
-def arrhenius(params, t_ref, temps):
+def arrhenius(params, t_ref, temps, log10=False, out=None, work=None):
     """ Calculates T-dependent rate constants [k(T)]s using
          a either a single or double Arrhenius functional expression,
          depending on the number of input fitting parameters.
@@ -76,26 +132,39 @@ def arrhenius(params, t_ref, temps):
          :type t_ref: float
          :param temps: List of Temperatures (K)
          :type temps: numpy.ndarray
+         :param log10: return log10 k(T)s instead of k(T)s
+         :type log10: bool
+         :param out: array to store the result in
+         :type out: numpy.ndarray
+         :param work: scratch array, shape (2,) + out.shape
+         :type work: numpy.ndarray
          :return kts: T-dependent rate constants
          :rtype: numpy.ndarray
     """
 
     assert len(params) in (3, 6)
 
+    kernel = _backend.kernel('arrhenius')
+    if kernel is not None and out is None and np.ndim(temps) == 1:
+        return kernel(np.asarray(params, dtype=float), float(t_ref),
+                      np.asarray(temps, dtype=float), RC, log10)
+
     if len(params) == 3:
         kts = single_arrhenius(
             params[0], params[1], params[2],
-            t_ref, temps)
+            t_ref, temps, log10=log10,
+            out=out, work=None if work is None else work[0])
     else:
         kts = double_arrhenius(
             params[0], params[1], params[2],
             params[3], params[4], params[5],
-            t_ref, temps)
+            t_ref, temps, log10=log10, out=out, work=work)
 
     return kts
 
 
-def lowp_limit(highp_kts, temps, pressures, collid_factor=1.0, rval=RC2):
+def lowp_limit(highp_kts, temps, pressures, collid_factor=1.0, rval=RC2,
+               log10=False):
     """ Calculates T,P-dependent rate constants [k(T,P)]s assuming
         the reaction occurs in the low-pressure regime where the
         rates are linear with pressure.
@@ -108,22 +177,47 @@ def lowp_limit(highp_kts, temps, pressures, collid_factor=1.0, rval=RC2):
         :type pressures: list(float)
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
         :return ktp_dct: k(T,Ps) at all temps and pressures
         :rtype: dict[pressure: temps]
     """
-    kp_dct = {}
-    for pressure in pressures:
-        kp_dct[pressure] = lowp_limit_one_pressure(
-            highp_kts, temps, pressure,
-            collid_factor=collid_factor, rval=rval)
+    ktps = lowp_limit_grid(highp_kts, temps, pressures,
+                           collid_factor=collid_factor, rval=rval,
+                           log10=log10)
+    kp_dct = dict(zip(pressures, ktps))
 
     ktp_dct = _ktp_dct(kp_dct, temps)
 
     return ktp_dct
 
 
+def lowp_limit_grid(highp_kts, temps, pressures, collid_factor=1.0, rval=RC2,
+                    log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s assuming
+        the reaction occurs in the low-pressure regime, for all
+        pressures at once.
+
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :return ktps: k(T,P)s, one row per pressure
+        :rtype: numpy.ndarray (nP, nT)
+    """
+    return lowp_limit_one_pressure(
+        highp_kts, temps, _pcol(pressures),
+        collid_factor=collid_factor, rval=rval, log10=log10)
+
+
 def lowp_limit_one_pressure(highp_kts, temps, pressure,
-                            collid_factor=1.0, rval=RC2):
+                            collid_factor=1.0, rval=RC2, log10=False):
     """ Calculates the reduced pressure term for a single pressure
         used for Lindemann and Troe P-dependent functional expressions.
 
@@ -135,12 +229,18 @@ def lowp_limit_one_pressure(highp_kts, temps, pressure,
         :type pressure: float
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
         :rtype: numpy.ndarray
     """
+    if log10:
+        return highp_kts + np.log10(
+            p_to_m(pressure, temps, rval=rval) * collid_factor)
     return highp_kts * p_to_m(pressure, temps, rval=rval) * collid_factor
 
 
-def lindemann(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0):
+def lindemann(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0,
+              log10=False):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
         a Lindemann functional expression.
 
@@ -154,21 +254,52 @@ def lindemann(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0):
         :type pressures: list(float)
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
         :return ktp_dct: k(T,Ps) at all temps and pressures
         :rtype: dict[pressure: temps]
     """
-    kp_dct = {}
-    for pressure in pressures:
-        kp_dct[pressure] = lindemann_one_pressure(
-            highp_kts, lowp_kts, temps, pressure, collid_factor=collid_factor)
+    ktps = lindemann_grid(highp_kts, lowp_kts, temps, pressures,
+                          collid_factor=collid_factor, log10=log10)
+    kp_dct = dict(zip(pressures, ktps))
 
     ktp_dct = _ktp_dct(kp_dct, temps, highp_kts=highp_kts)
 
     return ktp_dct
 
 
+def lindemann_grid(highp_kts, lowp_kts, temps, pressures, collid_factor=1.0,
+                   log10=False, out=None, work=None):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s using
+        a Lindemann functional expression, for all pressures at once.
+
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param lowp_kts: k(T)s determined at low-pressure
+        :type lowp_kts: numpy.ndarray
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray (nP, nT)
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray (nP, nT)
+        :return ktps: k(T,P)s, one row per pressure
+        :rtype: numpy.ndarray (nP, nT)
+    """
+    return lindemann_one_pressure(
+        highp_kts, lowp_kts, temps, _pcol(pressures),
+        collid_factor=collid_factor, log10=log10, out=out, work=work)
+
+
 def lindemann_one_pressure(highp_kts, lowp_kts, temps, pressure,
-                           collid_factor=1.0):
+                           collid_factor=1.0, log10=False,
+                           out=None, work=None):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
         a Lindemann functional expression, at a given pressure,
         across several temperatures.
@@ -183,21 +314,49 @@ def lindemann_one_pressure(highp_kts, lowp_kts, temps, pressure,
         :type pressure: float
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray
         :return ktps: Set of k(T,P)s at given pressure
         :rtype numpy.ndarray
     """
-    # Calculate the pr term
-    pr_terms = _pr_term(highp_kts, lowp_kts, temps, pressure,
-                        collid_factor=collid_factor)
 
-    # Calculate Lindemann rate constants
-    ktps = highp_kts * (pr_terms / (1.0 + pr_terms))
+    shape = np.broadcast(highp_kts, lowp_kts, temps, pressure).shape
+    out = _buffer(out, shape)
+    work = _buffer(work, shape)
+    mconc_factor = np.multiply(pressure, collid_factor / RC2)
+
+    if log10:
+        # log10 Pr = log10 k0 - log10 kinf + log10(P M / RT)
+        np.subtract(lowp_kts, highp_kts, out=work)
+        np.log10(temps, out=out)
+        work -= out
+        work += np.log10(mconc_factor)
+
+        # Calculate log10 Lindemann rate constants
+        np.multiply(work, -LN10, out=out)
+        np.logaddexp(0.0, out, out=out)
+        out /= -LN10
+        out += highp_kts
+    else:
+        # Calculate the pr term
+        np.divide(lowp_kts, highp_kts, out=work)
+        work /= temps
+        work *= mconc_factor
+
+        # Calculate Lindemann rate constants
+        np.add(work, 1.0, out=out)
+        np.divide(work, out, out=out)
+        out *= highp_kts
 
-    return ktps
+    return out
 
 
 def troe(highp_kts, lowp_kts, temps, pressures,
-         alpha, ts3, ts1, ts2=None, collid_factor=1.0):
+         alpha, ts3, ts1, ts2=None, collid_factor=1.0, log10=False):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
         a Troe functional expression.
 
@@ -219,34 +378,35 @@ def troe(highp_kts, lowp_kts, temps, pressures,
         :type ts2: float
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
         :return ktp_dct: k(T,Ps) at all temps and pressures
         :rtype: dict[pressure: temps]
     """
-    kp_dct = {}
-    for pressure in pressures:
-        kp_dct[pressure] = troe_one_pressure(
-            highp_kts, lowp_kts, temps, pressure,
-            alpha, ts3, ts1, ts2=ts2, collid_factor=collid_factor)
+    ktps = troe_grid(highp_kts, lowp_kts, temps, pressures,
+                     alpha, ts3, ts1, ts2=ts2, collid_factor=collid_factor,
+                     log10=log10)
+    kp_dct = dict(zip(pressures, ktps))
 
     ktp_dct = _ktp_dct(kp_dct, temps, highp_kts=highp_kts)
 
     return ktp_dct
 
 
-def troe_one_pressure(highp_ks, lowp_ks, temps, pressure,
-                      alpha, ts3, ts1, ts2=None, collid_factor=1.0):
+def troe_grid(highp_kts, lowp_kts, temps, pressures,
+              alpha, ts3, ts1, ts2=None, collid_factor=1.0, log10=False,
+              out=None, work=None):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
-        a Troe functional expression, at a given pressure,
-        across several temperatures.
+        a Troe functional expression, for all pressures at once.
 
-        :param highp_ks: k(T)s determined at high-pressure
-        :type highp_ks: numpy.ndarray
-        :param lowp_ks: k(T)s determined at low-pressure
-        :type lowp_ks: numpy.ndarray
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param lowp_kts: k(T)s determined at low-pressure
+        :type lowp_kts: numpy.ndarray
         :param temps: Temps used to calculate high- and low-k(T)s
         :type temps: numpy.ndarray
-        :param pressures: Pressure used to calculate k(T,P)s
-        :type pressure: float
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressure: list(float)
         :param alpha: Troe alpha parameter
         :type alpha: float
         :param ts3: Troe T3 parameter
@@ -257,119 +417,195 @@ def troe_one_pressure(highp_ks, lowp_ks, temps, pressure,
         :type ts2: float
         :param collid_factor: Buffer enhancement collision factor
         :type collid_factor: float
-        :return ktps: Set of k(T,P)s at given pressure
-        :rtype numpy.ndarray
-        :return ktps: Set of k(T,P)s at given pressure
-        :rtype: dict[pressure: temps]
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray (nP, nT)
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray (nP, nT)
+        :return ktps: k(T,P)s, one row per pressure
+        :rtype: numpy.ndarray (nP, nT)
     """
+    kernel = _backend.kernel('troe')
+    if kernel is not None and out is None and np.ndim(temps) == 1:
+        return kernel(
+            np.asarray(highp_kts, dtype=float),
+            np.asarray(lowp_kts, dtype=float),
+            np.asarray(temps, dtype=float),
+            np.asarray(pressures, dtype=float),
+            alpha, ts3, ts1, np.nan if ts2 is None else ts2,
+            collid_factor, RC2, log10)
 
-    # Calculate the pr term and broadening factor
-    pr_term = _pr_term(highp_ks, lowp_ks, temps, pressure, collid_factor)
-    f_term = _f_broadening_term(pr_term, alpha, ts3, ts1, ts2, temps)
+    temp_terms = troe_temp_terms(
+        highp_kts, lowp_kts, temps, alpha, ts3, ts1, ts2=ts2, log10=log10)
 
-    # Calculate Troe rate constants (collision factor could be wrong)
-    ktps = highp_ks * (pr_term / (1.0 + pr_term)) * f_term
+    return troe_from_temp_terms(
+        highp_kts, temp_terms, _pcol(pressures), collid_factor=collid_factor,
+        log10=log10, out=out, work=work)
 
-    return ktps
 
+def troe_temp_terms(highp_kts, lowp_kts, temps,
+                    alpha, ts3, ts1, ts2=None, rval=RC2, log10=False):
+    """ Calculates every temperature-only term of a Troe expression so that
+        they can be reused for any number of pressures.
 
-def plog(plog_dct, t_ref, temps, pressures):
-    """ Calculates T,P-dependent rate constants [k(T,P)]s using
-        a PLOG functional expression.
+        All arguments only need to broadcast against each other, so the
+        same function serves a single reaction or a stack of reactions
+        (with the reaction index leading). A T2 given as NaN is omitted.
 
-        :param plog_dct: Arrhenius fitting parameters at several pressures
-        :type plog_dct: dict[pressure: [fit_params]]
-        :param t_ref: Reference temperature (K)
-        :type t_ref: float
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param lowp_kts: k(T)s determined at low-pressure
+        :type lowp_kts: numpy.ndarray
         :param temps: Temps used to calculate high- and low-k(T)s
         :type temps: numpy.ndarray
-        :param pressures: Pressures used to calculate k(T,P)s
-        :type pressures: list(float)
-        :return ktp_dct: k(T,Ps) at all temps and pressures
-        :rtype: dict[pressure: temps]
+        :param alpha: Troe alpha parameter
+        :type alpha: float or numpy.ndarray
+        :param ts3: Troe T3 parameter
+        :type ts3: float or numpy.ndarray
+        :param ts1: Troe T1 parameter
+        :type ts1: float or numpy.ndarray
+        :param ts2: Troe T2 parameter
+        :type ts2: float or numpy.ndarray
+        :param log10: k(T)s are given, and Pr/P returned, as log10 values
+        :type log10: bool
+        :return temp_terms: Pr/P, log10(Fcent), c, and n terms
+        :rtype: tuple(numpy.ndarray)
     """
 
-    # Set the plog pressures to see if pressure is in range
-    plog_pressures = list(plog_dct.keys())
-
-    kp_dct = {}
-    for pressure in pressures:
-        if min(plog_pressures) <= pressure <= max(plog_pressures):
-            kp_dct[pressure] = plog_one_pressure(
-                plog_dct, t_ref, temps, pressure)
-            # From mechanalyzer, might need fix
-            # if np.ndim(temps) == 1:
-            #     kp_dct[pressure] = plog_one_pressure(
-            #         plog_dct, temps, pressure, t_ref)
-            # else:
-            #     kp_dct[pressure] = plog_one_pressure(
-            #         plog_dct, temps[index], pressure, t_ref)
+    # Reduced pressure per unit pressure: (k0/kinf) / RT
+    if log10:
+        pr_coeffs = lowp_kts - highp_kts - np.log10(rval * temps)
+    else:
+        pr_coeffs = lowp_kts / highp_kts / (rval * temps)
+
+    # Calculate Fcent term
+    f_cent = ((1.0 - alpha) * np.exp(-temps / ts3) +
+              alpha * np.exp(-temps / ts1))
+    if ts2 is not None:
+        f_cent = f_cent + np.where(
+            np.isnan(ts2), 0.0, np.exp(-np.nan_to_num(ts2) / temps))
 
-    ktp_dct = _ktp_dct(kp_dct, temps)
+    # Calculate the coefficients of the Log F term
+    log_f_cent = np.log10(f_cent)
+    c_val = -0.4 - 0.67 * log_f_cent
+    n_val = 0.75 - 1.27 * log_f_cent
 
-    return ktp_dct
+    return pr_coeffs, log_f_cent, c_val, n_val
+
+
+def troe_from_temp_terms(highp_kts, temp_terms, pressures,
+                         collid_factor=1.0, log10=False, out=None, work=None):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s of a Troe
+        expression from its precomputed temperature-only terms; only the
+        reduced pressure depends on the pressures.
 
+        :param highp_kts: k(T)s determined at high-pressure
+        :type highp_kts: numpy.ndarray
+        :param temp_terms: terms from troe_temp_terms
+        :type temp_terms: tuple(numpy.ndarray)
+        :param pressures: Pressures, shaped to broadcast against the terms
+            (e.g., a (nP, 1) column for 1-D temperatures)
+        :type pressures: numpy.ndarray
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: high-P k(T)s and terms are given, and k(T,P)s
+            returned, as log10 values
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray
+        :return ktps: k(T,P)s
+        :rtype: numpy.ndarray
+    """
 
-def plog_one_pressure(plog_dct, t_ref, temps, pressure):
+    pr_coeffs, log_f_cent, c_val, n_val = temp_terms
+    shape = np.broadcast(highp_kts, pr_coeffs, pressures).shape
+    out = _buffer(out, shape)
+    work = _buffer(work, shape)
+
+    with np.errstate(divide='ignore'):
+        # Reduced pressure term: log10(Pr) in work; Pr or falloff in out
+        if log10:
+            np.add(pr_coeffs, np.log10(np.multiply(pressures, collid_factor)),
+                   out=work)
+            np.multiply(work, -LN10, out=out)
+            np.logaddexp(0.0, out, out=out)
+            out /= -LN10
+        else:
+            np.multiply(pr_coeffs, pressures, out=out)
+            out *= collid_factor
+            np.log10(out, out=work)
+
+        # Calculate the log F broadening term in place, using
+        # x/(n - 0.14x) = 1/(n/x - 0.14) with x = log10(Pr) + c
+        work += c_val
+        np.divide(n_val, work, out=work)
+        work -= 0.14
+        np.reciprocal(work, out=work)
+        np.square(work, out=work)
+        work += 1.0
+        np.divide(log_f_cent, work, out=work)
+
+        if log10:
+            out += work
+            out += highp_kts
+        else:
+            # Pr/(1+Pr) = 1/(1/Pr + 1)
+            np.power(10.0, work, out=work)
+            np.reciprocal(out, out=out)
+            out += 1.0
+            np.reciprocal(out, out=out)
+            out *= highp_kts
+            out *= work
+
+    return out
+
+
+def troe_one_pressure(highp_ks, lowp_ks, temps, pressure,
+                      alpha, ts3, ts1, ts2=None, collid_factor=1.0,
+                      log10=False, out=None, work=None):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
-        a PLOG functional expression, at a given pressure,
+        a Troe functional expression, at a given pressure,
         across several temperatures.
 
-        :param plog_dct: Arrhenius fitting parameters at several pressures
-        :type plog_dct: dict[pressure: [fit_params]]
-        :param t_ref: Reference temperature (K)
-        :type t_ref: float
+        :param highp_ks: k(T)s determined at high-pressure
+        :type highp_ks: numpy.ndarray
+        :param lowp_ks: k(T)s determined at low-pressure
+        :type lowp_ks: numpy.ndarray
         :param temps: Temps used to calculate high- and low-k(T)s
         :type temps: numpy.ndarray
-        :param pressure: Pressure used to calculate k(T,P)s
+        :param pressures: Pressure used to calculate k(T,P)s
         :type pressure: float
+        :param alpha: Troe alpha parameter
+        :type alpha: float
+        :param ts3: Troe T3 parameter
+        :type ts3: float
+        :param ts1: Troe T1 parameter
+        :type ts1: float
+        :param ts2: Troe T2 parameter
+        :type ts2: float
+        :param collid_factor: Buffer enhancement collision factor
+        :type collid_factor: float
+        :param log10: k(T)s are given, and k(T,P)s returned, as log10 k
+        :type log10: bool
+        :param out: array to store the result in
+        :type out: numpy.ndarray
+        :param work: scratch array, same shape as out
+        :type work: numpy.ndarray
         :return ktps: Set of k(T,P)s at given pressure
         :rtype numpy.ndarray
     """
 
-    plog_pressures = list(plog_dct.keys())
+    return troe_grid(highp_ks, lowp_ks, temps, [pressure],
+                     alpha, ts3, ts1, ts2=ts2, collid_factor=collid_factor,
+                     log10=log10,
+                     out=None if out is None else out[None],
+                     work=None if work is None else work[None])[0]
 
-    # Check if pressure is in plog dct; use plog pressure for numerical stab
-    pressure_defined = False
-    for plog_pressure in plog_pressures:
-        if np.isclose(pressure, plog_pressure, atol=1.0e-3):
-            pressure_defined = True
-            plog_params = plog_dct[plog_pressure]
 
-    # If pressure equals value use, arrhenius expression
-    if pressure_defined:
-        ktps = arrhenius(plog_params, t_ref, temps)
-    else:
-        # Calculate pressure term for PLOG expression
-        # Use two PLOG pressures our pressure of interest sits between
-        for i, _ in enumerate(plog_pressures):
-            if i != len(plog_pressures)-1:
-                if plog_pressures[i] < pressure < plog_pressures[i+1]:
-                    plow = plog_pressures[i]
-                    phigh = plog_pressures[i+1]
-                    plow_params = plog_dct[plow]
-                    phigh_params = plog_dct[phigh]
-                    break
-        pres_term = (
-            (np.log10(pressure) - np.log10(plow)) /
-            (np.log10(phigh) - np.log10(plow))
-        )
-
-        # Calculate k(T)s at high-P and low-P with Arrhenius expressions
-        kt_low = arrhenius(plow_params, t_ref, temps)
-        kt_high = arrhenius(phigh_params, t_ref, temps)
-
-        # Calculate K(T,P)s with PLOG expression
-        logkt = (
-            np.log10(kt_low) +
-            ((np.log10(kt_high) - np.log10(kt_low)) * pres_term)
-        )
-        ktps = 10**(logkt)
-
-    return ktps
-
-
-def chebyshev(alpha, tmin, tmax, pmin, pmax, temps, pressures):
+def chebyshev(alpha, tmin, tmax, pmin, pmax, temps, pressures, log10=False):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
         a Chebyshev functional expression.
 
@@ -385,20 +621,96 @@ def chebyshev(alpha, tmin, tmax, pmin, pmax, temps, pressures):
         :type temps: numpy.ndarray
         :param pressures: Pressures used to calculate k(T,P)s
         :type pressures: list(float)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
         :return ktp_dct: k(T,Ps) at all temps and pressures
         :rtype: dict[pressure: temps]
     """
-    kp_dct = {}
-    for pressure in pressures:
-        kp_dct[pressure] = chebyshev_one_pressure(
-            alpha, tmin, tmax, pmin, pmax, temps, pressure)
+    ktps = chebyshev_grid(alpha, tmin, tmax, pmin, pmax, temps, pressures,
+                          log10=log10)
+    kp_dct = dict(zip(pressures, ktps))
 
     ktp_dct = _ktp_dct(kp_dct, temps)
 
     return ktp_dct
 
 
-def chebyshev_one_pressure(alpha, tmin, tmax, pmin, pmax, temps, pressure):
+def chebyshev_grid(alpha, tmin, tmax, pmin, pmax, temps, pressures,
+                   log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s using
+        a Chebyshev functional expression, for all pressures at once.
+
+        :param alpha: Chebyshev coefficient matrix
+        :type alpha: numpy.ndarray
+        :param tmin: minimum temperature Chebyshev model is defined
+        :type tmin: float
+        :param tmax: maximum temperature Chebyshev model is defined
+        :type tmax: float
+        :param pmin: minimum pressure Chebyshev model is defined
+        :type pmin: float
+        :param pmax: maximum pressure Chebyshev model is defined
+        :type pmax: float
+        :param temps: Temps used to calculate high- and low-k(T)s
+        :type temps: numpy.ndarray
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s, one row per pressure
+        :rtype: numpy.ndarray (nP, nT)
+    """
+
+    kernel = _backend.kernel('chebyshev')
+    if kernel is not None and np.ndim(temps) == 1:
+        logktps = kernel(
+            np.ascontiguousarray(alpha, dtype=float), tmin, tmax, pmin, pmax,
+            np.asarray(temps, dtype=float), np.asarray(pressures, dtype=float))
+    else:
+        ctemps = _cheb.reduced_temps(temps, tmin, tmax)
+        cpresses = _cheb.reduced_pressures(_pcol(pressures), pmin, pmax)
+        logktps = _cheb.log10k(alpha, ctemps, cpresses)
+
+    return logktps if log10 else 10**logktps
+
+
+def chebyshev_batch(alphas, t_limits, p_limits, temps, pressures,
+                    log10=False):
+    """ Calculates T,P-dependent rate constants [k(T,P)]s for several
+        Chebyshev functional expressions at once.
+
+        Coefficient matrices of different shapes are zero-padded and the
+        series for every reaction, pressure, and temperature are summed
+        in a single set of array operations.
+
+        :param alphas: Chebyshev coefficient matrices, one per reaction
+        :type alphas: list(numpy.ndarray)
+        :param t_limits: (tmin, tmax) of each Chebyshev model
+        :type t_limits: numpy.ndarray (nrxn, 2)
+        :param p_limits: (pmin, pmax) of each Chebyshev model
+        :type p_limits: numpy.ndarray (nrxn, 2)
+        :param temps: Temps used to calculate k(T,P)s
+        :type temps: numpy.ndarray (1-D)
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
+        :return ktps: k(T,P)s for each reaction, pressure, and temperature
+        :rtype: numpy.ndarray (nrxn, nP, nT)
+    """
+
+    t_limits = np.reshape(np.asarray(t_limits, dtype=float), (-1, 2, 1, 1))
+    p_limits = np.reshape(np.asarray(p_limits, dtype=float), (-1, 2, 1, 1))
+    ctemps = _cheb.reduced_temps(
+        np.reshape(temps, (1, 1, -1)), t_limits[:, 0], t_limits[:, 1])
+    cpresses = _cheb.reduced_pressures(
+        np.reshape(pressures, (1, -1, 1)), p_limits[:, 0], p_limits[:, 1])
+    logktps = _cheb.log10k_batch(_cheb.pad_alphas(alphas), ctemps, cpresses)
+
+    return logktps if log10 else 10**logktps
+
+
+def chebyshev_one_pressure(alpha, tmin, tmax, pmin, pmax, temps, pressure,
+                           log10=False):
     """ Calculates T,P-dependent rate constants [k(T,P)]s using
         a Chebyshev functional expression, at a given pressure,
         across several temperatures.
@@ -417,115 +729,85 @@ def chebyshev_one_pressure(alpha, tmin, tmax, pmin, pmax, temps, pressure):
         :type temps: numpy.ndarray
         :param pressure: Pressure used to calculate k(T,P)s
         :type pressure: float
+        :param log10: return log10 k(T,P)s instead of k(T,P)s
+        :type log10: bool
         :return ktps: Set of k(T,P)s at given pressure
         :rtype numpy.ndarray
     """
 
-    alpha_nrows, alpha_ncols = alpha.shape
-
-    ktps = np.zeros(len(temps))
-    for i, temp in enumerate(temps):
-        ctemp = (
-            (2.0 * temp**(-1) - tmin**(-1) - tmax**(-1)) /
-            (tmax**(-1) - tmin**(-1))
-        )
-        cpress = (
-            (2.0 * np.log10(pressure) - np.log10(pmin) - np.log10(pmax)) /
-            (np.log10(pmax) - np.log10(pmin))
-        )
-
-        logktp = 0.0
-        for j in range(alpha_nrows):
-            for k in range(alpha_ncols):
-                logktp += (
-                    alpha[j][k] *
-                    eval_chebyt(j, ctemp) *
-                    eval_chebyt(k, cpress)
-                )
-
-        ktps[i] = 10**(logktp)
-
-    return ktps
+    return chebyshev_grid(
+        alpha, tmin, tmax, pmin, pmax, temps, [pressure], log10=log10)[0]
 
 
 # Functions for calculating terms in certain P-dependent expressions
-def _pr_term(highp_rateks, lowp_rateks, temps, pressure,
-             collid_factor=1.0, rval=RC2):
-    """ Calculates the reduced pressure term for a single pressure
-        used for Lindemann and Troe P-dependent functional expressions.
+def p_to_m(pressure, temps, rval=RC2):
+    """ Convert the pressure to the concentration of a gas [M]
+        assuming an ideal gas form where [M] ~ P/RT.
 
-        :param list highp_ks: k(T)s determined at high-pressure
-        :type highp_ks: numpy.ndarray
-        :param list lowp_ks: k(T)s determined at low-pressure
-        :type lowp_ks: numpy.ndarray
-        :param temps: Temps used to calculate high- and low-k(T)s
-        :temps: numpy.ndarray
-        :param pressure: Pressure used to calculate reduced pressure
+        :param pressure: Pressure of gas (in atm)
         :type pressure: float
-        :rtype: numpy.ndarray
+        :return mconc: Conncentration of Gas (mol/cm^3)
+        :rtype: float
     """
+    return pressure / (rval * temps)
 
-    pr_term = (
-        (lowp_rateks / highp_rateks) *
-        p_to_m(pressure, temps, rval=rval) *
-        collid_factor
-    )
 
-    return pr_term
+def log10_sum(logks1, logks2):
+    """ Add two sets of rate constants given as log10 k, without leaving
+        log space (both sets of rate constants must be positive).
 
+        :param logks1: log10 of the first set of rate constants
+        :type logks1: numpy.ndarray
+        :param logks2: log10 of the second set of rate constants
+        :type logks2: numpy.ndarray
+        :return logks: log10 of the summed rate constants
+        :rtype: numpy.ndarray
+    """
+    return np.logaddexp(LN10 * logks1, LN10 * logks2) / LN10
 
-def _f_broadening_term(pr_term, alpha, ts3, ts1, ts2, temp):
-    """ Calculates the F broadening factor term used for Troe expressions.
 
-        :param pr_term: reduced pressure
-        :type pr_term: float
-        :param alpha: Troe alpha parameter
-        :type alpha: float
-        :param ts3: Troe T3 parameter
-        :type ts3: float
-        :param ts1: Troe T1 parameter
-        :type ts1: float
-        :param ts2: Troe T2 parameter
-        :type ts2: float
-        :param temp: temperature
-        :type temp: float
-        :return f_cent: F broadening term
-        :rtype: float
-    """
+def log10_falloff(log_prs):
+    """ Calculates the log10 of the Lindemann falloff term, Pr/(1+Pr),
+        from the log10 of the reduced pressure without overflow.
 
-    # Calculate Fcent term
-    f_cent = ((1.0 - alpha) * np.exp(-temp / ts3) +
-              alpha * np.exp(-temp / ts1))
-    if ts2 is not None:
-        f_cent += np.exp(-ts2 / temp)
+        :param log_prs: log10 of the reduced pressures
+        :type log_prs: numpy.ndarray
+        :rtype: numpy.ndarray
+    """
+    return -np.logaddexp(0.0, -LN10 * log_prs) / LN10
 
-    # Calculate the Log F term
-    c_val = -0.4 - 0.67 * np.log10(f_cent)
-    n_val = 0.75 - 1.27 * np.log10(f_cent)
-    d_val = 0.14
-    val = ((np.log10(pr_term) + c_val) /
-           (n_val - d_val * (np.log10(pr_term) + c_val)))**2
-    logf = (1.0 + val)**(-1) * np.log10(f_cent)
 
-    # Calculate F broadening term
-    f_term = 10**(logf)
+# Helper functions
+def _buffer(buf, shape):
+    """ Use a caller-provided buffer, or allocate one if none is given
 
-    return f_term
+        :param buf: buffer to use, if any
+        :type buf: numpy.ndarray
+        :param shape: shape of the buffer
+        :type shape: tuple(int)
+        :rtype: numpy.ndarray
+    """
+    if buf is None:
+        buf = np.empty(shape)
+    else:
+        assert buf.shape == tuple(shape), (
+            f'buffer has shape {buf.shape}; expected {tuple(shape)}'
+        )
+    return buf
 
 
-def p_to_m(pressure, temps, rval=RC2):
-    """ Convert the pressure to the concentration of a gas [M]
-        assuming an ideal gas form where [M] ~ P/RT.
+def _pcol(pressures):
+    """ Reshape a set of pressures into a column so that they broadcast
+        against 1-D temperatures (or 2-D temperatures with one row per
+        pressure) to give arrays of shape (nP, nT).
 
-        :param pressure: Pressure of gas (in atm)
-        :type pressure: float
-        :return mconc: Conncentration of Gas (mol/cm^3)
-        :rtype: float
+        :param pressures: Pressures used to calculate k(T,P)s
+        :type pressures: list(float)
+        :rtype: numpy.ndarray (nP, 1)
     """
-    return pressure / (rval * temps)
+    return np.reshape(np.asarray(pressures, dtype=float), (-1, 1))
 
 
-# Helper functions
 def _ktp_dct(kp_dct, temps, highp_kts=None):
     """ Creates a kTP dictionary from a kP dictionary and an
         array of temperatures
@@ -2,6 +2,7 @@
 """
 
 import numpy
+from ratefit.ktptable import KTPTable
 
 
 def read(dct, rxn, pressure, val):
@@ -11,6 +12,11 @@ def read(dct, rxn, pressure, val):
     assert pressure == 'high' or isinstance(pressure, float)
     assert val in ('temps', 'rates')
 
+    # Tables look up pressures without scanning the keys
+    if isinstance(dct[rxn], KTPTable):
+        table = dct[rxn]
+        return table.temps if val == 'temps' else table.rates(pressure)
+
     # Deal with pressure floats
     if pressure == 'high':
         pval = 'high'
@@ -0,0 +1,148 @@
+""" Columnar storage for the k(T,P)s of a single reaction
+"""
+
+from collections.abc import Mapping
+import numpy
+
+
+class KTPTable(Mapping):
+    """ k(T,P)s of a reaction on shared temperature and pressure axes.
+
+        The rates at every pressure sit in one contiguous (nP, nT) array,
+        with the high-pressure-limit rates (if any) in a separate row.
+        Rows and columns are returned as views, without copying.
+
+        The table is a read-only Mapping with the same layout as a ktp_dct,
+        {pressure: (temps, kts), 'high': (temps, kts)}, so that it can be
+        passed to code written for ktp_dcts. Like the keys, its lookups
+        (table[pressure], pressure in table) match pressures exactly; index
+        and rates also match them to within the tolerance of ktpdct.read.
+    """
+
+    def __init__(self, temps, pressures, kts, highp_kts=None):
+        """ :param temps: temperatures shared by every pressure (K)
+            :type temps: numpy.ndarray (nT,)
+            :param pressures: pressures (atm); kept as given for the keys
+            :type pressures: list(float)
+            :param kts: k(T)s at each pressure
+            :type kts: numpy.ndarray (nP, nT)
+            :param highp_kts: k(T)s at the high-pressure limit
+            :type highp_kts: numpy.ndarray (nT,)
+        """
+        self.temps = numpy.asarray(temps, dtype=float)
+        self.pressures = numpy.asarray(pressures, dtype=float)
+        self.kts = numpy.asarray(kts, dtype=float).reshape(
+            len(self.pressures), len(self.temps))
+        self.highp_kts = (
+            None if highp_kts is None
+            else numpy.asarray(highp_kts, dtype=float))
+        assert self.temps.ndim == 1, (
+            'A KTPTable requires a 1-D array of temperatures')
+        assert (self.highp_kts is None or
+                self.highp_kts.shape == self.temps.shape), (
+            'High-P k(T)s must have one value per temperature')
+
+        self._keys = list(pressures)
+        self._pidxs = {pressure: idx for idx, pressure in enumerate(pressures)}
+        if self.highp_kts is not None:
+            self._keys.append('high')
+
+    @classmethod
+    def from_ktp_dct(cls, ktp_dct):
+        """ Pack a ktp_dct into a table; every entry must share the same
+            temperatures.
+
+            :param ktp_dct: k(T,P)s of a reaction
+            :type ktp_dct: dict[pressure: (temps, kts)]
+            :rtype: KTPTable
+        """
+        if isinstance(ktp_dct, KTPTable):
+            return ktp_dct
+        if not ktp_dct:
+            return cls(numpy.zeros(0), [], numpy.zeros((0, 0)))
+
+        temps = next(iter(ktp_dct.values()))[0]
+        for pressure, (_temps, _) in ktp_dct.items():
+            assert numpy.array_equal(_temps, temps), (
+                f'Temperatures at pressure {pressure} differ from the rest')
+        pressures = [pressure for pressure in ktp_dct if pressure != 'high']
+        kts = numpy.array([ktp_dct[pressure][1] for pressure in pressures])
+        highp_kts = ktp_dct['high'][1] if 'high' in ktp_dct else None
+
+        return cls(temps, pressures, kts, highp_kts=highp_kts)
+
+    def to_ktp_dct(self):
+        """ Unpack the table into a ktp_dct whose k(T)s are views of the
+            table rows
+
+            :rtype: dict[pressure: (temps, kts)]
+        """
+        return {key: self[key] for key in self._keys}
+
+    def index(self, pressure):
+        """ Row of the table holding a pressure, matched exactly or else
+            to within the tolerance of ktpdct.read
+
+            :param pressure: pressure (atm)
+            :type pressure: float
+            :rtype: int
+        """
+        idx = self._pidxs.get(pressure)
+        if idx is None:
+            matches = numpy.flatnonzero(
+                numpy.isclose(self.pressures, pressure, atol=1.0e-4))
+            if not matches.size:
+                raise KeyError(pressure)
+            idx = matches[-1]
+        return idx
+
+    def rates(self, pressure):
+        """ k(T)s at a pressure, matched as in index, or at the
+            high-pressure limit for 'high'
+
+            :param pressure: pressure (atm) or 'high'
+            :type pressure: float or str
+            :return kts: view of the row of the table
+            :rtype: numpy.ndarray (nT,)
+        """
+        if isinstance(pressure, str):
+            if pressure != 'high' or self.highp_kts is None:
+                raise KeyError(pressure)
+            return self.highp_kts
+        return self.kts[self.index(pressure)]
+
+    def column(self, temp):
+        """ k(P)s at one of the temperatures of the table
+
+            :param temp: temperature (K)
+            :type temp: float
+            :return kps: view of the column of the table
+            :rtype: numpy.ndarray (nP,)
+        """
+        matches = numpy.flatnonzero(numpy.isclose(self.temps, temp))
+        if not matches.size:
+            raise KeyError(temp)
+        return self.kts[:, matches[0]]
+
+    def __getitem__(self, pressure):
+        if pressure not in self:
+            raise KeyError(pressure)
+        return (self.temps, self.rates(pressure))
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, pressure):
+        if isinstance(pressure, str):
+            return pressure == 'high' and self.highp_kts is not None
+        try:
+            return pressure in self._pidxs
+        except TypeError:  # unhashable
+            return False
+
+    def __repr__(self):
+        return (f'KTPTable(nP={len(self.pressures)}, nT={len(self.temps)}, '
+                f'high={self.highp_kts is not None})')
@@ -0,0 +1,108 @@
+""" test the selectable backends of the ratefit.calc functions
+"""
+
+import numpy
+import ratefit
+
+
+PRESSURES = numpy.array([0.01, 0.1, 1.0, 2.0, 10.0, 100.0, 1000.0])
+TEMPS = numpy.arange(300.0, 3300.0, 300.0)
+T_REF = 1.0
+
+HIGHP_PARAMS = [2.000e+12, 0.900, 4.87490]
+LOWP_PARAMS = [2.490e24, -2.300, 4.87490]
+DOUBLE_PARAMS = [1.0e13, 0.0, 1.0e3, -2.0e12, 0.0, 1.0e3]
+TROE_ALPHA, TROE_T3, TROE_T1, TROE_T2 = 6.0e-1, 1.0e3, 7.0, 1.7e3
+
+PLOG_DCT = {
+    0.1: (1.14500e+16, -2.602, 1498.0),
+    1.00: (1.30500e+17, -2.611, 1980.0),
+    10.0: (1.52900e+18, -2.623, 2521.0),
+    100.: (1.72500e+19, -2.630, 3128.0)
+}
+
+CHEB_ALPHA = numpy.array([
+   [1.31900, 0.753300, -0.113600, -0.00162400],
+   [7.50900, 1.25800, -0.140900, -0.0208600],
+   [-0.719500, 0.751500, -0.000179400, -0.0326600],
+])
+
+
+def _calc_all():
+    """ Evaluate every functional form that has a compiled kernel
+    """
+    results = []
+    for log10 in (False, True):
+        highp_kts = ratefit.calc.arrhenius(
+            HIGHP_PARAMS, T_REF, TEMPS, log10=log10)
+        lowp_kts = ratefit.calc.arrhenius(
+            LOWP_PARAMS, T_REF, TEMPS, log10=log10)
+        results.append(highp_kts)
+        results.append(ratefit.calc.arrhenius(
+            DOUBLE_PARAMS, T_REF, TEMPS, log10=log10))
+        for ts2 in (None, TROE_T2):
+            results.append(ratefit.calc.troe_grid(
+                highp_kts, lowp_kts, TEMPS, PRESSURES,
+                TROE_ALPHA, TROE_T3, TROE_T1, ts2=ts2, log10=log10))
+        for out_of_range in ratefit.calc._plog.OUT_OF_RANGE:
+            results.append(ratefit.calc.plog_grid(
+                PLOG_DCT, T_REF, TEMPS, PRESSURES,
+                out_of_range=out_of_range, log10=log10))
+        results.append(ratefit.calc.chebyshev_grid(
+            CHEB_ALPHA, 290.0, 3000.0, 0.01, 1000.0, TEMPS, PRESSURES,
+            log10=log10))
+
+    return results
+
+
+def _calc_zero_k():
+    """ Evaluate the falloff forms with a vanishing high- or low-pressure
+        rate constant, where the reduced pressure is zero or infinite
+    """
+    results = []
+    with numpy.errstate(all='ignore'):
+        for log10 in (False, True):
+            highp_kts = ratefit.calc.arrhenius(
+                HIGHP_PARAMS, T_REF, TEMPS, log10=log10)
+            lowp_kts = ratefit.calc.arrhenius(
+                LOWP_PARAMS, T_REF, TEMPS, log10=log10)
+            zero_kts = numpy.zeros_like(TEMPS)
+            if log10:
+                zero_kts = numpy.log10(zero_kts)
+            for kts1, kts2 in ((zero_kts, lowp_kts), (highp_kts, zero_kts)):
+                results.append(ratefit.calc.troe_grid(
+                    kts1, kts2, TEMPS, PRESSURES,
+                    TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2, log10=log10))
+
+    return results
+
+
+def test__backend():
+    """ test ratefit.calc.set_backend
+    """
+
+    assert ratefit.calc.get_backend() == 'numpy'
+    assert 'numpy' in ratefit.calc.available_backends()
+    ref_results = _calc_all() + _calc_zero_k()
+
+    if 'numba' in ratefit.calc.available_backends():
+        ratefit.calc.set_backend('numba')
+        try:
+            assert ratefit.calc.get_backend() == 'numba'
+            all_results = _calc_all() + _calc_zero_k()
+            for results, ref in zip(all_results, ref_results):
+                assert numpy.allclose(results, ref, equal_nan=True)
+        finally:
+            ratefit.calc.set_backend('numpy')
+    else:
+        selected = True
+        try:
+            ratefit.calc.set_backend('numba')
+        except AssertionError:
+            selected = False
+        assert not selected
+        assert ratefit.calc.get_backend() == 'numpy'
+
+
+if __name__ == '__main__':
+    test__backend()
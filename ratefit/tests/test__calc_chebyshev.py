@@ -95,5 +95,27 @@ def test__chebyshev():
         cheb_ktps[20.0][1], REF_CHEB_KTPS[20.0][1], atol=0.01)
 
 
+def test__chebyshev_batch():
+    """ test ratefit.calc.chebyshev_batch
+    """
+
+    # Second reaction uses a smaller matrix and narrower limits
+    alpha2 = ALPHA[:4, :2]
+    cheb_ktps = ratefit.calc.chebyshev_batch(
+        [ALPHA, alpha2],
+        [[TMIN, TMAX], [500.0, 2000.0]],
+        [[PMIN, PMAX], [0.1, 10.0]],
+        TEMPS, PRESSURES)
+
+    assert cheb_ktps.shape == (2, len(PRESSURES), len(TEMPS))
+    for pidx, pressure in enumerate(PRESSURES):
+        assert numpy.allclose(
+            cheb_ktps[0, pidx], REF_CHEB_KTPS[pressure][1], atol=0.01)
+    assert numpy.allclose(
+        cheb_ktps[1], ratefit.calc.chebyshev_grid(
+            alpha2, 500.0, 2000.0, 0.1, 10.0, TEMPS, PRESSURES))
+
+
 if __name__ == '__main__':
     test__chebyshev()
+    test__chebyshev_batch()
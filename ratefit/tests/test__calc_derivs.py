@@ -0,0 +1,170 @@
+""" test the analytic derivatives of the ratefit.calc functional forms
+    against central finite differences
+"""
+
+import numpy
+import ratefit
+
+
+PRESSURES = numpy.array([0.01, 0.1, 0.5, 2.0, 10.0, 100.0, 1000.0])
+TEMPS = numpy.arange(300.0, 3300.0, 300.0)
+T_REF = 1.0
+
+HIGHP_PARAMS = [2.000e+12, 0.900, 4.87490e3]
+LOWP_PARAMS = [2.490e24, -2.300, 4.87490e3]
+DOUBLE_PARAMS = [1.0e13, 0.5, 1.0e4, 2.0e12, -1.0, 2.0e3]
+TROE_ALPHA, TROE_T3, TROE_T1, TROE_T2 = 6.0e-1, 1.0e3, 7.0, 1.7e3
+
+PLOG_DCT = {
+    0.1: (1.14500e+16, -2.602, 1498.0),
+    1.00: (1.30500e+17, -2.611, 1980.0),
+    10.0: (1.52900e+18, -2.623, 2521.0),
+    100.: (1.72500e+19, -2.630, 3128.0)
+}
+
+CHEB_ALPHA = numpy.array([
+   [1.31900, 0.753300, -0.113600, -0.00162400],
+   [7.50900, 1.25800, -0.140900, -0.0208600],
+   [-0.719500, 0.751500, -0.000179400, -0.0326600],
+])
+
+STEP = 1.0e-5
+
+
+def _check_derivs(calc, pressures=PRESSURES):
+    """ Compare the analytic derivatives of a form against central
+        finite differences in 1/T and ln P
+    """
+
+    _, dinvts, dlnps = calc(TEMPS, pressures)
+
+    invts = 1.0 / TEMPS
+    fd_dinvts = (
+        numpy.log(calc(1.0 / (invts * (1 + STEP)), pressures)[0]) -
+        numpy.log(calc(1.0 / (invts * (1 - STEP)), pressures)[0])
+    ) / (2.0 * STEP * invts)
+    fd_dlnps = (
+        numpy.log(calc(TEMPS, pressures * numpy.exp(STEP))[0]) -
+        numpy.log(calc(TEMPS, pressures * numpy.exp(-STEP))[0])
+    ) / (2.0 * STEP)
+
+    assert numpy.allclose(dinvts, fd_dinvts, rtol=1.0e-5, atol=1.0e-3)
+    assert numpy.allclose(dlnps, fd_dlnps, rtol=1.0e-5, atol=1.0e-6)
+
+
+def _highp_lowp(temps):
+    """ High- and low-P k(T)s with their derivatives
+    """
+    return (ratefit.calc.arrhenius_derivs(HIGHP_PARAMS, T_REF, temps),
+            ratefit.calc.arrhenius_derivs(LOWP_PARAMS, T_REF, temps))
+
+
+def test__arrhenius():
+    """ test ratefit.calc.arrhenius_derivs
+    """
+
+    for params in (HIGHP_PARAMS, DOUBLE_PARAMS):
+        kts, dinvts = ratefit.calc.arrhenius_derivs(params, T_REF, TEMPS)
+        assert numpy.allclose(
+            kts, ratefit.calc.arrhenius(params, T_REF, TEMPS))
+
+        invts = 1.0 / TEMPS
+        fd_dinvts = (
+            numpy.log(ratefit.calc.arrhenius(
+                params, T_REF, 1.0 / (invts * (1 + STEP)))) -
+            numpy.log(ratefit.calc.arrhenius(
+                params, T_REF, 1.0 / (invts * (1 - STEP))))
+        ) / (2.0 * STEP * invts)
+        assert numpy.allclose(dinvts, fd_dinvts, rtol=1.0e-5, atol=1.0e-3)
+
+
+def test__lindemann():
+    """ test ratefit.calc.lindemann_derivs
+    """
+
+    def _calc(temps, pressures):
+        (highp_kts, highp_dinvts), (lowp_kts, lowp_dinvts) = (
+            _highp_lowp(temps))
+        return ratefit.calc.lindemann_derivs(
+            highp_kts, lowp_kts, temps, pressures, highp_dinvts, lowp_dinvts)
+
+    ktps = _calc(TEMPS, PRESSURES)[0]
+    highp_kts = ratefit.calc.arrhenius(HIGHP_PARAMS, T_REF, TEMPS)
+    lowp_kts = ratefit.calc.arrhenius(LOWP_PARAMS, T_REF, TEMPS)
+    assert numpy.allclose(ktps, ratefit.calc.lindemann_grid(
+        highp_kts, lowp_kts, TEMPS, PRESSURES))
+    _check_derivs(_calc)
+
+
+def test__troe():
+    """ test ratefit.calc.troe_derivs
+    """
+
+    for ts2 in (None, TROE_T2):
+
+        def _calc(temps, pressures, ts2=ts2):
+            (highp_kts, highp_dinvts), (lowp_kts, lowp_dinvts) = (
+                _highp_lowp(temps))
+            return ratefit.calc.troe_derivs(
+                highp_kts, lowp_kts, temps, pressures,
+                TROE_ALPHA, TROE_T3, TROE_T1, ts2=ts2,
+                highp_dinvts=highp_dinvts, lowp_dinvts=lowp_dinvts)
+
+        ktps = _calc(TEMPS, PRESSURES)[0]
+        highp_kts = ratefit.calc.arrhenius(HIGHP_PARAMS, T_REF, TEMPS)
+        lowp_kts = ratefit.calc.arrhenius(LOWP_PARAMS, T_REF, TEMPS)
+        assert numpy.allclose(ktps, ratefit.calc.troe_grid(
+            highp_kts, lowp_kts, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=ts2))
+        _check_derivs(_calc)
+
+
+def test__plog():
+    """ test ratefit.calc.plog_derivs
+    """
+
+    # Stay off the PLOG pressures, where d ln k / d ln P is discontinuous
+    pressures = numpy.array([0.2, 0.5, 2.0, 50.0])
+    for out_of_range in ('drop', 'clamp', 'extrapolate'):
+
+        def _calc(temps, pressures, out_of_range=out_of_range):
+            return ratefit.calc.plog_derivs(
+                PLOG_DCT, T_REF, temps, pressures, out_of_range=out_of_range)
+
+        ktps = _calc(TEMPS, PRESSURES)[0]
+        assert numpy.allclose(ktps, ratefit.calc.plog_grid(
+            PLOG_DCT, T_REF, TEMPS, PRESSURES, out_of_range=out_of_range),
+            equal_nan=True)
+        _check_derivs(_calc, pressures=pressures)
+
+    # Out-of-range pressures are NaN when dropped, flat when clamped
+    _, _, dlnps = ratefit.calc.plog_derivs(
+        PLOG_DCT, T_REF, TEMPS, PRESSURES, out_of_range='drop')
+    assert numpy.all(numpy.isnan(dlnps[[0, -1]]))
+    _, _, dlnps = ratefit.calc.plog_derivs(
+        PLOG_DCT, T_REF, TEMPS, PRESSURES, out_of_range='clamp')
+    assert numpy.all(dlnps[[0, -1]] == 0.0)
+
+
+def test__chebyshev():
+    """ test ratefit.calc.chebyshev_derivs
+    """
+
+    for alpha in (CHEB_ALPHA, CHEB_ALPHA[:, :1], CHEB_ALPHA[:1, :]):
+
+        def _calc(temps, pressures, alpha=alpha):
+            return ratefit.calc.chebyshev_derivs(
+                alpha, 290.0, 3000.0, 0.01, 1000.0, temps, pressures)
+
+        ktps = _calc(TEMPS, PRESSURES)[0]
+        assert numpy.allclose(ktps, ratefit.calc.chebyshev_grid(
+            alpha, 290.0, 3000.0, 0.01, 1000.0, TEMPS, PRESSURES))
+        _check_derivs(_calc)
+
+
+if __name__ == '__main__':
+    test__arrhenius()
+    test__lindemann()
+    test__troe()
+    test__plog()
+    test__chebyshev()
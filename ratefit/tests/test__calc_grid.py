@@ -0,0 +1,235 @@
+""" test the (nP, nT) grid modes of the ratefit.calc functions
+"""
+
+import numpy
+import ratefit
+from ratefit.calc._rates import troe_one_pressure
+from ratefit.calc._rates import chebyshev_one_pressure
+from ratefit.calc._plog import plog_one_pressure
+
+
+# Pressure and Temperature Range and Parameter Setting
+PRESSURES = numpy.array([0.1, 2.0, 5.0, 10.0, 500.0])
+TEMPS = numpy.array([300.0, 1000.0, 2000.0, 3000.0])
+T_REF = 1.0
+
+HIGHP_KTS = ratefit.calc.arrhenius([2.000e+12, 0.900, 4.87490], T_REF, TEMPS)
+LOWP_KTS = ratefit.calc.arrhenius([2.490e24, -2.300, 4.87490], T_REF, TEMPS)
+
+TROE_ALPHA, TROE_T3, TROE_T1, TROE_T2 = 6.0e-1, 1.0e3, 7.0, 1.7e3
+
+PLOG_DCT = {
+    0.1: (1.14500e+16, -2.602, 1498.0),
+    1.00: (1.30500e+17, -2.611, 1980.0),
+    10.0: (1.52900e+18, -2.623, 2521.0),
+    100.: (1.72500e+19, -2.630, 3128.0)
+}
+
+CHEB_ALPHA = numpy.array([
+   [1.31900, 0.753300, -0.113600, -0.00162400],
+   [7.50900, 1.25800, -0.140900, -0.0208600],
+   [-0.719500, 0.751500, -0.000179400, -0.0326600],
+])
+
+# Reference k(T,P)s, with a row per pressure, from the frozen per-pressure
+# kernels in benchmarks/_reference.py
+REF_LOWP_LIMIT_KTPS = numpy.array([
+    [2.01386509e+13, 3.81080228e+11, 3.87391533e+10, 1.01677892e+10],
+    [4.02773017e+14, 7.62160457e+12, 7.74783067e+11, 2.03355784e+11],
+    [1.00693254e+15, 1.90540114e+13, 1.93695767e+12, 5.08389461e+11],
+    [2.01386509e+15, 3.81080228e+13, 3.87391533e+12, 1.01677892e+12],
+    [1.00693254e+17, 1.90540114e+15, 1.93695767e+14, 5.08389461e+13],
+])
+REF_LINDEMANN_KTPS = numpy.array([
+    [1.90012224e+13, 3.80935050e+11, 3.87383501e+10, 1.01677508e+10],
+    [1.83310610e+14, 7.56395043e+12, 7.74461881e+11, 2.03340424e+11],
+    [2.52171905e+14, 1.86977159e+13, 1.93495150e+12, 5.08293470e+11],
+    [2.88268242e+14, 3.67090014e+13, 3.86589899e+12, 1.01639503e+12],
+    [3.35304389e+14, 6.55778400e+14, 1.75499902e+14, 4.98966573e+13],
+])
+REF_TROE3_KTPS = numpy.array([
+    [9.01050546e+12, 2.04311141e+11, 1.49304808e+10, 2.41597002e+09],
+    [5.43538347e+13, 2.73984345e+12, 1.95988420e+11, 2.86739850e+10],
+    [8.34523673e+13, 5.62309193e+12, 4.07909584e+11, 5.79982953e+10],
+    [1.13703764e+14, 9.37941481e+12, 6.95260989e+11, 9.69910222e+10],
+    [2.74298360e+14, 1.08076551e+14, 1.08715936e+13, 1.43844676e+12],
+])
+REF_TROE4_KTPS = numpy.array([
+    [9.10804285e+12, 2.98793059e+11, 3.53750465e+10, 9.66617736e+09],
+    [5.49814995e+13, 5.03829947e+12, 6.80728729e+11, 1.90195823e+11],
+    [8.42788351e+13, 1.13980303e+13, 1.66908182e+12, 4.71883525e+11],
+    [1.14711510e+14, 2.05185440e+13, 3.27535627e+12, 9.37076216e+11],
+    [2.75198956e+14, 2.21789807e+14, 1.16712732e+14, 4.23127320e+13],
+])
+REF_PLOG_KTPS = numpy.array([
+    [3.32709820e+08, 8.42217726e+07, 2.02225018e+07, 7.98378707e+06],
+    [2.50957108e+09, 1.33414074e+09, 3.73491538e+08, 1.54853968e+08],
+    [4.53163961e+09, 3.08420477e+09, 9.08468055e+08, 3.82782401e+08],
+    [7.08611229e+09, 5.81372338e+09, 1.77962807e+09, 7.59044773e+08],
+    [numpy.nan, numpy.nan, numpy.nan, numpy.nan],
+])
+REF_CHEB_KTPS = numpy.array([
+    [5.80270108e-07, 1.53817775e+05, 1.70667668e+06, 2.95471399e+06],
+    [6.62672827e-07, 9.06069757e+05, 4.35124535e+07, 1.33971389e+08],
+    [6.98298353e-07, 1.41681806e+06, 1.06483331e+08, 3.91646210e+08],
+    [7.28150249e-07, 1.92775994e+06, 2.01419329e+08, 8.44669553e+08],
+    [9.30574497e-07, 6.65378336e+06, 3.20593523e+09, 2.48103903e+10],
+])
+
+
+def _check_grid(ktps, ref_ktps):
+    """ Compare a grid with the reference k(T,P)s
+    """
+    assert ktps.shape == (len(PRESSURES), len(TEMPS))
+    assert ktps.flags['C_CONTIGUOUS']
+    assert numpy.allclose(ktps, ref_ktps, equal_nan=True)
+
+
+def test__lowp_limit_grid():
+    """ test ratefit.calc.lowp_limit_grid
+    """
+    ktps = ratefit.calc.lowp_limit_grid(LOWP_KTS, TEMPS, PRESSURES)
+    _check_grid(ktps, REF_LOWP_LIMIT_KTPS)
+
+
+def test__lindemann_grid():
+    """ test ratefit.calc.lindemann_grid
+    """
+    ktps = ratefit.calc.lindemann_grid(HIGHP_KTS, LOWP_KTS, TEMPS, PRESSURES)
+    _check_grid(ktps, REF_LINDEMANN_KTPS)
+
+
+def test__troe_grid():
+    """ test ratefit.calc.troe_grid
+    """
+    for ts2, ref_ktps in ((None, REF_TROE3_KTPS), (TROE_T2, REF_TROE4_KTPS)):
+        ktps = ratefit.calc.troe_grid(
+            HIGHP_KTS, LOWP_KTS, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=ts2)
+        _check_grid(ktps, ref_ktps)
+
+
+def test__plog_grid():
+    """ test ratefit.calc.plog_grid
+    """
+    ktps = ratefit.calc.plog_grid(PLOG_DCT, T_REF, TEMPS, PRESSURES)
+    _check_grid(ktps, REF_PLOG_KTPS)
+
+    # 500 atm sits outside the PLOG range
+    assert 500.0 not in ratefit.calc.plog(PLOG_DCT, T_REF, TEMPS, PRESSURES)
+    assert numpy.all(numpy.isnan(ktps[-1]))
+
+
+def test__chebyshev_grid():
+    """ test ratefit.calc.chebyshev_grid
+    """
+    ktps = ratefit.calc.chebyshev_grid(
+        CHEB_ALPHA, 290.0, 3000.0, 0.01, 1000.0, TEMPS, PRESSURES)
+    _check_grid(ktps, REF_CHEB_KTPS)
+
+
+def test__log10_grid():
+    """ test the log10 output of the grid functions
+    """
+    log_highp_kts = ratefit.calc.arrhenius(
+        [2.000e+12, 0.900, 4.87490], T_REF, TEMPS, log10=True)
+    log_lowp_kts = ratefit.calc.arrhenius(
+        [2.490e24, -2.300, 4.87490], T_REF, TEMPS, log10=True)
+    assert numpy.allclose(log_highp_kts, numpy.log10(HIGHP_KTS))
+
+    # Double Arrhenius, including a negative A
+    for params in ([1.0e13, 0.0, 1.0e3, 2.0e12, 1.0, 5.0e3],
+                   [1.0e13, 0.0, 1.0e3, -2.0e12, 0.0, 1.0e3]):
+        assert numpy.allclose(
+            ratefit.calc.arrhenius(params, T_REF, TEMPS, log10=True),
+            numpy.log10(ratefit.calc.arrhenius(params, T_REF, TEMPS)))
+
+    pairs = (
+        (ratefit.calc.lowp_limit_grid(
+            log_highp_kts, TEMPS, PRESSURES, log10=True),
+         ratefit.calc.lowp_limit_grid(HIGHP_KTS, TEMPS, PRESSURES)),
+        (ratefit.calc.lindemann_grid(
+            log_highp_kts, log_lowp_kts, TEMPS, PRESSURES, log10=True),
+         ratefit.calc.lindemann_grid(HIGHP_KTS, LOWP_KTS, TEMPS, PRESSURES)),
+        (ratefit.calc.troe_grid(
+            log_highp_kts, log_lowp_kts, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2, log10=True),
+         ratefit.calc.troe_grid(
+            HIGHP_KTS, LOWP_KTS, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2)),
+        (ratefit.calc.plog_grid(
+            PLOG_DCT, T_REF, TEMPS, PRESSURES, log10=True),
+         ratefit.calc.plog_grid(PLOG_DCT, T_REF, TEMPS, PRESSURES)),
+        (ratefit.calc.chebyshev_grid(
+            CHEB_ALPHA, 290.0, 3000.0, 0.01, 1000.0, TEMPS, PRESSURES,
+            log10=True),
+         ratefit.calc.chebyshev_grid(
+            CHEB_ALPHA, 290.0, 3000.0, 0.01, 1000.0, TEMPS, PRESSURES)),
+    )
+    for logktps, ktps in pairs:
+        assert numpy.allclose(logktps, numpy.log10(ktps), equal_nan=True)
+
+    # Single-pressure functions
+    pairs = (
+        (troe_one_pressure(
+            log_highp_kts, log_lowp_kts, TEMPS, 2.0,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2, log10=True),
+         REF_TROE4_KTPS[1]),
+        (plog_one_pressure(
+            PLOG_DCT, T_REF, TEMPS, 2.0, log10=True),
+         REF_PLOG_KTPS[1]),
+        (chebyshev_one_pressure(
+            CHEB_ALPHA, 290.0, 3000.0, 0.01, 1000.0, TEMPS, 2.0,
+            log10=True),
+         REF_CHEB_KTPS[1]),
+    )
+    for logkts, kts in pairs:
+        assert numpy.allclose(logkts, numpy.log10(kts))
+
+
+def test__out_buffers():
+    """ test the caller-provided output and scratch buffers
+    """
+    out = numpy.empty((len(PRESSURES), len(TEMPS)))
+    work = numpy.empty((len(PRESSURES), len(TEMPS)))
+    kts_out = numpy.empty(len(TEMPS))
+    kts_work = numpy.empty((2, len(TEMPS)))
+
+    for log10 in (False, True):
+        for params in ([2.000e+12, 0.900, 4.87490],
+                       [1.0e13, 0.0, 1.0e3, -2.0e12, 0.0, 1.0e3]):
+            kts = ratefit.calc.arrhenius(
+                params, T_REF, TEMPS, log10=log10, out=kts_out, work=kts_work)
+            assert kts is kts_out
+            assert numpy.allclose(
+                kts, ratefit.calc.arrhenius(params, T_REF, TEMPS, log10=log10))
+
+        highp_kts, lowp_kts = HIGHP_KTS, LOWP_KTS
+        if log10:
+            highp_kts, lowp_kts = numpy.log10(HIGHP_KTS), numpy.log10(LOWP_KTS)
+
+        ktps = ratefit.calc.lindemann_grid(
+            highp_kts, lowp_kts, TEMPS, PRESSURES, log10=log10,
+            out=out, work=work)
+        assert ktps is out
+        assert numpy.allclose(ktps, ratefit.calc.lindemann_grid(
+            highp_kts, lowp_kts, TEMPS, PRESSURES, log10=log10))
+
+        ktps = ratefit.calc.troe_grid(
+            highp_kts, lowp_kts, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2, log10=log10,
+            out=out, work=work)
+        assert ktps is out
+        assert numpy.allclose(ktps, ratefit.calc.troe_grid(
+            highp_kts, lowp_kts, TEMPS, PRESSURES,
+            TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2, log10=log10))
+
+
+if __name__ == '__main__':
+    test__lowp_limit_grid()
+    test__lindemann_grid()
+    test__troe_grid()
+    test__plog_grid()
+    test__chebyshev_grid()
+    test__log10_grid()
+    test__out_buffers()
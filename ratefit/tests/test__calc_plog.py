@@ -129,3 +129,42 @@ def test__plog_from_double_arrhenius():
         plog_ktps[10.0][1], REF_DBL_PLOG_KTPS[10.0][1], atol=0.001)
     assert numpy.allclose(
         plog_ktps[50.0][1], REF_DBL_PLOG_KTPS[50.0][1], atol=0.001)
+
+
+def test__plog_out_of_range():
+    """ test ratefit.calc.PlogInterpolator out-of-range policies
+    """
+
+    pressures = numpy.array([0.01, 1.0, 300.0])
+    interp = ratefit.calc.PlogInterpolator(PLOG_SGL_PARAM_DCT, T_REF, TEMPS)
+    assert numpy.array_equal(interp.in_range(pressures), [False, True, False])
+
+    # Dropped pressures are NaN in the grid and absent from the ktp_dct
+    drop_ktps = interp.ktps(pressures)
+    assert numpy.all(numpy.isnan(drop_ktps[[0, 2]]))
+    assert numpy.allclose(drop_ktps[1], REF_SGL_PLOG_KTPS[1.0][1])
+    drop_ktp_dct = ratefit.calc.plog(
+        PLOG_SGL_PARAM_DCT, T_REF, TEMPS, pressures)
+    assert tuple(drop_ktp_dct.keys()) == (1.0,)
+
+    # Clamped pressures use the nearest PLOG pressure
+    clamp_ktps = interp.ktps(pressures, out_of_range='clamp')
+    assert numpy.allclose(
+        clamp_ktps[0],
+        ratefit.calc.arrhenius(PLOG_SGL_PARAM_DCT[0.03], T_REF, TEMPS))
+    assert numpy.allclose(
+        clamp_ktps[2],
+        ratefit.calc.arrhenius(PLOG_SGL_PARAM_DCT[100.], T_REF, TEMPS))
+
+    # Extrapolated pressures continue the last segment in log(P)
+    extrap_ktps = interp.ktps(pressures, out_of_range='extrapolate')
+    k30 = ratefit.calc.arrhenius(PLOG_SGL_PARAM_DCT[30.0], T_REF, TEMPS)
+    k100 = ratefit.calc.arrhenius(PLOG_SGL_PARAM_DCT[100.], T_REF, TEMPS)
+    slope = (numpy.log10(k100) - numpy.log10(k30)) / numpy.log10(100./30.)
+    assert numpy.allclose(
+        numpy.log10(extrap_ktps[2]),
+        numpy.log10(k100) + slope * numpy.log10(3.0))
+    extrap_ktp_dct = ratefit.calc.plog(
+        PLOG_SGL_PARAM_DCT, T_REF, TEMPS, pressures,
+        out_of_range='extrapolate')
+    assert numpy.allclose(tuple(extrap_ktp_dct.keys()), pressures)
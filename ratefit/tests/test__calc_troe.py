@@ -104,3 +104,34 @@ def test__calc_four_param():
         troe4p_ktps[5.0][1], REF_TROE4P_KTPS[5.0][1], atol=0.01)
     assert numpy.allclose(
         troe4p_ktps[10.0][1], REF_TROE4P_KTPS[10.0][1], atol=0.01)
+
+
+def test__calc_temp_terms():
+    """ test ratefit.calc._rates.troe_temp_terms and
+        ratefit.calc._batch.troe_temp_terms_batch
+    """
+
+    # Terms computed once can be reused for any set of pressures
+    temp_terms = ratefit.calc.troe_temp_terms(
+        HIGHP_KTS, LOWP_KTS, TEMPS, TROE_ALPHA, TROE_T3, TROE_T1, ts2=TROE_T2)
+    for pressure in PRESSURES:
+        ktps = ratefit.calc.troe_from_temp_terms(
+            HIGHP_KTS, temp_terms, pressure)
+        assert numpy.allclose(ktps, REF_TROE4P_KTPS[pressure][1], atol=0.01)
+
+    # Batched over a three- and a four-parameter expression
+    troe_params = numpy.array([
+        [TROE_ALPHA, TROE_T3, TROE_T1, numpy.nan],
+        [TROE_ALPHA, TROE_T3, TROE_T1, TROE_T2]])
+    highp_kts = numpy.array([HIGHP_KTS, HIGHP_KTS])
+    lowp_kts = numpy.array([LOWP_KTS, LOWP_KTS])
+    temp_terms = ratefit.calc.troe_temp_terms_batch(
+        highp_kts, lowp_kts, TEMPS, troe_params)
+    ktps = ratefit.calc.troe_batch(
+        highp_kts, lowp_kts, TEMPS, PRESSURES, troe_params,
+        temp_terms=temp_terms)
+    for pidx, pressure in enumerate(PRESSURES):
+        assert numpy.allclose(
+            ktps[0, pidx], REF_TROE3P_KTPS[pressure][1], atol=0.01)
+        assert numpy.allclose(
+            ktps[1, pidx], REF_TROE4P_KTPS[pressure][1], atol=0.01)
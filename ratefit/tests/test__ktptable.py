@@ -0,0 +1,70 @@
+""" test ratefit.ktptable
+"""
+
+import numpy
+import ratefit
+
+
+TEMPS = numpy.array([500.0, 1000.0, 1500.0])
+PRESSURES = [0.1, 1, 10.0]
+KTS = numpy.array([
+    [1.0e5, 2.0e6, 3.0e7],
+    [1.0e6, 2.0e7, 3.0e8],
+    [1.0e7, 2.0e8, 3.0e9]])
+HIGHP_KTS = numpy.array([1.0e8, 2.0e9, 3.0e10])
+KTP_DCT = {
+    0.1: (TEMPS, KTS[0]),
+    1: (TEMPS, KTS[1]),
+    10.0: (TEMPS, KTS[2]),
+    'high': (TEMPS, HIGHP_KTS)
+}
+
+
+def test__table():
+    """ test ratefit.ktptable.KTPTable
+    """
+
+    table = ratefit.ktptable.KTPTable(
+        TEMPS, PRESSURES, KTS, highp_kts=HIGHP_KTS)
+
+    # Acts like the equivalent ktp_dct
+    assert list(table) == list(KTP_DCT)
+    assert len(table) == 4
+    assert 1 in table and 1.0 in table and 'high' in table
+    assert 2.0 not in table and 'low' not in table
+
+    # Mapping lookups are exact, like the keys; rates is tolerant
+    assert 1.00001 not in table
+    assert 1.00001 not in table.keys()
+    assert table.get(1.00001) is None
+    assert numpy.array_equal(table.rates(1.00001), KTS[1])
+    for pressure, (temps, kts) in table.items():
+        assert numpy.array_equal(temps, KTP_DCT[pressure][0])
+        assert numpy.array_equal(kts, KTP_DCT[pressure][1])
+    assert numpy.array_equal(table.column(1000.0), KTS[:, 1])
+
+    # Rows and columns are views of the rate array
+    assert numpy.shares_memory(table.rates(10.0), table.kts)
+    assert numpy.shares_memory(table.column(1500.0), table.kts)
+    assert numpy.shares_memory(table.to_ktp_dct()[0.1][1], table.kts)
+
+    # Round trip with a ktp_dct and lookups through ktpdct.read
+    table = ratefit.ktptable.KTPTable.from_ktp_dct(KTP_DCT)
+    assert numpy.array_equal(table.kts, KTS)
+    assert list(table.to_ktp_dct()) == list(KTP_DCT)
+    rxn_ktp_dct = {'rxn': table}
+    assert numpy.array_equal(
+        ratefit.ktpdct.read(rxn_ktp_dct, 'rxn', 1.0, 'rates'), KTS[1])
+    assert numpy.array_equal(
+        ratefit.ktpdct.read(rxn_ktp_dct, 'rxn', 'high', 'temps'), TEMPS)
+
+    # Tables without a high-pressure limit, or without any pressures
+    table = ratefit.ktptable.KTPTable(TEMPS, PRESSURES, KTS)
+    assert 'high' not in table and list(table) == PRESSURES
+    table = ratefit.ktptable.KTPTable(
+        TEMPS, [], numpy.zeros((0, 3)), highp_kts=HIGHP_KTS)
+    assert list(table) == ['high']
+
+
+if __name__ == '__main__':
+    test__table()
@@ -1,11 +1,16 @@
 """ Handle arithmetic operations for partition functions and related
     information.
 
-    only works for one value for pfs?
+    A set of partition function data is _pf = [temps, logq, dq_dt, d2q_dt2],
+    with one value of each quantity per temperature. Sets for many species
+    on the same temperatures are stacked into arrays of shape (nspc, 4, nT)
+    (see stack_pfs), so that they can be combined all at once.
 """
 
 import numpy
 
+OPERATORS = ('multiply', 'divide')
+
 
 def combine(pfs, coeffs, operators):
     """ Combine sets of partition function data together via some set
@@ -16,21 +21,108 @@ def combine(pfs, coeffs, operators):
 
     assert len(pfs) == len(coeffs)
 
-    for midx, _pf in enumerate(pfs):
-        if midx == 0:
-            coeff = coeffs[midx]
-            final_pf = _pf
-        else:
-            pf2 = _pf
-            coeff = coeffs[midx]
-            operator = operators[midx-1]
-            if coeff < 0:
-                coeff = abs(coeff)
-                if operator == 'multiply':
-                    operator = 'divide'
-            final_pf = _combine_pfs(final_pf, pf2, coeff, operator)
+    final_pf = unstack_pfs(
+        combine_stacked(stack_pfs(pfs), coeffs, operators))
+
+    # Keep the temperatures of the first set, and lists for the rest
+    return (pfs[0][0],) + tuple(list(col) for col in final_pf[1:])
+
+
+def combine_stacked(pf_arr, coeffs, operators):
+    """ Combine the stacked partition function data of a set of species
+        via some set of input coefficients and arithmetic operations.
+
+        :param pf_arr: partition function data of each species
+        :type pf_arr: numpy.ndarray (nspc, 4, nT)
+        :param coeffs: weighting coefficient of each species
+        :type coeffs: list(float)
+        :param operators: operator applying each species after the first
+        :type operators: list(str)
+        :return: combined partition function data
+        :rtype: numpy.ndarray (4, nT)
+    """
+    return combine_many(
+        pf_arr, [range(len(pf_arr))], [coeffs], [operators])[0]
+
+
+def combine_many(pf_arr, idxs_lst, coeffs_lst, operators_lst):
+    """ Combine the partition function data of many sets of species at
+        once, e.g., the reference species of many CBH schemes. Each set
+        is combined as in combine, so that
+
+        logq = logq_0 +/- (logq_1 + log|c_1|) +/- ...
+
+        and likewise for dq_dt and d2q_dt2, with + for multiplication
+        and - for division; the coefficient of the first species of a
+        set is not used.
+
+        :param pf_arr: partition function data of a pool of species
+        :type pf_arr: numpy.ndarray (nspc, 4, nT)
+        :param idxs_lst: indices into pf_arr of the species of each set
+        :type idxs_lst: list(list(int))
+        :param coeffs_lst: weighting coefficients of the species of each set
+        :type coeffs_lst: list(list(float))
+        :param operators_lst: operators of the species of each set, after
+            the first one
+        :type operators_lst: list(list(str))
+        :return: combined partition function data of each set
+        :rtype: numpy.ndarray (nset, 4, nT)
+    """
+    assert len(idxs_lst) == len(coeffs_lst) == len(operators_lst)
+    pf_arr = numpy.asarray(pf_arr, dtype=float)
+    nset = len(idxs_lst)
+
+    # Turn the sets into weights on the log quantities of the pool
+    weights = numpy.zeros((nset, len(pf_arr)))
+    offsets = numpy.zeros(nset)
+    first_idxs = numpy.zeros(nset, dtype=int)
+    for set_idx, (idxs, coeffs, operators) in enumerate(
+            zip(idxs_lst, coeffs_lst, operators_lst)):
+        idxs = list(idxs)
+        assert idxs and len(idxs) == len(coeffs)
+        assert len(operators) >= len(idxs) - 1
+        signs = _signs(coeffs, operators[:len(idxs)-1])
+        numpy.add.at(weights[set_idx], idxs, signs)
+        offsets[set_idx] = numpy.dot(
+            signs[1:], numpy.log(numpy.abs(coeffs[1:])))
+        first_idxs[set_idx] = idxs[0]
+
+    final_arr = numpy.empty((nset,) + pf_arr.shape[1:])
+    final_arr[:, 0] = pf_arr[first_idxs, 0]
+    final_arr[:, 1:] = (
+        numpy.tensordot(weights, pf_arr[:, 1:], axes=1) +
+        offsets[:, None, None])
 
-    return final_pf
+    return final_arr
+
+
+def stack_pfs(pfs):
+    """ Stack the partition function data of a set of species, given on
+        the same temperatures, into one array
+
+        :param pfs: partition function data of each species
+        :type pfs: list([temps, logq, dq_dt, d2q_dt2])
+        :rtype: numpy.ndarray (nspc, 4, nT)
+    """
+    pf_arr = numpy.array(
+        [[numpy.atleast_1d(col) for col in _pf] for _pf in pfs], dtype=float)
+    assert pf_arr.ndim == 3 and pf_arr.shape[1] == 4
+    assert numpy.all(pf_arr[:, 0] == pf_arr[0, 0]), (
+        'Partition functions must be given on the same temperatures')
+
+    return pf_arr
+
+
+def unstack_pfs(pf_arr):
+    """ Split stacked partition function data back into its columns
+
+        :param pf_arr: partition function data of one or more species
+        :type pf_arr: numpy.ndarray (4, nT) or (nspc, 4, nT)
+        :return: temps, logq, dq_dt, and d2q_dt2 arrays
+        :rtype: tuple(numpy.ndarray)
+    """
+    pf_arr = numpy.asarray(pf_arr)
+    return tuple(pf_arr[..., idx, :] for idx in range(4))
 
 
 def _combine_pfs(pfa, pfb, coeff, operator):
@@ -45,17 +137,26 @@ def _combine_pfs(pfa, pfb, coeff, operator):
         :param coeff: weighting coefficient
         :param operator: multiplication/division operator
     """
+    assert operator in OPERATORS
 
-    tempsa, logqa, dq_dta, d2q_dt2a = pfa
-    _, logqb, dq_dtb, d2q_dt2b = pfb
-
-    if operator == 'multiply':
-        logq = [a+b+numpy.log(coeff) for a, b in zip(logqa, logqb)]
-        dq_dt = [a+b+numpy.log(coeff) for a, b in zip(dq_dta, dq_dtb)]
-        d2q_dt2 = [a+b+numpy.log(coeff) for a, b in zip(d2q_dt2a, d2q_dt2b)]
-    elif operator == 'divide':
-        logq = [a-b-numpy.log(coeff) for a, b in zip(logqa, logqb)]
-        dq_dt = [a-b-numpy.log(coeff) for a, b in zip(dq_dta, dq_dtb)]
-        d2q_dt2 = [a-b-numpy.log(coeff) for a, b in zip(d2q_dt2a, d2q_dt2b)]
+    tempsa = pfa[0]
+    sign = 1.0 if operator == 'multiply' else -1.0
+    cols = (numpy.asarray(pfa[1:], dtype=float) +
+            sign * (numpy.asarray(pfb[1:], dtype=float) + numpy.log(coeff)))
+    logq, dq_dt, d2q_dt2 = (list(col) for col in cols)
 
     return tempsa, logq, dq_dt, d2q_dt2
+
+
+def _signs(coeffs, operators):
+    """ Sign (+1 for multiplication, -1 for division) with which each
+        species enters a combination; a negative coefficient turns a
+        multiplication into a division
+    """
+    signs = numpy.ones(len(coeffs))
+    for idx, (coeff, operator) in enumerate(zip(coeffs[1:], operators)):
+        assert operator in OPERATORS
+        if operator == 'divide' or coeff < 0:
+            signs[idx+1] = -1.0
+
+    return signs
@@ -0,0 +1,71 @@
+""" test thermfit.pf
+"""
+
+import numpy
+import thermfit.pf
+
+
+# [temps, logq, dq_dt, d2q_dt2]
+TEMPS = (500.0, 1000.0, 1500.0, 2000.0)
+PFS = ((TEMPS, (65.9811, 72.3157, 82.8571, 100.375),
+        (0.010705, 0.0158886, 0.0271782, 0.0437624),
+        (1.21039e-06, 1.70879e-05, 2.79324e-05, 3.83778e-05)),
+       (TEMPS, (31.2020, 35.8102, 39.0013, 41.4761),
+        (0.009212, 0.0082215, 0.0061012, 0.0049901),
+        (-1.8512e-05, -1.0101e-05, -4.7203e-06, -2.8832e-06)),
+       (TEMPS, (12.5510, 14.2871, 15.3013, 16.0119),
+        (0.003005, 0.0028571, 0.0015010, 0.0010235),
+        (-3.0102e-06, -2.1521e-06, -1.0931e-06, -6.2100e-07)))
+
+COEFFS = (1.0, 0.5, -1.2)
+OPERATORS = ('multiply', 'multiply')
+
+
+def test__combine():
+    """ test thermfit.pf.combine
+    """
+
+    combined_pfs = thermfit.pf.combine(PFS, COEFFS, OPERATORS)
+
+    # Combine the sets one pair at a time
+    ref_pfs = thermfit.pf._combine_pfs(PFS[0], PFS[1], 0.5, 'multiply')
+    ref_pfs = thermfit.pf._combine_pfs(ref_pfs, PFS[2], 1.2, 'divide')
+    assert combined_pfs[0] == TEMPS
+    for col, ref_col in zip(combined_pfs[1:], ref_pfs[1:]):
+        assert isinstance(col, list)
+        assert numpy.allclose(col, ref_col, rtol=1e-12)
+    assert numpy.isclose(
+        combined_pfs[1][0],
+        PFS[0][1][0] + PFS[1][1][0] + numpy.log(0.5) - PFS[2][1][0] -
+        numpy.log(1.2))
+
+
+def test__combine_many():
+    """ test thermfit.pf.combine_many
+    """
+
+    pf_arr = thermfit.pf.stack_pfs(PFS)
+    assert pf_arr.shape == (3, 4, 4)
+
+    idxs_lst = ((0, 1, 2), (2, 0), (1, 1, 0), (0,))
+    coeffs_lst = (COEFFS, (1.0, 2.0), (1.0, 3.0, 0.2), (1.0,))
+    operators_lst = (OPERATORS, ('divide',), ('multiply', 'divide'), ())
+    combined_arr = thermfit.pf.combine_many(
+        pf_arr, idxs_lst, coeffs_lst, operators_lst)
+    assert combined_arr.shape == (4, 4, 4)
+
+    for set_idx, idxs in enumerate(idxs_lst):
+        ref_pfs = thermfit.pf.combine(
+            [PFS[idx] for idx in idxs], coeffs_lst[set_idx],
+            operators_lst[set_idx])
+        temps, logq, dq_dt, d2q_dt2 = thermfit.pf.unstack_pfs(
+            combined_arr[set_idx])
+        assert numpy.array_equal(temps, TEMPS)
+        for col, ref_col in zip((logq, dq_dt, d2q_dt2), ref_pfs[1:]):
+            assert numpy.allclose(col, ref_col, rtol=1e-12)
+    assert numpy.array_equal(combined_arr[3], pf_arr[0])
+
+
+if __name__ == '__main__':
+    test__combine()
+    test__combine_many()